@@ -5,19 +5,71 @@ STRATEGY_PARAMS = {
     'grid_levels': 20,
     'base_grid_step_pct': 0.01,  # 1% standard step
     'trend_ma_period': 200,      # Trend Filter (Simons)
-    'min_atr_period': 14         # Volatility Window
+    'min_atr_period': 14,        # Volatility Window
+    'regrid_on_events': False,   # True: re-grid only on trend flip / ATR drift / range exit / fills
+    'regrid_atr_tolerance': 0.25 # (enables the event-skipping backtester)
 }
 
 # Global Risk Parameters (The Fortress)
 RISK_PARAMS = {
     'max_drawdown_limit': 0.15,      # 15% Hard Stop (Circuit Breaker)
     'stop_loss_atr_multiplier': 3.0, # Turtle 3x ATR Stops
-    'kelly_fraction': 0.5            # Thorp's Half-Kelly
+    'enforce_atr_stops': True,       # Trailing ATR stop per filled buy lot (modules/stop_book.py)
+    'kelly_fraction': 0.5,           # Thorp's Half-Kelly (of the estimated f*)
+    'kelly_min_trades': 30,          # Round trips before the estimate caps sizes
+    'kelly_halflife': 100,           # Round trips; None = equal weight for all trades
+    'kelly_floor': 0.25              # Min. share of the base budget with no edge
 }
 
+# Portfolio Risk (Cross-Asset Volatility Target, see modules/portfolio_risk.py)
+# Position sizes are scaled so the equal-weighted portfolio runs at vol_target
+PORTFOLIO_RISK_PARAMS = {
+    'vol_target': 0.5,   # Annualized; None disables scaling
+    'window': 168,       # Bars of returns in the rolling covariance (1 week of 1h)
+    'min_periods': 24,   # Bars before the scale applies
+    'min_scale': 0.25,
+    'max_scale': 1.0     # Never size above the single-asset rule
+}
+
+# Strategy Variants (Paper Multiplexing: --mode paper --multiplex)
+# Each variant overrides STRATEGY_PARAMS / RISK_PARAMS and trades its own sub-portfolio.
+STRATEGY_VARIANTS = [
+    {'name': 'baseline', 'strategy_params': {}, 'risk_params': {}},
+    {'name': 'wide_grid', 'strategy_params': {'base_grid_step_pct': 0.02}, 'risk_params': {}},
+    {'name': 'defensive', 'strategy_params': {}, 'risk_params': {'max_drawdown_limit': 0.10}}
+]
+
 # Paper Trading Settings
 PAPER_INITIAL_BALANCE = 100.0  # Initial capital per asset
 
+# Paper State Retention (see modules/retention.py)
+# Reports read running aggregates and the tiered history, so state files stay bounded
+RETENTION_PARAMS = {
+    'trade_retention_days': 30,  # Full trade records kept; older fills only live on in the aggregates
+    'equity_tiers': [[None, '2d'], ['1h', '90d'], ['1d', None]],  # (bar, kept for): raw -> hourly -> daily OHLC
+    'history_save_interval': 3600  # Seconds between writes of the equity history file (always written on shutdown)
+}
+
+# Paper Polling Guards (API Health Check, see modules/scheduler.py)
+SCHEDULER_PARAMS = {
+    'cycle_budget': 45.0,   # Seconds per polling cycle; remaining assets are deferred
+    'fetch_deadline': 10.0, # Slower fetches are not traded on and the symbol is backed off
+    'max_candle_age': 2,    # Latest candle older than N timeframes -> stale, no new grid
+    'max_backoff': 16       # Max. cycles a slow symbol is skipped
+}
+
+# Multiplexed Paper Trading (--mode paper --multiplex)
+MULTIPLEXER_PARAMS = {
+    'poll_interval': 60     # Seconds between cycles (one shared fetch per symbol per cycle)
+}
+
+# Sharded Paper Trading (--mode paper --shards N)
+SUPERVISOR_PARAMS = {
+    'poll_interval': 60,    # Seconds between cycles in each shard
+    'stall_timeout': 300,   # Restart a shard after this long without a heartbeat
+    'restart_delay': 5      # Min. seconds between restarts of a crashing shard
+}
+
 # API Configuration
 EXCHANGE_ID = 'kraken' # For Crypto
 
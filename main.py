@@ -1,4 +1,6 @@
 import argparse
+import os
+import re
 import sys
 import pandas as pd
 import numpy as np
@@ -9,9 +11,12 @@ from modules.risk_manager import RiskManager
 from modules.backtester import Backtester
 from modules.data_loader import DataLoader
 
-def run_backtest_portfolio(days=30):
+def run_backtest_portfolio(days=30, chunk_size=None, checkpoint_dir=None):
     """
     Runs backtest on all assets defined in PORTFOLIO_CONFIG.
+    With chunk_size, candles are streamed in chunks (bounded memory).
+    With checkpoint_dir, each asset resumes from its last checkpoint (only
+    new candles are simulated) and a new checkpoint is saved afterwards.
     """
     print(f"\n=== [Anti-Fragile Portfolio] Running Multi-Asset Backtest ({days} Days) ===")
     
@@ -26,10 +31,18 @@ def run_backtest_portfolio(days=30):
         symbol = asset_conf['symbol']
         print(f"\n>>> Processing {symbol} ({asset_conf['type']})...")
         
+        checkpoint = None
+        if checkpoint_dir:
+            checkpoint = os.path.join(checkpoint_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', symbol) + '.json')
+        resume = checkpoint is not None and os.path.exists(checkpoint)
+
         # 1. Load Data
-        data = loader.load_data(asset_config=asset_conf, days=days)
+        if chunk_size and not resume:
+            data = loader.iter_candles(asset_conf, days=days, chunk_size=chunk_size)
+        else:
+            data = loader.load_data(asset_config=asset_conf, days=days)
         
-        if data.empty:
+        if (resume or not chunk_size) and data.empty:
             print(f"   [Skip] No data found for {symbol}.")
             continue
             
@@ -44,24 +57,28 @@ def run_backtest_portfolio(days=30):
         
         # 3. Run Simulation
         try:
-            backtester.run(data)
+            if resume:
+                backtester.load_checkpoint(checkpoint)
+                backtester.extend(data)
+            elif chunk_size:
+                backtester.run_streaming(data)
+            else:
+                backtester.run(data)
+            if not len(backtester.equity_curve):
+                print(f"   [Skip] No new data for {symbol}.")
+                continue
+            if checkpoint:
+                backtester.checkpoint(checkpoint)
             
             # 4. Collect Stats
             final_bal = backtester.equity_curve[-1]['equity']
             pnl = final_bal - asset_initial_balance
-            ret_pct = (pnl / asset_initial_balance) * 100
-            
-            # Max DD
-            peaks = pd.Series([x['equity'] for x in backtester.equity_curve]).cummax()
-            dd = (pd.Series([x['equity'] for x in backtester.equity_curve]) - peaks) / peaks
-            max_dd = dd.min() * 100
+            stats = backtester.stats()
             
             portfolio_results.append({
                 'Symbol': symbol,
                 'Type': asset_conf['type'],
-                'Return %': ret_pct,
-                'Max DD %': max_dd,
-                'Trades': len(backtester.trade_history),
+                **stats,
                 'Profit $': pnl
             })
             
@@ -82,7 +99,8 @@ def run_backtest_portfolio(days=30):
 
     df_res = pd.DataFrame(portfolio_results)
     # Format for pretty printing
-    print(df_res[['Symbol', 'Type', 'Return %', 'Max DD %', 'Trades', 'Profit $']].to_string(index=False, float_format="%.2f"))
+    print(df_res[['Symbol', 'Type', 'Return %', 'Max DD %', 'Sharpe', 'Sortino', 'Calmar', 'Exposure %',
+                  'Turnover', 'Fee Drag %', 'Trades', 'Win Rate %', 'Profit $']].to_string(index=False, float_format="%.2f"))
     
     print("-" * 50)
     total_pnl = total_final_balance - total_initial_balance
@@ -91,22 +109,82 @@ def run_backtest_portfolio(days=30):
     print("="*50)
 
 
+def run_paper_replay(days=7):
+    """
+    Replays the paper trader over historical candles (simulated clock, no sleeps).
+    """
+    from modules.paper_replay import PaperReplay
+
+    print(f"\n=== [Paper Replay] Replaying {days} Days of Paper Trading ===")
+    loader = DataLoader(default_exchange_id=config.EXCHANGE_ID)
+    warmup = config.STRATEGY_PARAMS['trend_ma_period']
+
+    data = {}
+    for asset_conf in config.PORTFOLIO_CONFIG:
+        # Extra history so indicators are warm on the first replayed candle
+        data[asset_conf['symbol']] = loader.load_data(asset_config=asset_conf, days=int(np.ceil(days + warmup / 24)))
+
+    replay = PaperReplay(data, warmup=warmup)
+    portfolio = replay.run()
+
+    for symbol, state in portfolio.items():
+        equity = state.get('equity', state['balance'])
+        print(f"{symbol:<10} | Equity: ${equity:.2f} | Trades: {replay.trader.trade_stats[symbol].trades}")
+
+
+def build_stream_feed(loader, stream_url, timeframe='1h'):
+    """
+    Push feed for all portfolio assets. Warm-up history and gap backfills
+    go through the regular DataLoader.
+    """
+    from modules.stream_feed import StreamingFeed
+
+    host, port = stream_url.rsplit(':', 1)
+    assets = {a['symbol']: a for a in config.PORTFOLIO_CONFIG}
+
+    def backfill(symbol, since):
+        if since is None:
+            return loader.fetch_latest_candles(assets[symbol], limit=200, timeframe=timeframe)
+        return loader.fetch_candles_since(assets[symbol], since, timeframe=timeframe)
+
+    return StreamingFeed(host, int(port), list(assets), timeframe=timeframe, backfill=backfill)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Quantitative Grid Trading Bot (Anti-Fragile)")
-    parser.add_argument('--mode', choices=['live', 'backtest', 'paper'], default='backtest', help='Operation mode')
+    parser.add_argument('--mode', choices=['live', 'backtest', 'paper', 'replay'], default='backtest', help='Operation mode')
     parser.add_argument('--symbol', type=str, default=None, help='(Optional) Run specific symbol only')
     parser.add_argument('--days', type=float, default=30.0, help='Backtest duration')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Backtest: stream candles in chunks of N rows')
+    parser.add_argument('--checkpoint-dir', type=str, default=None, help='Backtest: resume from / save per-asset checkpoints')
+    parser.add_argument('--feed', choices=['poll', 'stream'], default='poll', help='Paper mode data feed')
+    parser.add_argument('--multiplex', action='store_true', help='Paper mode: run all STRATEGY_VARIANTS on one shared feed')
+    parser.add_argument('--shards', type=int, default=0, help='Paper mode: split assets across N worker processes')
+    parser.add_argument('--stream-url', type=str, default='127.0.0.1:8765', help='host:port of the push feed (--feed stream)')
     
     args = parser.parse_args()
     
     if args.mode == 'backtest':
-        run_backtest_portfolio(days=args.days)
+        run_backtest_portfolio(days=args.days, chunk_size=args.chunk_size, checkpoint_dir=args.checkpoint_dir)
         
     elif args.mode == 'paper':
         from modules.paper_trader import PaperTrader
         print("--- JOINING THE MATRIX (Paper Trading Mode) ---")
+        if args.multiplex:
+            from modules.multiplexer import PaperMultiplexer
+            PaperMultiplexer(config.STRATEGY_VARIANTS, max_days=args.days, **config.MULTIPLEXER_PARAMS).run()
+            return
+        if args.shards:
+            from modules.supervisor import PaperSupervisor
+            PaperSupervisor(shards=args.shards, max_days=args.days, **config.SUPERVISOR_PARAMS).run()
+            return
         trader = PaperTrader(max_days=args.days)
-        trader.run()
+        if args.feed == 'stream':
+            trader.run_stream(build_stream_feed(trader.loader, args.stream_url))
+        else:
+            trader.run()
+    elif args.mode == 'replay':
+        run_paper_replay(days=args.days)
     elif args.mode == 'live':
         print("WARNING: LIVE TRADING MODE.")
         sys.exit()
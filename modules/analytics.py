@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from modules.orders import Fill, FillLog
+from modules.risk_manager import compute_drawdowns
+
+NS_PER_YEAR = 365 * 24 * 3600 * 10**9  # Crypto trades 24/7
+DEFAULT_PERIODS_PER_YEAR = 365 * 24    # Hourly bars
+
+
+def trades_to_columns(trades):
+    """
+    Trades -> dict of arrays (time as int64 ns, is_buy as bool). Accepts a
+    FillLog, a list of Fill, or trade dicts {'time', 'side', 'price', 'size',
+    'fee'} whose times may be Timestamps or strings.
+    """
+    if isinstance(trades, FillLog):
+        return trades.columns()
+    if len(trades) and isinstance(trades[0], Fill):
+        log = FillLog()
+        for fill in trades:
+            log.append(fill)
+        return log.columns()
+    if len(trades) == 0:
+        return {'time': np.zeros(0, dtype=np.int64), 'is_buy': np.zeros(0, dtype=bool),
+                'price': np.zeros(0), 'size': np.zeros(0), 'fee': np.zeros(0)}
+    df = pd.DataFrame.from_records(trades, columns=['time', 'side', 'price', 'size', 'fee'])
+    return {
+        'time': pd.to_datetime(df['time']).to_numpy(dtype='datetime64[ns]').view(np.int64),
+        'is_buy': (df['side'] == 'buy').to_numpy(),
+        'price': df['price'].to_numpy(dtype=float),
+        'size': df['size'].to_numpy(dtype=float),
+        'fee': df['fee'].to_numpy(dtype=float),
+    }
+
+
+def periods_per_year(times):
+    """Bars per year from the median bar spacing of int64 ns timestamps."""
+    times = np.asarray(times, dtype=np.int64)
+    if len(times) < 2:
+        return DEFAULT_PERIODS_PER_YEAR
+    step = np.median(np.diff(times))
+    return NS_PER_YEAR / step if step > 0 else DEFAULT_PERIODS_PER_YEAR
+
+
+def sharpe_ratio(returns, periods=DEFAULT_PERIODS_PER_YEAR):
+    """Annualized Sharpe ratio of per-bar returns (zero risk-free rate)."""
+    returns = np.asarray(returns, dtype=float)
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    return returns.mean() / std * np.sqrt(periods) if std > 0 else np.nan
+
+
+def sortino_ratio(returns, periods=DEFAULT_PERIODS_PER_YEAR):
+    """Annualized Sortino ratio: mean return over downside deviation."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) == 0:
+        return np.nan
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    return returns.mean() / downside * np.sqrt(periods) if downside > 0 else np.nan
+
+
+def calmar_ratio(equity, periods=DEFAULT_PERIODS_PER_YEAR):
+    """Annualized (compound) return over max drawdown."""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2 or equity[0] <= 0:
+        return np.nan
+    max_dd = np.nanmax(compute_drawdowns(equity)[0])
+    cagr = (equity[-1] / equity[0]) ** (periods / (len(equity) - 1)) - 1
+    return cagr / max_dd if max_dd > 0 else np.nan
+
+
+def position_at(times, trades):
+    """Inventory held at each bar time, before that bar's fills (as the equity curve sees it)."""
+    signed = np.where(trades['is_buy'], trades['size'], -trades['size'])
+    held = np.concatenate(([0.0], np.cumsum(signed)))
+    return held[np.searchsorted(trades['time'], times, side='left')]
+
+
+def match_fifo(trades):
+    """
+    FIFO buy/sell lot matching. Each sell closes the oldest open buys first.
+    Works on cumulative quantities: the union of buy and sell breakpoints cuts
+    both sides into segments, and searchsorted finds the buy and the sell each
+    segment belongs to. No Python loop over fills.
+    Returns a DataFrame of round trips (one row per matched segment):
+    entry/exit time and price, size, pnl (net of pro-rata fees), holding_ns.
+    """
+    is_buy = trades['is_buy']
+    buys = {k: v[is_buy] for k, v in trades.items()}
+    sells = {k: v[~is_buy] for k, v in trades.items()}
+    cum_buy = np.cumsum(buys['size'])
+    cum_sell = np.cumsum(sells['size'])
+    matched = min(cum_buy[-1] if len(cum_buy) else 0.0, cum_sell[-1] if len(cum_sell) else 0.0)
+
+    # Segment ends; tolerance removes slivers from float round-off in the cumsums
+    eps = 1e-9 * max(matched, 1e-12)
+    ends = np.unique(np.concatenate((cum_buy, cum_sell, [matched])))
+    ends = ends[(ends <= matched + eps)]
+    starts = np.concatenate(([0.0], ends[:-1]))
+    keep = ends - starts > eps
+    starts, ends = starts[keep], ends[keep]
+    size = ends - starts
+
+    mid = (starts + ends) / 2
+    b = np.minimum(np.searchsorted(cum_buy, mid), len(cum_buy) - 1)
+    s = np.minimum(np.searchsorted(cum_sell, mid), len(cum_sell) - 1)
+
+    fees = buys['fee'][b] * size / buys['size'][b] + sells['fee'][s] * size / sells['size'][s]
+    return pd.DataFrame({
+        'entry_time': buys['time'][b].view('datetime64[ns]'),
+        'exit_time': sells['time'][s].view('datetime64[ns]'),
+        'entry_price': buys['price'][b],
+        'exit_price': sells['price'][s],
+        'size': size,
+        'pnl': size * (sells['price'][s] - buys['price'][b]) - fees,
+        'holding_ns': sells['time'][s] - buys['time'][b],
+    })
+
+
+def performance_summary(times, equity, trades, initial_balance, periods=None):
+    """
+    Vectorized performance statistics.
+    times: int64 ns per bar, equity: per-bar equity, trades: trades_to_columns().
+    periods (bars per year) is inferred from `times` unless given.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    equity = np.asarray(equity, dtype=float)
+    if periods is None:
+        periods = periods_per_year(times)
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+    drawdowns, _ = compute_drawdowns(equity)
+
+    notional = trades['price'] * trades['size']
+    fees = trades['fee'].sum()
+    round_trips = match_fifo(trades)
+    holding_h = round_trips['holding_ns'].to_numpy() / 3.6e12
+    weights = round_trips['size'].to_numpy()
+
+    return {
+        'Return %': (equity[-1] - initial_balance) / initial_balance * 100 if len(equity) else 0.0,
+        'Max DD %': -np.nanmax(drawdowns) * 100 if len(equity) else 0.0,
+        'Sharpe': sharpe_ratio(returns, periods),
+        'Sortino': sortino_ratio(returns, periods),
+        'Calmar': calmar_ratio(equity, periods),
+        'Exposure %': np.mean(position_at(times, trades) > 1e-12) * 100 if len(times) else 0.0,
+        'Turnover': notional.sum() / equity.mean() if len(equity) else 0.0,
+        'Fee Drag %': fees / initial_balance * 100,
+        'Trades': len(notional),
+        'Round Trips': len(round_trips),
+        'Win Rate %': (round_trips['pnl'] > 0).mean() * 100 if len(round_trips) else np.nan,
+        'Realized $': round_trips['pnl'].sum(),
+        'Avg Hold h': np.average(holding_h, weights=weights) if len(round_trips) else np.nan,
+    }
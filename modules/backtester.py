@@ -1,5 +1,69 @@
+import json
+import os
+
 import pandas as pd
 import numpy as np
+from array import array
+
+from modules.analytics import DEFAULT_PERIODS_PER_YEAR, performance_summary
+from modules.orders import Fill, FillLog, Order, Side
+from modules.retention import lttb
+from modules.stop_book import StopBook
+
+class EquityLog:
+    """
+    Compact equity curve: int64 timestamps + float64 equity (16 bytes/bar)
+    instead of one dict per bar. Reads back as {'time', 'equity'} dicts, so
+    existing `equity_curve[-1]['equity']` style access keeps working.
+    """
+    __slots__ = ('times', 'values', 'datetime_index')
+
+    def __init__(self):
+        self.times = array('q')
+        self.values = array('d')
+        self.datetime_index = None
+
+    def append(self, point):
+        t = point['time']
+        if self.datetime_index is None:
+            self.datetime_index = isinstance(t, pd.Timestamp)
+        self.times.append(t.value if self.datetime_index else int(t))
+        self.values.append(point['equity'])
+
+    def extend(self, times, equity, datetime_index):
+        """Appends a span of points: int64 times (ns if datetime_index) and equity arrays."""
+        if self.datetime_index is None:
+            self.datetime_index = datetime_index
+        self.times.extend(np.asarray(times, dtype=np.int64).tolist())
+        self.values.extend(np.asarray(equity, dtype=np.float64).tolist())
+
+    def _row(self, i):
+        t = self.times[i]
+        return {'time': pd.Timestamp(t) if self.datetime_index else t, 'equity': self.values[i]}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        return self._row(i)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    def equity(self):
+        """Equity as a NumPy array (zero-copy view)."""
+        return np.frombuffer(self.values, dtype=np.float64) if len(self) else np.zeros(0)
+
+    def timestamps(self):
+        """Times as an int64 NumPy array (ns for a datetime index; zero-copy view)."""
+        return np.frombuffer(self.times, dtype=np.int64) if len(self) else np.zeros(0, dtype=np.int64)
+
+    def downsample(self, max_points=2000):
+        """(times, equity) thinned to max_points with LTTB, for plotting long curves."""
+        keep = lttb(self.timestamps(), self.equity(), max_points)
+        return self.timestamps()[keep], self.equity()[keep]
 
 class Backtester:
     """
@@ -9,14 +73,22 @@ class Backtester:
     - No slippage (Limit orders)
     - 0.1% Fee per trade
     """
+    MIN_SKIP = 8  # Shortest quiet span booked in one batch (event-skipping mode)
+
     def __init__(self, strategy_engine, initial_balance=10000.0):
         self.strategy = strategy_engine
         self.initial_balance = initial_balance
         self.balance = initial_balance
         self.inventory = 0.0 # Coin amount
-        self.active_orders = [] # List of {'side': 'buy/sell', 'price': 100, 'size': 0.1}
-        self.trade_history = []
-        self.equity_curve = []
+        self.active_orders = [] # List of Order
+        self.trade_history = FillLog()
+        self.equity_curve = EquityLog()
+        self.stop_book = StopBook() # Open buy lots and their ATR stops
+        self._indicator_tail = None # Last candles of the previous chunk (streaming / resumed runs)
+        self.last_time = None # Index value of the last simulated candle
+        # Trades / equity points simulated before the checkpoint this run resumed from
+        self.ledger_offsets = {'trades': 0, 'equity': 0}
+        self.event_skipping = True # Skip quiet bars for strategies that re-grid only on events
         
         # Stats
         self.fee_rate = 0.001 # 0.1%
@@ -31,104 +103,365 @@ class Backtester:
         # In real-time we calc row by row, but for speed in backtest:
         data = self._prepare_indicators(data)
         
-        for index, row in data.iterrows():
-            current_price = row['close']
-            high = row['high']
-            low = row['low']
-            timestamp = index
-            
-            # 1. Update Portfolio Value (Mark-to-Market)
-            portfolio_value = self.balance + (self.inventory * current_price)
-            
-            # Update Risk Manager with current equity (for Drawdown tracking)
-            self.strategy.risk_manager.update_account_status(portfolio_value)
-            
-            self.equity_curve.append({'time': timestamp, 'equity': portfolio_value})
-            
-            # 2. Check Order Fills (Engine)
-            self._check_fills(high, low, timestamp)
-            
-            # 3. Generate Strategy Signals
-            # Create a "slice" of data up to this point to simulate real-time
-            # (In production backtests, we might optimize this, but this is safe)
-            market_slice = row # In our strategy logic we just passed the row
-            
-            signal = self.strategy.generate_signal(current_price, market_slice)
-            
-            # 4. Process Signal
-            if signal.get('action') == 'update_grid':
-                # Replace active orders with new grid
-                # (For simplicity in this V1, we cancel all and replace)
-                self.active_orders = [] 
-                
-                size = signal.get('suggested_size_per_grid', 0)
-                if size > 0:
-                    for price in signal['buy_levels']:
-                        self.active_orders.append({'side': 'buy', 'price': price, 'size': size})
-                    for price in signal['sell_levels']:
-                        # Only sell if we have inventory? For grid bot, usually yes.
-                        # But for "Anti-Fragile", maybe we short? Let's stick to Spot Long Grid.
-                        if self.inventory > 0:
-                             self.active_orders.append({'side': 'sell', 'price': price, 'size': size})
-        
+        self._run_bars(data)
+        if len(data):
+            self._indicator_tail = data[['high', 'low', 'close']].iloc[-self._lookback():]
+        self._generate_report()
+
+    def run_streaming(self, chunks):
+        """
+        Streaming Mode: consumes an iterable of OHLCV DataFrame chunks (e.g.
+        DataLoader.iter_candles) so multi-year minute data never has to sit in
+        memory at once. The ATR/SMA lookback window and the order book carry
+        over chunk boundaries; results match run() on the concatenated data.
+        """
+        print(f"--- Starting Streaming Backtest ---")
+        self._indicator_tail = None
+        candles = 0
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            candles += len(chunk)
+            self._run_bars(self._prepare_chunk(chunk))
+        print(f"--- Streamed {candles} candles ---")
+        if candles:
+            self._generate_report()
+
+    def _lookback(self):
+        # ATR needs one extra candle for the previous close
+        return max(self.strategy.config['min_atr_period'] + 1, self.strategy.config['trend_ma_period'])
+
+    def _prepare_chunk(self, chunk):
+        """Indicators for one chunk, warmed up with the previous chunk's tail."""
+        chunk = chunk[[c for c in ['open', 'high', 'low', 'close'] if c in chunk.columns]]
+        carried = 0
+        if self._indicator_tail is not None:
+            carried = len(self._indicator_tail)
+            chunk = pd.concat([self._indicator_tail, chunk])
+        else:
+            chunk = chunk.copy()
+        self._indicator_tail = chunk.iloc[-self._lookback():]
+        return self._prepare_indicators(chunk).iloc[carried:]
+
+    def extend(self, data):
+        """
+        Continues the simulation on newly appended candles (e.g. after
+        load_checkpoint). Candles at or before the last simulated one are
+        skipped, so the full refreshed history can be passed in.
+        """
+        if self.last_time is not None:
+            data = data[data.index > self.last_time]
+        print(f"--- Extending Backtest by {len(data)} candles ---")
+        if data.empty:
+            return
+        self._run_bars(self._prepare_chunk(data))
         self._generate_report()
-    
+
+    def checkpoint(self, path=None):
+        """
+        Snapshot of the full engine state after the last candle: account,
+        order book, RiskManager peak / breaker, strategy trend, indicator
+        window and ledger offsets. Written atomically as JSON when `path` is given.
+        """
+        tail = self._indicator_tail
+        datetime_index = isinstance(tail.index, pd.DatetimeIndex) if tail is not None else False
+        risk = self.strategy.risk_manager
+        state = {
+            'version': 1,
+            'symbol': self.strategy.symbol,
+            'strategy_config': self.strategy.config,
+            'initial_balance': self.initial_balance,
+            'balance': self.balance,
+            'inventory': self.inventory,
+            'fee_rate': self.fee_rate,
+            'active_orders': [o.to_dict() for o in self.active_orders],
+            'risk': {
+                'peak_balance': risk.peak_balance,
+                'current_drawdown': risk.current_drawdown,
+                'circuit_breaker_active': risk.circuit_breaker_active,
+                'kelly': risk.kelly.state()
+            },
+            'stop_lots': self.stop_book.snapshot(),
+            'current_trend': self.strategy.current_trend,
+            'strategy_grid': self.strategy.grid_state(),
+            'last_time': (self.last_time.value if datetime_index else int(self.last_time)) if self.last_time is not None else None,
+            'indicator_tail': None if tail is None else {
+                'datetime_index': datetime_index,
+                'index': [int(v) for v in (tail.index.as_unit('ns').asi8 if datetime_index else tail.index)],
+                **{col: tail[col].tolist() for col in ['high', 'low', 'close']}
+            },
+            'ledger_offsets': {
+                'trades': self.ledger_offsets['trades'] + len(self.trade_history),
+                'equity': self.ledger_offsets['equity'] + len(self.equity_curve)
+            }
+        }
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp, path)
+        return state
+
+    def load_checkpoint(self, checkpoint):
+        """Restores a checkpoint (dict or JSON path). Ledgers restart empty, counted from ledger_offsets."""
+        if isinstance(checkpoint, str):
+            with open(checkpoint) as f:
+                checkpoint = json.load(f)
+        if checkpoint['strategy_config'] != self.strategy.config:
+            raise ValueError("Checkpoint was made with different strategy params; rerun from the start.")
+
+        self.initial_balance = checkpoint['initial_balance']
+        self.balance = checkpoint['balance']
+        self.inventory = checkpoint['inventory']
+        self.fee_rate = checkpoint['fee_rate']
+        self.active_orders = [Order.from_dict(o) for o in checkpoint['active_orders']]
+        risk = self.strategy.risk_manager
+        risk.peak_balance = checkpoint['risk']['peak_balance']
+        risk.current_drawdown = checkpoint['risk']['current_drawdown']
+        risk.circuit_breaker_active = checkpoint['risk']['circuit_breaker_active']
+        if 'kelly' in checkpoint['risk']:
+            risk.kelly.load_state(checkpoint['risk']['kelly'])
+        self.strategy.current_trend = checkpoint['current_trend']
+        if 'strategy_grid' in checkpoint:
+            self.strategy.load_grid_state(checkpoint['strategy_grid'])
+        self.stop_book = StopBook.from_snapshot(checkpoint.get('stop_lots', []))
+
+        tail = checkpoint['indicator_tail']
+        self._indicator_tail = None
+        self.last_time = checkpoint['last_time']
+        if tail is not None:
+            index = pd.DatetimeIndex(np.array(tail['index'], dtype='datetime64[ns]')) if tail['datetime_index'] else pd.Index(tail['index'])
+            self._indicator_tail = pd.DataFrame({col: tail[col] for col in ['high', 'low', 'close']}, index=index)
+            if tail['datetime_index'] and self.last_time is not None:
+                self.last_time = pd.Timestamp(self.last_time)
+
+        self.trade_history = FillLog()
+        self.equity_curve = EquityLog()
+        self.ledger_offsets = dict(checkpoint['ledger_offsets'])
+
+    def _run_bars(self, data):
+        """
+        Simulates candles that already carry 'atr' / 'sma_trend'. Strategies
+        with regrid_on_events jump from event to event (see _run_events).
+        """
+        if not len(data):
+            return
+        self.last_time = data.index[-1]
+        bars = self._bar_arrays(data)
+        if self.event_skipping and self.strategy.config['regrid_on_events']:
+            self._run_events(data.index, bars)
+            return
+        for k, timestamp in enumerate(data.index):
+            self._step(timestamp, bars['time'][k], bars['open'][k], bars['high'][k], bars['low'][k], bars['close'][k],
+                       bars['atr'][k], bars['sma_trend'][k])
+
+    def _bar_arrays(self, data):
+        datetime_index = isinstance(data.index, pd.DatetimeIndex)
+        bars = {col: data[col].to_numpy(dtype=float) for col in ['high', 'low', 'close', 'atr', 'sma_trend']}
+        # Stops gap-fill at the open; data without opens fills at the stop price
+        bars['open'] = data['open'].to_numpy(dtype=float) if 'open' in data.columns else np.full(len(data), np.nan)
+        bars['time'] = data.index.as_unit('ns').asi8 if datetime_index else np.asarray(data.index, dtype=np.int64)
+        return bars
+
+    def _step(self, timestamp, bar_time, open_, high, low, current_price, atr, sma):
+        """One candle: mark-to-market, stops, fills, strategy."""
+        # 1. Update Portfolio Value (Mark-to-Market)
+        portfolio_value = self.balance + (self.inventory * current_price)
+
+        # Update Risk Manager with current equity (for Drawdown tracking)
+        risk = self.strategy.risk_manager
+        risk.update_account_status(portfolio_value)
+
+        self.equity_curve.append({'time': timestamp, 'equity': portfolio_value})
+
+        # 2. Check Stops, then Order Fills (Engine)
+        if risk.enforce_atr_stops:
+            self._check_stops(low, bar_time, open_)
+        self._check_fills(high, low, bar_time, atr)
+        if risk.enforce_atr_stops:
+            self.stop_book.trail(risk.get_adaptive_stop_loss(current_price, atr, 'buy'))
+
+        # 3. Generate Strategy Signals (indicators were precomputed on the full history)
+        signal = self.strategy.generate_signal(current_price, {'atr': atr, 'sma_trend': sma})
+
+        # 4. Process Signal
+        if signal.action == 'update_grid':
+            # Replace active orders with new grid
+            # (For simplicity in this V1, we cancel all and replace)
+            self.active_orders = []
+
+            size = signal.suggested_size_per_grid
+            if size > 0:
+                for price in signal.buy_levels:
+                    self.active_orders.append(Order(Side.BUY, price, size))
+                # Only sell if we have inventory? For grid bot, usually yes.
+                # But for "Anti-Fragile", maybe we short? Let's stick to Spot Long Grid.
+                if self.inventory > 0:
+                    for price in signal.sell_levels:
+                        self.active_orders.append(Order(Side.SELL, price, size))
+
+    def _run_events(self, index, bars):
+        """
+        Event-Skipping Mode
+        Bars where no resting order, stop or re-grid condition triggers leave
+        the book untouched, so only their mark-to-market matters. Each
+        iteration finds the next event bar, books the quiet span before it in
+        one vectorized step (equity, drawdown / breaker via the batch risk
+        update, trailing stop levels) and simulates the event bar normally.
+        Bar-for-bar identical to the per-candle loop.
+        """
+        n = len(index)
+        risk = self.strategy.risk_manager
+        i = 0
+        while i < n:
+            j = self._next_event(i, bars)
+            if j - i < self.MIN_SKIP:
+                # Too short to pay for the batch update: quiet bars step the same way
+                for k in range(i, j):
+                    self._step(index[k], bars['time'][k], bars['open'][k], bars['high'][k], bars['low'][k], bars['close'][k],
+                               bars['atr'][k], bars['sma_trend'][k])
+            elif j > i:
+                span = slice(i, j)
+                equity = self.balance + (self.inventory * bars['close'][span])
+                risk.update_account_status_batch(equity)
+                self.equity_curve.extend(bars['time'][span], equity, isinstance(index, pd.DatetimeIndex))
+                if risk.enforce_atr_stops:
+                    self.stop_book.trail_span(bars['close'][span] - bars['atr'][span] * risk.stop_loss_atr_multiplier)
+            if j < n:
+                self._step(index[j], bars['time'][j], bars['open'][j], bars['high'][j], bars['low'][j], bars['close'][j],
+                           bars['atr'][j], bars['sma_trend'][j])
+            i = j + 1
+
+    def _next_event(self, start, bars, window=16):
+        """
+        First bar at or after `start` that can change the book: a low at or
+        below the highest fillable buy or stop, a high at or above the lowest
+        fillable sell, or a strategy re-grid event. Scans windows of doubling
+        size, so the work is proportional to the bars skipped.
+        """
+        risk = self.strategy.risk_manager
+        # Orders the balance / inventory cannot cover stay unfilled until something else happens
+        buy_max = max((o.price for o in self.active_orders
+                       if o.side is Side.BUY and self.balance >= o.price * o.size), default=-np.inf)
+        sell_min = min((o.price for o in self.active_orders
+                        if o.side is Side.SELL and self.inventory >= o.size), default=np.inf)
+        stops = risk.enforce_atr_stops and len(self.stop_book) > 0
+        stop_level = self.stop_book.max_stop() if stops else -np.inf
+        n = len(bars['close'])
+        # Busy books often trigger on the very next bar: check it without array work
+        if start < n and (bars['low'][start] <= max(buy_max, stop_level) or bars['high'][start] >= sell_min or
+                          self.strategy.regrid_due(bars['close'][start], bars['atr'][start], bars['sma_trend'][start])):
+            return start
+        while start < n:
+            span = slice(start, min(n, start + window))
+            low = bars['low'][span]
+            event = (low <= buy_max) | (bars['high'][span] >= sell_min)
+            event |= self.strategy.regrid_events(bars['close'][span], bars['atr'][span], bars['sma_trend'][span])
+            if stops:
+                # A bar's stop check sees the trailing levels of the bars before it
+                levels = bars['close'][span] - bars['atr'][span] * risk.stop_loss_atr_multiplier
+                running = np.maximum.accumulate(np.maximum(stop_level, levels))
+                event |= low <= np.concatenate(([stop_level], running[:-1]))
+                stop_level = running[-1]
+            hits = np.flatnonzero(event)
+            if len(hits):
+                return start + int(hits[0])
+            start = span.stop
+            window *= 2
+        return n
+
     def _prepare_indicators(self, data):
         # We need to compute ATR and SMA just like the strategy does
         return self.strategy.add_indicators(data)
 
-    def _check_fills(self, high, low, timestamp):
+    def _check_stops(self, low, timestamp, open_=np.nan):
+        """
+        Sells inventory lots whose ATR stop is inside this candle: at the stop
+        price, or at the open when the candle gaps below the stop.
+        """
+        for size, stop in self.stop_book.check(low):
+            size = min(size, self.inventory)
+            if size <= 0:
+                continue
+            stop = float(np.fmin(stop, open_))
+            revenue = stop * size
+            fee = revenue * self.fee_rate
+            self.balance += revenue - fee
+            self.inventory -= size
+            fill = Fill(timestamp, Side.SELL, stop, size, fee)
+            self.trade_history.append(fill)
+            self.strategy.risk_manager.record_fill(self.strategy.symbol, fill)
+            self.strategy.request_regrid()
+
+    def _check_fills(self, high, low, timestamp, atr=np.nan):
         """
         Checks if any active orders were in the High-Low range of this candle.
+        `timestamp` is the integer bar time recorded on the fills; `atr`
+        sets the stop of lots opened by buy fills.
         """
+        risk = self.strategy.risk_manager
         remaining_orders = []
         for order in self.active_orders:
             filled = False
             
             # BUY ORDER: Fill if Low <= Order Price
-            if order['side'] == 'buy' and low <= order['price']:
-                cost = order['price'] * order['size']
+            if order.side is Side.BUY and low <= order.price:
+                cost = order.price * order.size
                 if self.balance >= cost:
                     self.balance -= cost
-                    self.inventory += order['size']
+                    self.inventory += order.size
                     fee = cost * self.fee_rate
                     self.balance -= fee
                     
-                    self.trade_history.append({'time': timestamp, 'side': 'buy', 'price': order['price'], 'size': order['size'], 'fee': fee})
+                    fill = Fill(timestamp, Side.BUY, order.price, order.size, fee)
+                    self.trade_history.append(fill)
+                    risk.record_fill(self.strategy.symbol, fill)
+                    if risk.enforce_atr_stops:
+                        self.stop_book.add(order.price, order.size, risk.get_adaptive_stop_loss(order.price, atr, 'buy'))
                     filled = True
             
             # SELL ORDER: Fill if High >= Order Price
-            elif order['side'] == 'sell' and high >= order['price']:
-                if self.inventory >= order['size']:
-                    revenue = order['price'] * order['size']
+            elif order.side is Side.SELL and high >= order.price:
+                if self.inventory >= order.size:
+                    revenue = order.price * order.size
                     self.balance += revenue
-                    self.inventory -= order['size']
+                    self.inventory -= order.size
                     fee = revenue * self.fee_rate
                     self.balance -= fee
                     
-                    self.trade_history.append({'time': timestamp, 'side': 'sell', 'price': order['price'], 'size': order['size'], 'fee': fee})
+                    fill = Fill(timestamp, Side.SELL, order.price, order.size, fee)
+                    self.trade_history.append(fill)
+                    risk.record_fill(self.strategy.symbol, fill)
+                    self.stop_book.reduce(order.size)
                     filled = True
             
-            if not filled:
+            if filled:
+                self.strategy.request_regrid()
+            else:
                 remaining_orders.append(order)
                 
         self.active_orders = remaining_orders
 
+    def stats(self):
+        """Performance statistics (see modules.analytics.performance_summary)."""
+        periods = None if self.equity_curve.datetime_index else DEFAULT_PERIODS_PER_YEAR
+        return performance_summary(self.equity_curve.timestamps(), self.equity_curve.equity(),
+                                   self.trade_history.columns(), self.initial_balance, periods=periods)
+
     def _generate_report(self):
         start_eq = self.initial_balance
         end_eq = self.equity_curve[-1]['equity']
-        pnl = end_eq - start_eq
-        ret_pct = (pnl / start_eq) * 100
-        
-        # Max Drawdown
-        peaks = pd.Series([x['equity'] for x in self.equity_curve]).cummax()
-        drawdowns = (pd.Series([x['equity'] for x in self.equity_curve]) - peaks) / peaks
-        max_dd = drawdowns.min() * 100
+        stats = self.stats()
         
         print("\n=== [The Lab] Backtest Report ===")
         print(f"Initial Balance: ${start_eq:.2f}")
         print(f"Final Balance:   ${end_eq:.2f}")
-        print(f"Total Return:    {ret_pct:.2f}%")
-        print(f"Max Drawdown:    {max_dd:.2f}%")
-        print(f"Total Trades:    {len(self.trade_history)}")
+        print(f"Total Return:    {stats['Return %']:.2f}%")
+        print(f"Max Drawdown:    {stats['Max DD %']:.2f}%")
+        print(f"Sharpe / Sortino / Calmar: {stats['Sharpe']:.2f} / {stats['Sortino']:.2f} / {stats['Calmar']:.2f}")
+        print(f"Exposure:        {stats['Exposure %']:.1f}%  | Turnover: {stats['Turnover']:.2f}x")
+        print(f"Fee Drag:        {stats['Fee Drag %']:.2f}%")
+        print(f"Total Trades:    {stats['Trades']}  ({stats['Round Trips']} round trips, "
+              f"win rate {stats['Win Rate %']:.1f}%, avg hold {stats['Avg Hold h']:.1f}h)")
         print("===============================\n")
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import timeframe_to_ms
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class CandleWindow:
+    """
+    Rolling Candle Window (Delta Fetching)
+    Keeps the last `size` candles of one symbol in memory. A refresh only asks
+    for candles since the last stored one: the still-forming candle is
+    replaced, new ones are appended, and missed candles (e.g. after a pause)
+    are backfilled page by page. A full reload happens only when the window is
+    empty, too short for the requested limit, too far behind, or the exchange
+    answers with a gap it cannot close.
+    The DataFrame is rebuilt only when the candles changed.
+    """
+    def __init__(self, timeframe='1h', size=200, page_limit=1000):
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.size = size
+        self.page_limit = page_limit
+        self.timestamps = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros((0, 5))
+        self._frame = None
+        # Bandwidth counters
+        self.rows_fetched = 0
+        self.requests = 0
+        self.reloads = 0
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def refresh(self, fetch, now_ms, limit=200):
+        """
+        fetch(since, limit) -> raw CCXT rows. Returns the window (last `limit`
+        candles) as the standard OHLCV frame. Do not mutate it: hand out copies.
+        """
+        if limit > self.size:
+            self.size = limit
+            self._clear()
+
+        if not len(self) or now_ms - self.timestamps[-1] > self.size * self.tf_ms:
+            self._reload(fetch)
+        else:
+            since = int(self.timestamps[-1])
+            while True:
+                rows = self._fetch(fetch, since, self.page_limit)
+                if not rows or rows[-1][0] < since:
+                    break
+                if rows[0][0] > self.timestamps[-1] + self.tf_ms:
+                    # Exchange skipped candles we asked for: start over
+                    self._reload(fetch)
+                    break
+                self._merge(rows)
+                if len(rows) < self.page_limit:
+                    break
+                since = rows[-1][0] + 1  # Gap backfill: next page
+
+        return self.frame().iloc[-limit:]
+
+    def frame(self):
+        if self._frame is None:
+            index = pd.DatetimeIndex(self.timestamps.astype('datetime64[ms]').astype('datetime64[ns]'), name='datetime')
+            columns = {'timestamp': self.timestamps}
+            columns.update({c: self.values[:, i] for i, c in enumerate(CANDLE_COLUMNS[1:])})
+            self._frame = pd.DataFrame(columns, index=index)
+        return self._frame
+
+    def _fetch(self, fetch, since, limit):
+        rows = fetch(since, limit)
+        self.requests += 1
+        self.rows_fetched += len(rows) if rows else 0
+        return rows
+
+    def _reload(self, fetch):
+        self.reloads += 1
+        self._clear()
+        rows = self._fetch(fetch, None, self.size)
+        if rows:
+            self._merge(rows)
+
+    def _clear(self):
+        self.timestamps = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros((0, 5))
+        self._frame = None
+
+    def _merge(self, rows):
+        """Overwrites stored candles from the first new timestamp on (forming candle), then trims."""
+        arr = np.asarray(rows, dtype=float)
+        new_ts = arr[:, 0].astype(np.int64)
+        keep = int(np.searchsorted(self.timestamps, new_ts[0]))
+        self.timestamps = np.concatenate((self.timestamps[:keep], new_ts))[-self.size:]
+        self.values = np.concatenate((self.values[:keep], arr[:, 1:6]))[-self.size:]
+        self._frame = None
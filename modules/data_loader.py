@@ -1,30 +1,117 @@
-import ccxt
+import importlib
 import pandas as pd
-import os
 import time
 
+from modules.request_cache import RequestCache, ttl_to_candle_close
+
+TIMEFRAME_UNITS_MS = {'m': 60 * 1000, 'h': 60 * 60 * 1000, 'd': 24 * 60 * 60 * 1000, 'w': 7 * 24 * 60 * 60 * 1000}
+
+# Data-source backends: asset_config['source'] -> "module:Class".
+# Backends (and their heavy deps, e.g. ccxt) are imported on first use only.
+SOURCE_BACKENDS = {
+    'exchange': 'modules.sources.exchange_source:ExchangeSource',
+    'csv': 'modules.sources.csv_source:CsvSource',
+    'parquet': 'modules.sources.parquet_source:ParquetSource',
+    'synthetic': 'modules.sources.synthetic_source:SyntheticSource',
+}
+
+def register_source(name, target):
+    """Registers a backend ("module:Class") for asset configs with source=name."""
+    SOURCE_BACKENDS[name] = target
+
+def timeframe_to_ms(timeframe):
+    """Converts a CCXT timeframe string ('1m', '1h', '1d') to milliseconds."""
+    unit = timeframe[-1]
+    if unit not in TIMEFRAME_UNITS_MS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[unit]
+
+def ohlcv_to_frame(ohlcv):
+    """Builds the standard OHLCV DataFrame (datetime index) from raw CCXT rows."""
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    if not df.empty:
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('datetime', inplace=True)
+        cols = ['open', 'high', 'low', 'close', 'volume']
+        df[cols] = df[cols].apply(pd.to_numeric)
+    return df
+
+class DataSource:
+    """
+    Backend Interface
+    One instance per DataLoader and source type. Unsupported operations
+    return an empty DataFrame.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+
+    def load(self, asset_config, days=30):
+        """Historical candles for backtests."""
+        return pd.DataFrame()
+
+    def latest(self, asset_config, limit=200, timeframe='1h'):
+        """Recent window for real-time indicator calculation."""
+        return pd.DataFrame()
+
+    def since(self, asset_config, since, timeframe='1h', limit=1000):
+        """Candles opened at or after `since` (ms)."""
+        return pd.DataFrame()
+
+    def iter_chunks(self, asset_config, days=30, chunk_size=100_000):
+        """Historical candles as DataFrame chunks (default: slices of load())."""
+        df = self.load(asset_config, days=days)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
 class DataLoader:
     """
     Data Fetcher
-    Connects to exchanges (via CCXT) or loads CSVs.
+    Connects to exchanges (via CCXT) or loads CSVs / Parquet / synthetic data.
+    Each source is a pluggable backend, imported only when an asset uses it.
     """
-    def __init__(self, default_exchange_id='kraken'):
+    def __init__(self, default_exchange_id='kraken', cache_max_ttl=30.0):
         self.default_exchange_id = default_exchange_id
-        self.exchanges = {} 
-        
+        self.exchanges = {}
+        self.sources = {}
+        # Shared by all consumers: coalesces identical fetch_ohlcv calls and
+        # caches responses until the candle closes (capped by cache_max_ttl
+        # so the forming candle stays fresh for the next poll).
+        self.cache = RequestCache()
+        self.cache_max_ttl = cache_max_ttl
+
+    def _source(self, name):
+        """Lazy load source backends."""
+        if name not in self.sources:
+            target = SOURCE_BACKENDS.get(name)
+            if target is None:
+                print(f"[DataLoader] Error: Unknown data source '{name}'.")
+                return None
+            module_name, class_name = target.split(':')
+            backend_class = getattr(importlib.import_module(module_name), class_name)
+            self.sources[name] = backend_class(self)
+        return self.sources[name]
+
     def _get_exchange(self, exchange_id):
         """Lazy load exchange instances."""
-        if exchange_id not in self.exchanges:
-            try:
-                # print(f"[DataLoader] Connecting to {exchange_id}...")
-                exchange_class = getattr(ccxt, exchange_id)
-                self.exchanges[exchange_id] = exchange_class({
-                    'enableRateLimit': True,
-                })
-            except AttributeError:
-                print(f"[DataLoader] Error: Exchange '{exchange_id}' not found in CCXT.")
-                return None
-        return self.exchanges.get(exchange_id)
+        return self._source('exchange').get_exchange(exchange_id)
+
+    def _fetch_ohlcv(self, exchange, exchange_id, symbol, timeframe, since=None, limit=None):
+        """
+        fetch_ohlcv through the request cache. Returns raw CCXT rows (read-only).
+        History pages (`since` set) are one-off requests: coalesced, not kept.
+        """
+        key = (exchange_id, symbol, timeframe, since, limit)
+        ttl = 0 if since is not None else \
+            ttl_to_candle_close(timeframe_to_ms(timeframe), int(time.time() * 1000), self.cache_max_ttl)
+        return self.cache.get_or_fetch(key, lambda: exchange.fetch_ohlcv(symbol, timeframe, since, limit), ttl)
+
+    def cache_stats(self):
+        """Hit/miss and saved-request counters of the request cache (+ candle window traffic)."""
+        stats = self.cache.stats()
+        windows = getattr(self.sources.get('exchange'), 'windows', {})
+        stats['window_requests'] = sum(w.requests for w in windows.values())
+        stats['window_rows'] = sum(w.rows_fetched for w in windows.values())
+        return stats
 
     def load_data(self, asset_config, days=30):
         """
@@ -33,107 +120,38 @@ class DataLoader:
         symbol = asset_config['symbol']
         source = asset_config.get('source', 'exchange')
         exchange_id = asset_config.get('exchange_id', self.default_exchange_id)
-        
+
         print(f"[DataLoader] Loading data for {symbol} (Source: {source}, Exchange: {exchange_id})...")
-        
-        if source == 'exchange':
-            return self._fetch_from_exchange(symbol, exchange_id, days=days)
-        elif source == 'csv':
-            return self._load_from_csv(asset_config.get('csv_path'), days=days)
-        else:
-            return pd.DataFrame()
+
+        backend = self._source(source)
+        if not backend: return pd.DataFrame()
+        return backend.load(asset_config, days=days)
+
+    def iter_candles(self, asset_config, days=30, chunk_size=100_000):
+        """
+        Streams historical data in chunks (Backtester.run_streaming). Backends
+        that can read incrementally (CSV, Parquet, synthetic) never hold the
+        full history in memory.
+        """
+        backend = self._source(asset_config.get('source', 'exchange'))
+        if not backend: return iter(())
+        return backend.iter_chunks(asset_config, days=days, chunk_size=chunk_size)
 
     def fetch_latest_candles(self, asset_config, limit=200, timeframe='1h'):
         """
         Fetches just enough recent history to calc indicators (Real-Time Mode).
+        Exchange assets are served from an in-memory rolling window that only
+        downloads candles newer than the last stored one.
         """
-        symbol = asset_config['symbol']
-        source = asset_config.get('source', 'exchange')
-        exchange_id = asset_config.get('exchange_id', self.default_exchange_id)
-        
-        if source == 'exchange':
-            exchange = self._get_exchange(exchange_id)
-            if not exchange: return pd.DataFrame()
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df.set_index('datetime', inplace=True)
-                cols = ['open', 'high', 'low', 'close', 'volume']
-                df[cols] = df[cols].apply(pd.to_numeric)
-                return df
-            except Exception as e:
-                print(f"[Error] Fetch latest failed for {symbol}: {e}")
-                return pd.DataFrame()
-                
-        elif source == 'csv':
-            # return tail of CSV
-            return self._load_from_csv(asset_config.get('csv_path'), rows=limit)
-            
-        return pd.DataFrame()
+        backend = self._source(asset_config.get('source', 'exchange'))
+        if not backend: return pd.DataFrame()
+        return backend.latest(asset_config, limit=limit, timeframe=timeframe)
 
-    def _fetch_from_exchange(self, symbol, exchange_id, timeframe='1h', days=30):
-        """History Fetcher"""
-        exchange = self._get_exchange(exchange_id)
-        if not exchange: return pd.DataFrame()
-        
-        limit = 1000
-        since = int(exchange.milliseconds() - (days * 24 * 60 * 60 * 1000))
-        all_ohlcv = []
-        
-        print(f"   -> Fetching {days} days from {exchange_id}...")
-        while since < exchange.milliseconds():
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, int(since), limit)
-                if not ohlcv: break
-                all_ohlcv.extend(ohlcv)
-                since = ohlcv[-1][0] + 1
-                if len(ohlcv) < limit: break
-            except Exception as e:
-                print(f"   [Error] Fetch failed: {e}")
-                break
-                
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        if not df.empty:
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('datetime', inplace=True)
-            cols = ['open', 'high', 'low', 'close', 'volume']
-            df[cols] = df[cols].apply(pd.to_numeric)
-        return df
-
-    def _load_from_csv(self, filepath, days=None, rows=None):
-        """CSV Loader (Supports days or fixed row count)"""
-        if not filepath or not os.path.exists(filepath):
-            # Generate dummy if missing
-            return self._generate_dummy_data(days if days else 30)
-            
-        try:
-            df = pd.read_csv(filepath)
-            df.columns = [c.lower() for c in df.columns]
-            if 'date' in df.columns: df['datetime'] = pd.to_datetime(df['date'])
-            elif 'timestamp' in df.columns: df['datetime'] = pd.to_datetime(df['timestamp'])
-            df.set_index('datetime', inplace=True)
-            
-            if rows:
-                return df.iloc[-rows:]
-            elif days:
-                return df.iloc[-(days*24):]
-            return df
-        except:
-            return pd.DataFrame()
-
-    def _generate_dummy_data(self, days):
-        """Helper to prevent crashes if user hasn't uploaded CSV yet"""
-        import numpy as np
-        periods = days * 24
-        dates = pd.date_range(end=pd.Timestamp.now(), periods=periods, freq='h')
-        base = 150.0 
-        prices = base + np.cumsum(np.random.randn(periods))
-        
-        df = pd.DataFrame(index=dates)
-        df['close'] = prices
-        df['open'] = prices + np.random.randn(periods)
-        df['high'] = df[['open','close']].max(axis=1) + 1
-        df['low'] = df[['open','close']].min(axis=1) - 1
-        df['volume'] = 1000
-        return df
+    def fetch_candles_since(self, asset_config, since, timeframe='1h', limit=1000):
+        """
+        Fetches candles opened at or after `since` (ms). Used to backfill gaps
+        in streamed data after a reconnect.
+        """
+        backend = self._source(asset_config.get('source', 'exchange'))
+        if not backend: return pd.DataFrame()
+        return backend.since(asset_config, since, timeframe=timeframe, limit=limit)
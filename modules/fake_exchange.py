@@ -0,0 +1,237 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from modules.data_loader import timeframe_to_ms
+
+MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _unit_noise(seed, k):
+    """Deterministic U(-1, 1) per (seed, candle number): splitmix64, vectorized."""
+    with np.errstate(over='ignore'):
+        z = (k.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)) & MASK64
+        z = ((z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)) & MASK64
+        z = ((z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)) & MASK64
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53) * 2 - 1
+
+
+def synthetic_candles(symbol_seed, start_ts, count, tf_ms):
+    """
+    OHLCV rows for `count` candles from `start_ts`, a pure function of time:
+    any page of any symbol can be served without generating its history.
+    """
+    k = np.arange(count, dtype=np.int64) + start_ts // tf_ms
+    base = 50 + (symbol_seed % 1000)
+    phase = symbol_seed % 97
+    log_price = 0.08 * np.sin(k / 150 + phase) + 0.03 * np.sin(k / 23 + phase) + 0.004 * _unit_noise(symbol_seed, k)
+    close = base * np.exp(log_price)
+    open_ = base * np.exp(log_price - 0.003 * _unit_noise(symbol_seed + 1, k))
+    spread = close * (0.002 + 0.004 * np.abs(_unit_noise(symbol_seed + 2, k)))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = 100 + 50 * _unit_noise(symbol_seed + 3, k)
+    ts = k * tf_ms
+    return [[int(t), float(o), float(h), float(l), float(c), float(v)]
+            for t, o, h, l, c, v in zip(ts, open_, high, low, close, volume)]
+
+
+class FakeExchangeServer:
+    """
+    Local Stand-In Exchange (Load Testing)
+    HTTP service with the two calls the data path uses, so DataLoader can
+    point at it via asset_config['exchange_url'] (see FakeExchangeClient):
+    - GET /ohlcv?symbol=..&timeframe=1h&since=ms&limit=n  (CCXT rows, paginated)
+    - GET /markets, GET /stats
+    Candles come from `frames` ({symbol: OHLCV DataFrame}, e.g. cached
+    downloads) or are synthesized per symbol up to the current candle.
+
+    - latency / jitter: seconds added to every response
+    - error_rate: share of requests answered with HTTP 500
+    - rate_limit: requests per second over all clients (token bucket); excess gets 429
+    """
+    def __init__(self, symbols=(), frames=None, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, rate_limit=None, page_limit=1000, seed=0, clock=time.time):
+        self.frames = {s: self._rows(df) for s, df in (frames or {}).items()}
+        self.symbols = list(symbols) + [s for s in self.frames if s not in symbols]
+        self.seeds = {s: zlib.crc32(s.encode()) ^ seed for s in self.symbols}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.page_limit = page_limit
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit or 0)
+        self._refilled = time.monotonic()
+        # Stats
+        self.requests = 0
+        self.rows_served = 0
+        self.errors = 0
+        self.throttled = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self.url = f"http://{self.host}:{self.port}"
+        self._thread = None
+
+    @staticmethod
+    def _rows(df):
+        # Index resolution varies (ns, or ms / us for frames built by pandas 3): normalize to ms
+        stamps = df['timestamp'].astype('int64') if 'timestamp' in df.columns else df.index.as_unit('ms').asi8
+        return np.column_stack([np.asarray(stamps, dtype=float)] +
+                               [df[c].to_numpy(dtype=float) for c in ['open', 'high', 'low', 'close', 'volume']])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        return {'requests': self.requests, 'rows_served': self.rows_served,
+                'errors': self.errors, 'throttled': self.throttled}
+
+    def _admit(self):
+        """Token bucket: True if the request is within the rate limit."""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(float(self.rate_limit), self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        """CCXT fetch_ohlcv semantics: candles opened at or after `since`, or the latest `limit`."""
+        tf_ms = timeframe_to_ms(timeframe)
+        limit = min(limit or self.page_limit, self.page_limit)
+        if symbol in self.frames:
+            rows = self.frames[symbol]
+            if since is None:
+                rows = rows[-limit:]
+            else:
+                start = int(np.searchsorted(rows[:, 0], since))
+                rows = rows[start:start + limit]
+            return [[int(r[0])] + [float(v) for v in r[1:]] for r in rows]
+
+        now_ms = int(self.clock() * 1000)
+        last = now_ms - now_ms % tf_ms  # Forming candle
+        first = last - (limit - 1) * tf_ms if since is None else since + (-since % tf_ms)
+        count = min(limit, (last - first) // tf_ms + 1)
+        if count <= 0:
+            return []
+        return synthetic_candles(self.seeds[symbol], first, count, tf_ms)
+
+    def _handler_class(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+                with exchange._lock:
+                    exchange.requests += 1
+                    admitted = exchange._admit()
+                    failed = exchange._random.random() < exchange.error_rate
+                    delay = exchange.latency + exchange._random.uniform(0, exchange.jitter)
+                if delay:
+                    time.sleep(delay)
+
+                if url.path == '/stats':
+                    return self._reply(200, exchange.stats())
+                if url.path == '/markets':
+                    return self._reply(200, exchange.symbols)
+                if url.path != '/ohlcv':
+                    return self._reply(404, {'error': f"unknown endpoint {url.path}"})
+                if not admitted:
+                    with exchange._lock:
+                        exchange.throttled += 1
+                    return self._reply(429, {'error': 'rate limit exceeded'})
+                if failed:
+                    with exchange._lock:
+                        exchange.errors += 1
+                    return self._reply(500, {'error': 'injected failure'})
+                symbol = query.get('symbol')
+                if symbol not in exchange.seeds:
+                    return self._reply(404, {'error': f"unknown symbol {symbol}"})
+                rows = exchange.ohlcv(symbol, query.get('timeframe', '1h'),
+                                      int(query['since']) if 'since' in query else None,
+                                      int(query['limit']) if 'limit' in query else None)
+                with exchange._lock:
+                    exchange.rows_served += len(rows)
+                self._reply(200, rows)
+
+        return Handler
+
+
+class FakeExchangeError(Exception):
+    pass
+
+
+class RateLimitExceeded(FakeExchangeError):
+    pass
+
+
+class FakeExchangeClient:
+    """
+    CCXT-shaped client for FakeExchangeServer (fetch_ohlcv, milliseconds).
+    ExchangeSource uses it for assets with an 'exchange_url'.
+    """
+    def __init__(self, url, timeout=10.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.id = self.url
+
+    def milliseconds(self):
+        return int(time.time() * 1000)
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        params = {'symbol': symbol, 'timeframe': timeframe}
+        if since is not None:
+            params['since'] = int(since)
+        if limit is not None:
+            params['limit'] = int(limit)
+        try:
+            with urllib.request.urlopen(f"{self.url}/ohlcv?{urllib.parse.urlencode(params)}",
+                                        timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise RateLimitExceeded(f"{self.url}: rate limit exceeded") from None
+            raise FakeExchangeError(f"{self.url}: HTTP {e.code} for {symbol}") from None
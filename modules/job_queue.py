@@ -0,0 +1,312 @@
+import contextlib
+import hashlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import pandas as pd
+
+import config
+
+QUEUE_DIRS = ('pending', 'running', 'done', 'failed')
+DEFAULT_RUNNER = 'modules.job_queue:run_backtest_task'
+
+
+def task_id(task):
+    """Stable id from what the task computes, so a resubmitted study maps to the same ids."""
+    key = {k: task.get(k) for k in ('symbol', 'days', 'strategy_params', 'risk_params', 'window')}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def plan_sweep(assets, param_grid, windows=(None,), days=30, risk_params=None):
+    """
+    One task per (asset, parameter combination, window).
+    param_grid: {'base_grid_step_pct': [0.005, 0.01], ...} (cartesian product over STRATEGY_PARAMS)
+    windows: (start, end) row positions or date strings per task, None = all candles
+    """
+    tasks = []
+    for asset in assets:
+        for combo in itertools.product(*param_grid.values()):
+            for window in windows:
+                task = {
+                    'symbol': asset['symbol'],
+                    'asset': asset,
+                    'days': days,
+                    'strategy_params': {**config.STRATEGY_PARAMS, **dict(zip(param_grid, combo))},
+                    'risk_params': dict(risk_params if risk_params is not None else config.RISK_PARAMS),
+                    'window': list(window) if window is not None else None,
+                }
+                task['id'] = task_id(task)
+                tasks.append(task)
+    return tasks
+
+
+def _write_json(path, payload):
+    """Atomic write (tmp + rename): readers never see partial files."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+class JobQueue:
+    """
+    Shared-Directory Job Queue (Sweeps)
+    One JSON file per task, moved between pending/ running/ done/ failed/.
+    Workers claim a task by renaming it into running/ (atomic, so exactly one
+    worker wins, also on NFS), keep its mtime fresh while they work, and
+    write the result to done/. Results double as checkpoints: resubmitting a
+    study skips finished tasks, and tasks whose worker died (stale mtime)
+    are requeued. Any host that mounts `root` can run workers.
+    """
+    def __init__(self, root, lease_timeout=300, max_attempts=3):
+        self.root = root
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        for name in QUEUE_DIRS:
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def _path(self, state, tid):
+        return os.path.join(self.root, state, f"{tid}.json")
+
+    def _ids(self, state):
+        return sorted(f[:-5] for f in os.listdir(os.path.join(self.root, state)) if f.endswith('.json'))
+
+    def submit(self, tasks):
+        """Queues tasks not already pending, running or done. Returns the number queued."""
+        known = set(self._ids('pending')) | set(self._ids('running')) | set(self._ids('done'))
+        queued = 0
+        for task in tasks:
+            tid = task.setdefault('id', task_id(task))
+            if tid in known:
+                continue
+            task.setdefault('attempts', 0)
+            _write_json(self._path('pending', tid), task)
+            known.add(tid)
+            queued += 1
+        return queued
+
+    def claim(self):
+        """Next pending task (moved to running/), or None."""
+        for tid in self._ids('pending'):
+            try:
+                # Fresh mtime before the move: rename keeps it, so the lease starts valid
+                os.utime(self._path('pending', tid))
+                os.rename(self._path('pending', tid), self._path('running', tid))
+                with open(self._path('running', tid)) as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue  # Another worker was faster (or requeued it right away)
+        return None
+
+    def heartbeat(self, tid):
+        """Renews the lease of a running task."""
+        os.utime(self._path('running', tid))
+
+    def complete(self, task, result, worker_id=None):
+        _write_json(self._path('done', task['id']), {
+            'task': task, 'result': result, 'worker': worker_id, 'finished': time.time()
+        })
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path('running', task['id']))
+
+    def fail(self, task, error):
+        """Retries up to max_attempts, then parks the task in failed/."""
+        task['attempts'] = task.get('attempts', 0) + 1
+        task['error'] = error
+        state = 'pending' if task['attempts'] < self.max_attempts else 'failed'
+        _write_json(self._path(state, task['id']), task)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path('running', task['id']))
+
+    def requeue_stale(self):
+        """
+        Tasks with an expired lease (worker died) count as a failed attempt:
+        back to pending, or to failed/ after max_attempts, so a task that
+        crashes its worker cannot loop forever.
+        """
+        requeued = 0
+        now = time.time()
+        for tid in self._ids('running'):
+            path = self._path('running', tid)
+            stale = f"{path}.stale-{os.getpid()}"
+            try:
+                if now - os.path.getmtime(path) <= self.lease_timeout:
+                    continue
+                os.rename(path, stale)  # Exactly one worker handles each stale task
+            except FileNotFoundError:
+                continue
+            with open(stale) as f:
+                task = json.load(f)
+            self.fail(task, f"lease expired after {self.lease_timeout}s (worker died?)")
+            os.remove(stale)
+            requeued += 1
+        return requeued
+
+    def status(self):
+        return {state: len(self._ids(state)) for state in QUEUE_DIRS}
+
+    def idle(self):
+        status = self.status()
+        return status['pending'] == 0 and status['running'] == 0
+
+    def results(self):
+        """Finished tasks as a DataFrame: task parameters + result columns."""
+        rows = []
+        for tid in self._ids('done'):
+            with open(self._path('done', tid)) as f:
+                record = json.load(f)
+            task = record['task']
+            row = {'id': tid, 'symbol': task['symbol'], 'window': task['window'], 'worker': record['worker']}
+            row.update({f"param:{k}": v for k, v in task['strategy_params'].items()})
+            row.update(record['result'])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class SweepWorker:
+    """
+    Pulls tasks from a JobQueue until it is drained. `runner` is a
+    "module:function" taking a task dict and returning a JSON-able dict.
+    """
+    def __init__(self, queue, worker_id=None, runner=DEFAULT_RUNNER, poll_interval=1.0, quiet=True):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        module_name, func_name = runner.split(':')
+        self.runner = getattr(importlib.import_module(module_name), func_name)
+        self.poll_interval = poll_interval
+        self.quiet = quiet  # Silence the per-bar engine prints
+        self.completed = 0
+
+    def run(self, max_tasks=None, exit_when_idle=True):
+        while max_tasks is None or self.completed < max_tasks:
+            self.queue.requeue_stale()
+            task = self.queue.claim()
+            if task is None:
+                if exit_when_idle and self.queue.idle():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self._execute(task)
+        return self.completed
+
+    def _execute(self, task):
+        done = threading.Event()
+
+        def keep_lease():
+            while not done.wait(self.queue.lease_timeout / 3):
+                with contextlib.suppress(FileNotFoundError):
+                    self.queue.heartbeat(task['id'])
+
+        lease = threading.Thread(target=keep_lease, daemon=True)
+        lease.start()
+        try:
+            with open(os.devnull, 'w') as sink, \
+                    (contextlib.redirect_stdout(sink) if self.quiet else contextlib.nullcontext()):
+                result = self.runner(task)
+        except Exception as e:
+            print(f"[Sweep] Task {task['id']} ({task.get('symbol')}) failed on {self.worker_id}: {e}")
+            self.queue.fail(task, repr(e))
+        else:
+            self.queue.complete(task, result, self.worker_id)
+            self.completed += 1
+        finally:
+            done.set()
+            lease.join()
+
+
+_DATA_CACHE = {}
+# (symbol, days) -> SharedOHLCVRegistry handle, set in workers started by run_local_workers
+_SHARED_DATA = {}
+
+
+def task_data(task):
+    """
+    Candles for a task: a zero-copy view of the data run_local_workers
+    published, else loaded once per worker process (remote hosts).
+    """
+    from modules.data_loader import DataLoader
+    from modules.shared_data import attach
+
+    key = (task['symbol'], task['days'])
+    if key in _SHARED_DATA:
+        return attach(_SHARED_DATA[key]).frame()
+    if key not in _DATA_CACHE:
+        _DATA_CACHE[key] = DataLoader(default_exchange_id=config.EXCHANGE_ID).load_data(task['asset'], days=task['days'])
+    return _DATA_CACHE[key]
+
+
+def run_backtest_task(task):
+    """Default runner: one Backtester run on task_data(task)."""
+    from modules.backtester import Backtester
+    from modules.risk_manager import RiskManager
+    from modules.strategy_engine import StrategyEngine
+
+    data = task_data(task)
+    if task['window'] is not None:
+        start, end = task['window']
+        data = data.iloc[start:end] if isinstance(start, int) or isinstance(end, int) else data.loc[start:end]
+    if data.empty:
+        raise ValueError(f"No data for {task['symbol']} in window {task['window']}")
+
+    strategy = StrategyEngine(task['symbol'], RiskManager(task['risk_params']), config_override=task['strategy_params'])
+    backtester = Backtester(strategy)
+    backtester.run(data.copy())
+    stats = {k: float(v) for k, v in backtester.stats().items()}
+    stats['Final Equity'] = float(backtester.equity_curve[-1]['equity'])
+    return stats
+
+
+def _worker_main(root, runner, lease_timeout, max_tasks, shared=None):
+    _SHARED_DATA.update(shared or {})
+    SweepWorker(JobQueue(root, lease_timeout=lease_timeout), runner=runner).run(max_tasks=max_tasks)
+
+
+def _publish_pending(queue, registry):
+    """Loads the data of every pending task once and publishes it. Returns {(symbol, days): handle}."""
+    from modules.data_loader import DataLoader
+
+    loader = DataLoader(default_exchange_id=config.EXCHANGE_ID)
+    handles = {}
+    for tid in queue._ids('pending'):
+        try:
+            with open(queue._path('pending', tid)) as f:
+                task = json.load(f)
+        except FileNotFoundError:
+            continue  # Claimed meanwhile (workers on other hosts)
+        key = (task['symbol'], task['days'])
+        if key in handles or task['symbol'] in registry:
+            continue  # Same symbol over other days: those workers load it themselves
+        handle = registry.load(loader, task['asset'], days=task['days'])
+        if handle is not None:
+            handles[key] = handle
+    return handles
+
+
+def run_local_workers(root, workers=4, runner=DEFAULT_RUNNER, lease_timeout=300, max_tasks=None, share_data=None):
+    """
+    Drains the queue with `workers` local processes (more can join from other hosts).
+    With share_data (default: for the built-in backtest runner) the candles
+    of the pending tasks are loaded once here and shared read-only with the
+    workers (see modules.shared_data) instead of being loaded by each of them.
+    """
+    from modules.shared_data import SharedOHLCVRegistry
+
+    if share_data is None:
+        share_data = runner == DEFAULT_RUNNER
+    ctx = multiprocessing.get_context('spawn')
+    with SharedOHLCVRegistry() as registry:
+        shared = _publish_pending(JobQueue(root, lease_timeout=lease_timeout), registry) if share_data else {}
+        procs = [ctx.Process(target=_worker_main, args=(root, runner, lease_timeout, max_tasks, shared),
+                             name=f"sweep-{i}")
+                 for i in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    return [p.exitcode for p in procs]
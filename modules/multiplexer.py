@@ -0,0 +1,155 @@
+import os
+import signal
+import time
+
+import pandas as pd
+
+import config
+from modules.data_loader import DataLoader
+from modules.paper_trader import PaperTrader, logger
+from modules.scheduler import CycleScheduler
+
+
+class PaperMultiplexer:
+    """
+    Strategy Multiplexer (Paper Mode)
+    Runs N named strategy/risk configurations per symbol in one process.
+    Each cycle fetches every symbol once and computes indicators once per
+    distinct indicator window; every variant then trades its own isolated
+    sub-portfolio (own RiskManager, own state file in the regular format).
+    The shared fetch goes through one CycleScheduler, so the stale-data /
+    slow-fetch guards apply to all variants at once.
+    """
+    def __init__(self, variants, max_days=None, state_dir='data', assets=None, loader=None, clock=time.time,
+                 poll_interval=60, scheduler_params=None):
+        self.assets = assets if assets is not None else config.PORTFOLIO_CONFIG
+        self.loader = loader if loader is not None else DataLoader(default_exchange_id=config.EXCHANGE_ID)
+        self.max_days = max_days
+        self.clock = clock
+        self.poll_interval = poll_interval  # Seconds between polling cycles
+        self.scheduler = CycleScheduler(clock=clock,
+                                        **(scheduler_params if scheduler_params is not None else config.SCHEDULER_PARAMS))
+        self.start_time = self.clock()
+        self.running = True
+
+        self.traders = {}
+        for variant in variants:
+            name = variant['name']
+            if name in self.traders:
+                raise ValueError(f"Duplicate strategy variant name: {name}")
+            strategy_params = {**config.STRATEGY_PARAMS, **variant.get('strategy_params', {})}
+            risk_params = {**config.RISK_PARAMS, **variant.get('risk_params', {})}
+            trader = PaperTrader(
+                state_file=os.path.join(state_dir, f"paper_portfolio_{name}.json"),
+                assets=self.assets,
+                loader=self.loader,
+                clock=clock,
+                strategy_params=strategy_params,
+                risk_params=risk_params,
+                name=name
+            )
+            trader.autosave = False  # Saved once per cycle by the multiplexer
+            self.traders[name] = trader
+
+        # Largest indicator window decides how much history one fetch needs
+        self.fetch_limit = max([200] + [t.strategies[a['symbol']].config['trend_ma_period'] + 1
+                                        for t in self.traders.values() for a in self.assets])
+
+        # Replace the per-trader handlers: one shutdown for all variants
+        signal.signal(signal.SIGINT, self.terminate)
+        signal.signal(signal.SIGTERM, self.terminate)
+        logger.info(f"Multiplexing {len(self.traders)} strategy variants: {list(self.traders)}")
+
+    def terminate(self, signum, frame):
+        logger.info("Signal received. Shutting down gracefully...")
+        self.running = False
+
+    def run(self):
+        logger.info(f"=== Starting Multiplexed Paper Trading Loop ===")
+        try:
+            while self.running:
+                if self.max_days:
+                    elapsed_days = (self.clock() - self.start_time) / (24 * 3600)
+                    if elapsed_days >= self.max_days:
+                        logger.info(f"Max duration ({self.max_days} days) reached. Stopping.")
+                        break
+
+                self._run_cycle()
+                logger.info("--- Cycle complete ---\n" + self.report().to_string(index=False, float_format="%.2f"))
+
+                # Sleep in chunks of at most 1s to allow faster interrupt
+                wake = time.monotonic() + self.poll_interval
+                while self.running and (remaining := wake - time.monotonic()) > 0:
+                    time.sleep(min(1.0, remaining))
+        except KeyboardInterrupt:
+            logger.info("Paper Trading Stopped (KeyboardInterrupt).")
+        finally:
+            self._save_state(final=True)
+            logger.info("Multiplexed Paper Trader Shutdown Complete.")
+
+    def _run_cycle(self):
+        plan = self.scheduler.plan(self.assets)
+        for i, asset_conf in enumerate(plan):
+            if not self.scheduler.within_budget():
+                self.scheduler.defer(plan[i:])
+                logger.warning(f"Cycle budget exhausted. Deferring {len(plan) - i} assets to the next cycle.")
+                break
+            self._process_asset(asset_conf)
+        for trader in self.traders.values():
+            trader._end_cycle()
+        self._save_state()
+
+    def _process_asset(self, asset_conf):
+        symbol = asset_conf['symbol']
+
+        # 1. One fetch shared by all variants
+        started = self.scheduler.timer()
+        df = self.loader.fetch_latest_candles(asset_conf, limit=self.fetch_limit)
+        problem = self.scheduler.record_fetch(symbol, started, df)
+        if df.empty:
+            logger.warning(f"[{symbol}] No data received.")
+            return
+
+        # 2. Variant-local fills
+        last = df.iloc[-1]
+        for trader in self.traders.values():
+            trader._check_fills(symbol, last['high'], last['low'], last['close'])
+
+        # 3. Variant-local signals (only on fresh, timely data)
+        if problem:
+            logger.warning(f"[{symbol}] Skipping signal for all variants: {problem}")
+            return
+        slices = {}
+        for trader in self.traders.values():
+            strategy = trader.strategies[symbol]
+            # One indicator pass per distinct (ATR, SMA) window
+            key = (strategy.config['min_atr_period'], strategy.config['trend_ma_period'])
+            if key not in slices:
+                slices[key] = strategy.add_indicators(df.copy()).iloc[-1]
+            trader._evaluate_signal(symbol, df, latest_slice=slices[key])
+
+    def _save_state(self, final=False):
+        for trader in self.traders.values():
+            trader._save_state(final)
+
+    def report(self):
+        """Per-variant sub-portfolio summary."""
+        rows = []
+        for name, trader in self.traders.items():
+            initial = equity = fees = 0.0
+            trades = 0
+            for asset in self.assets:
+                state = trader.portfolio[asset['symbol']]
+                stats = trader.trade_stats[asset['symbol']]
+                initial += config.PAPER_INITIAL_BALANCE
+                equity += state.get('equity', state['balance'])
+                trades += stats.trades
+                fees += stats.fees
+            rows.append({
+                'Variant': name,
+                'Equity $': equity,
+                'Return %': (equity - initial) / initial * 100 if initial else 0.0,
+                'Trades': trades,
+                'Fees $': fees
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,165 @@
+from array import array
+from enum import IntEnum
+
+import numpy as np
+
+
+class Side(IntEnum):
+    """Order side. The value is the inventory sign (+1 buy, -1 sell)."""
+    BUY = 1
+    SELL = -1
+
+    @property
+    def label(self):
+        return 'buy' if self is Side.BUY else 'sell'
+
+    @classmethod
+    def parse(cls, value):
+        """Side from a Side, 'buy'/'sell' or +1/-1."""
+        if isinstance(value, str):
+            return cls.BUY if value.lower() == 'buy' else cls.SELL
+        return cls(value)
+
+
+class Order:
+    """Resting limit order."""
+    __slots__ = ('side', 'price', 'size')
+
+    def __init__(self, side, price, size):
+        self.side = side
+        self.price = price
+        self.size = size
+
+    def __eq__(self, other):
+        return isinstance(other, Order) and (self.side, self.price, self.size) == (other.side, other.price, other.size)
+
+    def __repr__(self):
+        return f"Order({self.side.label}, {self.price:.4f}, {self.size:.6f})"
+
+    def to_dict(self):
+        return {'side': self.side.label, 'price': float(self.price), 'size': float(self.size)}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(Side.parse(d['side']), d['price'], d['size'])
+
+
+class Fill:
+    """
+    Executed trade. `time` is an integer: ns since epoch (bar number for
+    backtests on data without a datetime index).
+    """
+    __slots__ = ('time', 'side', 'price', 'size', 'fee')
+
+    def __init__(self, time, side, price, size, fee):
+        self.time = time
+        self.side = side
+        self.price = price
+        self.size = size
+        self.fee = fee
+
+    def _key(self):
+        return (self.time, self.side, self.price, self.size, self.fee)
+
+    def __eq__(self, other):
+        return isinstance(other, Fill) and self._key() == other._key()
+
+    def __repr__(self):
+        return f"Fill({self.time}, {self.side.label}, {self.price:.4f}, {self.size:.6f}, fee={self.fee:.4f})"
+
+    def to_dict(self, time_format=None):
+        """JSON-ready dict; `time_format` (callable) converts the integer time."""
+        return {
+            'side': self.side.label,
+            'price': float(self.price),
+            'size': float(self.size),
+            'fee': float(self.fee),
+            'time': time_format(self.time) if time_format else int(self.time)
+        }
+
+    @classmethod
+    def from_dict(cls, d, time_parse=None):
+        return cls(time_parse(d['time']) if time_parse else int(d['time']), Side.parse(d['side']),
+                   d['price'], d['size'], d['fee'])
+
+
+class FillLog:
+    """
+    Append-only trade ledger in typed arrays (33 bytes per fill instead of a
+    dict each). Indexing and iteration hand out Fill objects; columns() gives
+    zero-copy NumPy views for analytics.
+    """
+    __slots__ = ('times', 'sides', 'prices', 'sizes', 'fees')
+
+    def __init__(self):
+        self.times = array('q')
+        self.sides = array('b')
+        self.prices = array('d')
+        self.sizes = array('d')
+        self.fees = array('d')
+
+    def append(self, fill):
+        self.times.append(fill.time)
+        self.sides.append(fill.side)
+        self.prices.append(fill.price)
+        self.sizes.append(fill.size)
+        self.fees.append(fill.fee)
+
+    def _fill(self, i):
+        return Fill(self.times[i], Side(self.sides[i]), self.prices[i], self.sizes[i], self.fees[i])
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._fill(j) for j in range(*i.indices(len(self)))]
+        return self._fill(i)
+
+    def __iter__(self):
+        return (self._fill(i) for i in range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, FillLog):
+            return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+        return list(self) == list(other)
+
+    def columns(self):
+        """Dict of NumPy arrays in the modules.analytics trade format."""
+        if not len(self):
+            return {'time': np.zeros(0, dtype=np.int64), 'is_buy': np.zeros(0, dtype=bool),
+                    'price': np.zeros(0), 'size': np.zeros(0), 'fee': np.zeros(0)}
+        return {
+            'time': np.frombuffer(self.times, dtype=np.int64),
+            'is_buy': np.frombuffer(self.sides, dtype=np.int8) > 0,
+            'price': np.frombuffer(self.prices, dtype=np.float64),
+            'size': np.frombuffer(self.sizes, dtype=np.float64),
+            'fee': np.frombuffer(self.fees, dtype=np.float64),
+        }
+
+
+class Signal:
+    """
+    Strategy output for one bar. Grid levels are NumPy arrays. Supports
+    read access by key (`signal['buy_levels']`, `signal.get('action')`).
+    """
+    __slots__ = ('action', 'buy_levels', 'sell_levels', 'suggested_size_per_grid', 'trend')
+
+    def __init__(self, action, buy_levels, sell_levels, suggested_size_per_grid, trend):
+        self.action = action
+        self.buy_levels = buy_levels
+        self.sell_levels = sell_levels
+        self.suggested_size_per_grid = suggested_size_per_grid
+        self.trend = trend
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __repr__(self):
+        return (f"Signal({self.action}, trend={self.trend}, buys={len(self.buy_levels)}, "
+                f"sells={len(self.sell_levels)}, size={self.suggested_size_per_grid:.6f})")
@@ -10,6 +10,11 @@ import config
 from modules.risk_manager import RiskManager
 from modules.strategy_engine import StrategyEngine
 from modules.data_loader import DataLoader
+from modules.orders import Fill, Order, Side
+from modules.portfolio_risk import PortfolioRisk
+from modules.retention import TieredSeries, TradeStats
+from modules.scheduler import CycleScheduler
+from modules.stop_book import StopBook
 
 # Setup Logging
 os.makedirs('logs', exist_ok=True)
@@ -23,18 +28,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger('PaperTrader')
 
+def _format_time(ns):
+    """Fill time (int ns) -> the local-time string stored in state files."""
+    return str(datetime.fromtimestamp(ns / 1e9))
+
+def _parse_time(value):
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp() * 1e9)
+    return int(value)
+
+def sidecar_path(state_file, kind):
+    """Companion file next to the state file ('data/paper_portfolio.json' -> 'data/paper_portfolio_risk.json')."""
+    root, ext = os.path.splitext(state_file)
+    return f"{root}_{kind}{ext or '.json'}"
+
+def _write_json(path, payload):
+    """Atomic write (tmp + rename)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
 class PaperTrader:
     """
     Paper Trading Environment
     Simulates real-time trading with persistent state.
     """
-    def __init__(self, max_days=None):
-        self.state_file = 'data/paper_portfolio.json'
+    def __init__(self, max_days=None, state_file='data/paper_portfolio.json', assets=None, loader=None, clock=time.time,
+                 strategy_params=None, risk_params=None, name=None, poll_interval=60,
+                 scheduler_params=None, portfolio_risk_params=None, retention_params=None):
+        self.state_file = state_file
+        self.name = name  # Variant label in logs (multiplexed runs)
         self.portfolio = self._load_state()
         self.running = True
         self.max_days = max_days
-        self.start_time = time.time()
+        self.assets = assets if assets is not None else config.PORTFOLIO_CONFIG
+        self.clock = clock  # Wall clock by default; a simulated clock in replay mode
+        self.autosave = True  # Persist after every cycle / fill (replay saves once at the end)
+        self._in_cycle = False  # Fills inside a polling cycle are saved once, at the end of the cycle
+        self.poll_interval = poll_interval  # Seconds between polling cycles
+        self.start_time = self.clock()
         self.last_log_time = 0
+        self.feed = None
         
         # Signal Handlers
         signal.signal(signal.SIGINT, self.terminate)
@@ -42,17 +77,30 @@ class PaperTrader:
         
         # Initialize Modules
         logger.info("Initializing Paper Trader modules...")
-        self.loader = DataLoader(default_exchange_id=config.EXCHANGE_ID)
-        self.risk_manager = RiskManager(config.RISK_PARAMS)
+        self.loader = loader if loader is not None else DataLoader(default_exchange_id=config.EXCHANGE_ID)
+        self.risk_manager = RiskManager(risk_params if risk_params is not None else config.RISK_PARAMS)
+        self._load_risk_state()
+        self.scheduler = CycleScheduler(clock=self.clock,
+                                        **(scheduler_params if scheduler_params is not None else config.SCHEDULER_PARAMS))
+        self.portfolio_risk = PortfolioRisk(
+            [a['symbol'] for a in self.assets],
+            **(portfolio_risk_params if portfolio_risk_params is not None else config.PORTFOLIO_RISK_PARAMS))
+        self._risk_history = {}  # First candle window per symbol, to warm up the covariance
+        self.retention = {**config.RETENTION_PARAMS, **(retention_params or {})}
         
         # Strategy Instances (One per asset)
         self.strategies = {}
-        for asset in config.PORTFOLIO_CONFIG:
+        self.stop_books = {}  # Open buy lots with ATR stops, per asset
+        self._last_atr = {}
+        self.trade_stats = {}  # Running aggregates over all fills, incl. those past trade retention
+        self.equity_history = self._load_history()  # Tiered equity points / OHLC bars, per asset
+        self._history_saved_at = self.clock()
+        for asset in self.assets:
             symbol = asset['symbol']
             self.strategies[symbol] = StrategyEngine(
                 symbol=symbol, 
                 risk_manager=self.risk_manager,
-                config_override=config.STRATEGY_PARAMS
+                config_override=strategy_params if strategy_params is not None else config.STRATEGY_PARAMS
             )
             
             # Init empty state for new assets
@@ -63,63 +111,143 @@ class PaperTrader:
                     'active_orders': [],
                     'trades': []
                 }
+            state = self.portfolio[symbol]
+            self.stop_books[symbol] = StopBook.from_snapshot(state.pop('stop_lots', []))
+            stats = state.pop('trade_stats', None)
+            self.trade_stats[symbol] = TradeStats.from_state(stats) if stats else TradeStats.from_fills(state['trades'])
+            if symbol not in self.equity_history:
+                self.equity_history[symbol] = TieredSeries(self.retention['equity_tiers'])
         self._save_state()
         logger.info("Initialization Complete.")
 
     def terminate(self, signum, frame):
         logger.info("Signal received. Shutting down gracefully...")
         self.running = False
+        if self.feed is not None:
+            self.feed.close()
 
     def run(self):
         logger.info(f"=== Starting Paper Trading Loop ===")
         if self.max_days:
             logger.info(f"Auto-Stop enabled: {self.max_days} days")
             
-        assets = [a['symbol'] for a in config.PORTFOLIO_CONFIG]
+        assets = [a['symbol'] for a in self.assets]
         logger.info(f"Monitoring Assets: {assets}")
         
         try:
             while self.running:
                 # Check Duration
                 if self.max_days:
-                    elapsed_days = (time.time() - self.start_time) / (24 * 3600)
+                    elapsed_days = (self.clock() - self.start_time) / (24 * 3600)
                     if elapsed_days >= self.max_days:
                         logger.info(f"Max duration ({self.max_days} days) reached. Stopping.")
                         break
 
-                cur_time = time.time()
+                cur_time = self.clock()
                 # Log Status every 10s
                 if cur_time - self.last_log_time > 10:
-                    logger.info(f"--- Heartbeat: {datetime.now().strftime('%H:%M:%S')} ---")
+                    stats = self.loader.cache_stats()
+                    logger.info(f"--- Heartbeat: {datetime.now().strftime('%H:%M:%S')} | "
+                                f"Cache hits: {stats['hits']} misses: {stats['misses']} saved: {stats['saved_requests']} | "
+                                f"Candles downloaded: {stats.get('window_rows', 0)} ---")
+                    latency = self.scheduler.latency_report()
+                    if not latency.empty:
+                        slowest = latency.sort_values('p90 ms', ascending=False).iloc[0]
+                        logger.info(f"--- Fetch latency p90 (slowest): {slowest['Symbol']} {slowest['p90 ms']:.0f}ms | "
+                                    f"Stale: {latency['Stale'].sum()} Slow: {latency['Slow'].sum()} ---")
+                    if len(self.portfolio_risk) >= self.portfolio_risk.min_periods:
+                        logger.info(f"--- Portfolio vol: {self.portfolio_risk.portfolio_volatility()*100:.1f}% | "
+                                    f"Size scale: {self.risk_manager.portfolio_scale:.2f} ---")
                     self.last_log_time = cur_time
 
-                for asset_conf in config.PORTFOLIO_CONFIG:
-                    self._process_asset(asset_conf)
-                
-                self._save_state()
-                
-                # Sleep in chunks to allow faster interrupt
-                # Sleep 60s total, check every 1s
-                for _ in range(60): 
-                    if not self.running: break
-                    time.sleep(1)
+                self._run_cycle()
+                self._sleep(self.poll_interval)
                 
         except KeyboardInterrupt:
             logger.info("Paper Trading Stopped (KeyboardInterrupt).")
         except Exception as e:
             logger.error(f"Critical Error in Main Loop: {e}")
         finally:
-            self._save_state()
+            self._save_state(final=True)
             logger.info("Paper Trader Shutdown Complete.")
             sys.exit(0)
 
+    def _sleep(self, seconds):
+        """Sleeps in chunks of at most 1s to allow faster interrupt."""
+        wake = time.monotonic() + seconds
+        while self.running:
+            remaining = wake - time.monotonic()
+            if remaining <= 0: break
+            time.sleep(min(1.0, remaining))
+
+    def run_stream(self, feed):
+        """
+        Streaming Mode: consumes a push feed (see modules.stream_feed) instead
+        of polling. Fills are checked on every price update, the strategy is
+        evaluated when a candle closes.
+        """
+        logger.info(f"=== Starting Streaming Paper Trading ({feed.host}:{feed.port}) ===")
+        self.feed = feed
+        feed.prime()
+
+        try:
+            for event in feed.events():
+                if not self.running:
+                    break
+                if self.max_days:
+                    elapsed_days = (self.clock() - self.start_time) / (24 * 3600)
+                    if elapsed_days >= self.max_days:
+                        logger.info(f"Max duration ({self.max_days} days) reached. Stopping.")
+                        break
+                if event.symbol not in self.strategies:
+                    continue
+
+                if event.kind == 'tick':
+                    # Trade price is exact: it is both the high and the low of the update
+                    self._check_fills(event.symbol, event.price, event.price, event.price)
+                    self.portfolio[event.symbol]['last_price'] = event.price
+                elif event.kind == 'candle':
+                    self._evaluate_signal(event.symbol, event.frame)
+                    self._apply_retention()
+                    self._save_state()
+        except KeyboardInterrupt:
+            logger.info("Paper Trading Stopped (KeyboardInterrupt).")
+        finally:
+            feed.close()
+            self._save_state(final=True)
+            logger.info("Streaming Paper Trader Shutdown Complete.")
+
+    def _run_cycle(self):
+        """One polling pass over the portfolio (within the scheduler's cycle budget)."""
+        plan = self.scheduler.plan(self.assets)
+        self._in_cycle = True
+        try:
+            for i, asset_conf in enumerate(plan):
+                if not self.scheduler.within_budget():
+                    self.scheduler.defer(plan[i:])
+                    logger.warning(f"Cycle budget exhausted. Deferring {len(plan) - i} assets to the next cycle.")
+                    break
+                self._process_asset(asset_conf)
+        finally:
+            self._in_cycle = False
+        self._end_cycle()
+
+    def _end_cycle(self):
+        """Bookkeeping after each polling pass (also called by the multiplexer)."""
+        # Symbols that returned no data must not hold back the covariance warm-up
+        if self._risk_history:
+            self._warm_up_portfolio_risk()
+        self._apply_retention()
+        if self.autosave:
+            self._save_state()
+
     def _process_asset(self, asset_conf):
         symbol = asset_conf['symbol']
-        state = self.portfolio[symbol]
-        strategy = self.strategies[symbol]
         
         # 1. Fetch Latest Data
+        started = self.scheduler.timer()
         df = self.loader.fetch_latest_candles(asset_conf, limit=200)
+        problem = self.scheduler.record_fetch(symbol, started, df)
         if df.empty:
             logger.warning(f"[{symbol}] No data received.")
             return
@@ -131,29 +259,51 @@ class PaperTrader:
         # 2. Check Fills
         self._check_fills(symbol, high, low, current_price)
         
-        # 3. Update Strategy
-        latest_slice = strategy.add_indicators(df).iloc[-1]
+        # 3. Update Strategy (only on fresh, timely data)
+        if problem:
+            logger.warning(f"[{self._tag(symbol)}] Skipping signal: {problem}")
+            return
+        self._evaluate_signal(symbol, df)
+
+    def _evaluate_signal(self, symbol, df, latest_slice=None):
+        """
+        Runs indicators + strategy on a candle window and re-grids the asset.
+        `latest_slice` can be passed in when indicators were already computed
+        (shared across multiplexed strategies).
+        """
+        state = self.portfolio[symbol]
+        strategy = self.strategies[symbol]
+        current_price = df.iloc[-1]['close']
+
+        if latest_slice is None:
+            latest_slice = strategy.add_indicators(df).iloc[-1]
         
         equity = state['balance'] + (state['inventory'] * current_price)
         self.risk_manager.update_account_status(equity)
+        self._update_portfolio_risk(symbol, df)
         
         # Save Reporting Data
         state['last_price'] = current_price
         state['equity'] = equity
+        self.equity_history[symbol].append(int(self.clock() * 1e9), equity)
         
+        self._last_atr[symbol] = latest_slice['atr']
+        if self.risk_manager.enforce_atr_stops:
+            self.stop_books[symbol].trail(
+                self.risk_manager.get_adaptive_stop_loss(current_price, latest_slice['atr'], 'buy'))
+
         signal = strategy.generate_signal(current_price, latest_slice)
         
         # 4. Process Signal
-        if signal.get('action') == 'update_grid':
-            state['active_orders'] = []
-            size = signal.get('suggested_size_per_grid', 0)
+        if signal.action == 'update_grid':
+            orders = state['active_orders'] = []
+            size = signal.suggested_size_per_grid
             if size > 0:
-                for price in signal['buy_levels']:
-                    if price < current_price:
-                        state['active_orders'].append({'side': 'buy', 'price': price, 'size': size})
-                for price in signal['sell_levels']:
-                    if price > current_price and state['inventory'] > 0:
-                         state['active_orders'].append({'side': 'sell', 'price': price, 'size': size})
+                for price in signal.buy_levels[signal.buy_levels < current_price]:
+                    orders.append(Order(Side.BUY, price, size))
+                if state['inventory'] > 0:
+                    for price in signal.sell_levels[signal.sell_levels > current_price]:
+                        orders.append(Order(Side.SELL, price, size))
         
         # Log basic status only occasionally or verbose? 
         # For now let's log only if something interesting happens or just regular heartbeat handles it.
@@ -161,68 +311,203 @@ class PaperTrader:
         # Maybe log equity updates?
         # logger.debug(f"[{symbol}] Price: {current_price:.2f} | Eq: ${equity:.0f}")
 
+    def _update_portfolio_risk(self, symbol, df):
+        """Feeds the cross-asset covariance and applies its size scale to the shared RiskManager."""
+        if self.portfolio_risk.bar_time is None:
+            self._risk_history[symbol] = df['close']
+            if len(self._risk_history) == len(self.strategies):
+                self._warm_up_portfolio_risk()
+        else:
+            self.portfolio_risk.observe(symbol, df.index[-1], df.iloc[-1]['close'])
+        self.risk_manager.portfolio_scale = self.portfolio_risk.scale()
+
+    def _warm_up_portfolio_risk(self):
+        self.portfolio_risk.warm_up(pd.DataFrame(self._risk_history))
+        self._risk_history = {}
+        self.risk_manager.portfolio_scale = self.portfolio_risk.scale()
+
+    def _book_fill(self, symbol, fill):
+        self.portfolio[symbol]['trades'].append(fill)
+        self.trade_stats[symbol].add(fill)
+        self.risk_manager.record_fill(symbol, fill)
+
+    def _apply_retention(self):
+        """
+        Drops trade records older than trade_retention_days from the state.
+        They still count in trade_stats; reports read those, not the records.
+        """
+        days = self.retention['trade_retention_days']
+        if days is None:
+            return
+        cutoff = int((self.clock() - days * 24 * 3600) * 1e9)
+        for symbol in self.trade_stats:
+            trades = self.portfolio[symbol]['trades']
+            expired = 0
+            while expired < len(trades) and trades[expired].time < cutoff:
+                expired += 1
+            if expired:
+                del trades[:expired]
+
+    def _check_stops(self, symbol, low, current_price):
+        """
+        Sells inventory lots whose ATR stop was reached: at the stop price, or
+        at the current price if that is already below it (gap). Returns the
+        number of stop fills.
+        """
+        state = self.portfolio[symbol]
+        stopped = 0
+        for size, stop in self.stop_books[symbol].check(low):
+            size = min(size, state['inventory'])
+            if size <= 0:
+                continue
+            stop = min(stop, current_price)
+            rev = stop * size
+            fee = rev * 0.001  # 0.1% Fee
+            state['balance'] += rev - fee
+            state['inventory'] -= size
+            fill = Fill(int(self.clock() * 1e9), Side.SELL, stop, size, fee)
+            self._book_fill(symbol, fill)
+            self.strategies[symbol].request_regrid()
+            stopped += 1
+            logger.warning(f"[{self._tag(symbol)}] ATR STOP @ {stop:.2f} (Size: {size:.6f})")
+        return stopped
+
     def _check_fills(self, symbol, high, low, current_price):
         state = self.portfolio[symbol]
         remaining = []
         filled_count = 0
+        if self.risk_manager.enforce_atr_stops:
+            filled_count += self._check_stops(symbol, low, current_price)
         
         for order in state['active_orders']:
             filled = False
-            if order['side'] == 'buy' and low <= order['price']:
-                cost = order['price'] * order['size']
+            if order.side is Side.BUY and low <= order.price:
+                cost = order.price * order.size
                 fee = cost * 0.001  # 0.1% Fee
                 total_cost = cost + fee
                 
                 if state['balance'] >= total_cost:
                     state['balance'] -= total_cost
-                    state['inventory'] += order['size']
-                    state['trades'].append({
-                        'side': 'buy', 
-                        'price': order['price'], 
-                        'size': order['size'], 
-                        'fee': fee,
-                        'time': str(datetime.now())
-                    })
+                    state['inventory'] += order.size
+                    fill = Fill(int(self.clock() * 1e9), Side.BUY, order.price, order.size, fee)
+                    self._book_fill(symbol, fill)
+                    if self.risk_manager.enforce_atr_stops:
+                        atr = self._last_atr.get(symbol)
+                        self.stop_books[symbol].add(order.price, order.size, None if atr is None else
+                                                    self.risk_manager.get_adaptive_stop_loss(order.price, atr, 'buy'))
                     filled = True
-                    logger.info(f"[{symbol}] BUY FILLED @ {order['price']:.2f} (Fee: ${fee:.2f})")
+                    logger.info(f"[{self._tag(symbol)}] BUY FILLED @ {order.price:.2f} (Fee: ${fee:.2f})")
                     
-            elif order['side'] == 'sell' and high >= order['price']:
-                 if state['inventory'] >= order['size']:
-                    rev = order['price'] * order['size']
+            elif order.side is Side.SELL and high >= order.price:
+                 if state['inventory'] >= order.size:
+                    rev = order.price * order.size
                     fee = rev * 0.001 # 0.1% Fee
                     net_rev = rev - fee
                     
                     state['balance'] += net_rev
-                    state['inventory'] -= order['size']
-                    state['trades'].append({
-                        'side': 'sell', 
-                        'price': order['price'], 
-                        'size': order['size'], 
-                        'fee': fee,
-                        'time': str(datetime.now())
-                    })
+                    state['inventory'] -= order.size
+                    fill = Fill(int(self.clock() * 1e9), Side.SELL, order.price, order.size, fee)
+                    self._book_fill(symbol, fill)
+                    self.stop_books[symbol].reduce(order.size)
                     filled = True
-                    logger.info(f"[{symbol}] SELL FILLED @ {order['price']:.2f} (Fee: ${fee:.2f})")
+                    logger.info(f"[{self._tag(symbol)}] SELL FILLED @ {order.price:.2f} (Fee: ${fee:.2f})")
             
             if filled:
                 filled_count += 1
+                self.strategies[symbol].request_regrid()
             else:
                 remaining.append(order)
                 
         state['active_orders'] = remaining
-        if filled_count > 0:
+        if filled_count > 0 and self.autosave and not self._in_cycle:
             self._save_state()
 
+    def _tag(self, symbol):
+        return f"{self.name}:{symbol}" if self.name else symbol
+
     def _load_state(self):
-        if os.path.exists(self.state_file):
+        # Persistence boundary: JSON dicts -> Order / Fill
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                portfolio = json.load(f)
+        except json.JSONDecodeError as e:
+            # Keep the unreadable file: starting fresh must not overwrite it
+            backup = f"{self.state_file}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            os.replace(self.state_file, backup)
+            logger.error(f"State file {self.state_file} is not valid JSON ({e}). Moved to {backup}, starting fresh.")
+            return {}
+        for symbol, state in portfolio.items():
+            state['active_orders'] = self._parse_records(symbol, 'order', state.get('active_orders', []), Order.from_dict)
+            state['trades'] = self._parse_records(symbol, 'trade', state.get('trades', []),
+                                                  lambda t: Fill.from_dict(t, _parse_time))
+        return portfolio
+
+    @staticmethod
+    def _parse_records(symbol, kind, records, parse):
+        """Parses saved orders / trades; a malformed record is logged and skipped, the rest still load."""
+        parsed = []
+        for record in records:
             try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def _save_state(self):
-        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+                parsed.append(parse(record))
+            except (KeyError, ValueError, TypeError) as e:
+                logger.error(f"[{symbol}] Skipping malformed {kind} in state file: {record!r} ({e!r})")
+        return parsed
+
+    def _load_risk_state(self):
+        """Restores the portfolio-wide Kelly estimate (round-trip stats + open FIFO lots) from the risk sidecar."""
+        path = sidecar_path(self.state_file, 'risk')
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                self.risk_manager.kelly.load_state(json.load(f)['kelly'])
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+            logger.error(f"Could not restore risk state from {path} ({e!r}). Kelly estimate starts over.")
+
+    def _load_history(self):
+        """Equity histories from the history file ({} if there is none or it is unreadable)."""
+        path = sidecar_path(self.state_file, 'history')
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return {symbol: TieredSeries.from_state(state) for symbol, state in json.load(f).items()}
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+            logger.error(f"Could not restore equity history from {path} ({e!r}). Starting a new one.")
+            return {}
+
+    def _save_history(self):
+        """
+        The equity history is the bulk of the persisted data but only feeds
+        reports, so it lives in its own file, written every
+        history_save_interval seconds rather than with every state save.
+        """
+        histories = {symbol: series.state() for symbol, series in self.equity_history.items() if len(series)}
+        if histories:
+            _write_json(sidecar_path(self.state_file, 'history'), histories)
+        self._history_saved_at = self.clock()
+
+    def _save_state(self, final=False):
+        """Writes the state file (+ risk file); the history file on shutdown (`final`) or when due."""
+        # Persistence boundary: Order / Fill -> JSON dicts (same file format as before)
+        snapshot = {}
+        for symbol, state in self.portfolio.items():
+            snapshot[symbol] = dict(state)
+            snapshot[symbol]['active_orders'] = [o.to_dict() for o in state['active_orders']]
+            snapshot[symbol]['trades'] = [t.to_dict(_format_time) for t in state['trades']]
+            lots = self.stop_books[symbol].snapshot() if symbol in self.stop_books else []
+            if lots:
+                snapshot[symbol]['stop_lots'] = lots
+            # Aggregates are only stored once they cover more than the retained trades
+            stats = self.trade_stats.get(symbol)
+            if stats is not None and stats.trades > len(state['trades']):
+                snapshot[symbol]['trade_stats'] = stats.state()
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
         with open(self.state_file, 'w') as f:
-            json.dump(self.portfolio, f, indent=4)
+            json.dump(snapshot, f, indent=4)
+        # Shared by all assets, so not part of the per-asset state file
+        _write_json(sidecar_path(self.state_file, 'risk'), {'kelly': self.risk_manager.kelly.state()})
+        if final or self.clock() - self._history_saved_at >= self.retention['history_save_interval']:
+            self._save_history()
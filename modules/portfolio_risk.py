@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from modules.analytics import DEFAULT_PERIODS_PER_YEAR
+
+
+class PortfolioRisk:
+    """
+    Cross-Asset Risk (Portfolio Volatility Targeting)
+    Rolling covariance of per-bar log returns across all symbols, updated
+    incrementally: each new bar adds its outer product to running sums and
+    the bar leaving the window subtracts its own (O(N^2) per bar, no pass
+    over history). Sums are rebuilt from the ring buffer once per window to
+    cancel floating-point drift.
+    Position sizes are scaled by vol_target / forecast portfolio volatility
+    (budget weights w: sqrt(w' C w * periods per year)), clipped to
+    [min_scale, max_scale]. Until `min_periods` bars are in, the scale is 1.
+    """
+    def __init__(self, symbols, window=168, vol_target=0.5, weights=None, min_periods=24,
+                 min_scale=0.25, max_scale=1.0, periods_per_year=DEFAULT_PERIODS_PER_YEAR):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.window = window
+        self.vol_target = vol_target
+        self.min_periods = max(2, min_periods)
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.periods_per_year = periods_per_year
+        # Capital budget per symbol (default: equal)
+        w = np.ones(n) if weights is None else np.array([weights.get(s, 0.0) for s in self.symbols], dtype=float)
+        self.weights = w / w.sum() if w.sum() > 0 else w
+
+        self.buffer = np.zeros((window, n))  # Ring buffer of committed returns
+        self.count = 0  # Returns in the window
+        self.pos = 0
+        self.pushes = 0
+        self._scale = (None, 1.0)  # (pushes, scale): recomputed only when a bar was added
+        self.sum = np.zeros(n)
+        self.cross = np.zeros((n, n))
+
+        self.bar_time = None
+        self.closes = np.full(n, np.nan)       # Latest close in the current bar
+        self.prev_closes = np.full(n, np.nan)  # Closes of the last committed bar
+
+    def __len__(self):
+        return self.count
+
+    def observe(self, symbol, bar_time, close):
+        """
+        Records the latest close of `symbol` for the bar starting at
+        `bar_time`. Symbols report one by one; the bar is committed once a
+        later bar shows up (symbols without a new price count as unchanged).
+        """
+        i = self.index.get(symbol)
+        if i is None:
+            return
+        if self.bar_time is not None and bar_time > self.bar_time:
+            self._commit()
+        if self.bar_time is None or bar_time >= self.bar_time:
+            self.bar_time = bar_time
+            self.closes[i] = close
+
+    def _commit(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(self.closes / self.prev_closes)
+        priced = ~np.isnan(self.prev_closes)
+        self.prev_closes = np.where(np.isnan(self.closes), self.prev_closes, self.closes)
+        if priced.any():
+            self.push(np.where(np.isnan(returns), 0.0, returns))
+
+    def push(self, returns):
+        """Adds one bar of returns (array in `symbols` order)."""
+        returns = np.asarray(returns, dtype=float)
+        if self.count == self.window:
+            old = self.buffer[self.pos]
+            self.sum -= old
+            self.cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.buffer[self.pos] = returns
+        self.sum += returns
+        self.cross += np.outer(returns, returns)
+        self.pos = (self.pos + 1) % self.window
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            self._rebuild()
+
+    def _rebuild(self):
+        live = self.buffer[:self.count]
+        self.sum = live.sum(axis=0)
+        self.cross = live.T @ live
+
+    def warm_up(self, closes):
+        """
+        Fills the window from history: DataFrame of closes (index: bar time,
+        columns: symbols). The last row is treated as the still-forming bar.
+        """
+        closes = closes.reindex(columns=self.symbols).sort_index().ffill()
+        if len(closes) < 2:
+            return
+        returns = np.log(closes / closes.shift(1)).iloc[1:-1].fillna(0.0).to_numpy()
+        for row in returns[-self.window:]:
+            self.push(row)
+        self.prev_closes = np.array(closes.iloc[-2], dtype=float)
+        self.closes = np.array(closes.iloc[-1], dtype=float)
+        self.bar_time = closes.index[-1]
+
+    def covariance(self):
+        """Per-bar return covariance (N x N array; sample, ddof=1)."""
+        n = self.count
+        if n < 2:
+            return np.full_like(self.cross, np.nan)
+        return (self.cross - np.outer(self.sum, self.sum) / n) / (n - 1)
+
+    def correlation(self):
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    def portfolio_volatility(self, weights=None):
+        """Annualized volatility of the budget-weighted portfolio."""
+        w = self.weights if weights is None else weights
+        var = float(w @ self.covariance() @ w)
+        return np.sqrt(max(var, 0.0) * self.periods_per_year)
+
+    def scale(self):
+        """Position size multiplier from the volatility target."""
+        if self.vol_target is None or self.count < self.min_periods:
+            return 1.0
+        if self._scale[0] != self.pushes:
+            vol = self.portfolio_volatility()
+            scale = float(np.clip(self.vol_target / vol, self.min_scale, self.max_scale)) if vol > 0 else self.max_scale
+            self._scale = (self.pushes, scale)
+        return self._scale[1]
+
+    def report(self):
+        """Per-symbol volatility, average correlation and share of portfolio risk."""
+        cov = self.covariance()
+        w = self.weights
+        var = w @ cov @ w
+        corr = self.correlation().to_numpy()
+        n = len(self.symbols)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_corr = (np.nansum(corr, axis=1) - 1) / (n - 1) if n > 1 else np.full(n, np.nan)
+            contrib = w * (cov @ w) / var
+        return pd.DataFrame({
+            'Symbol': self.symbols,
+            'Vol %': np.sqrt(np.diag(cov) * self.periods_per_year) * 100,
+            'Avg Corr': avg_corr,
+            'Risk %': contrib * 100,
+        })
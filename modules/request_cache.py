@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _InFlight:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class RequestCache:
+    """
+    Request Coalescer (Rate-Limit Saver)
+    - Identical requests issued while one is already in flight wait for that
+      call instead of hitting the exchange again.
+    - Completed responses are kept until their TTL expires. Expired entries
+      are purged on insert (at most every `purge_interval` seconds) and
+      beyond `max_entries` the least recently used entry is evicted, so a
+      long-running process holds a bounded number of responses.
+    Keys must be hashable, values should be treated as read-only by callers.
+    """
+    def __init__(self, clock=time.time, max_entries=4096, purge_interval=60.0):
+        self.clock = clock
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._inflight = {}  # key -> _InFlight
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0        # Served from cache
+        self.misses = 0      # Went to the exchange
+        self.coalesced = 0   # Joined an identical in-flight request
+        self.evicted = 0     # Dropped by the size cap before expiring
+
+    def get_or_fetch(self, key, fetch, ttl):
+        """Returns the cached value for `key`, or calls `fetch()` (once) to get it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+        except BaseException as e:  # Also KeyboardInterrupt / SystemExit: waiters must not get None
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.error is None and ttl > 0:
+                    self._store(key, call.result, ttl)
+            call.event.set()
+        return call.result
+
+    def _store(self, key, value, ttl):
+        """Inserts under the lock: periodic purge of expired entries, then the LRU size cap."""
+        now = self.clock()
+        if now >= self._next_purge:
+            self._purge(now)
+            self._next_purge = now + self.purge_interval
+        self._entries[key] = (now + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def _purge(self, now):
+        for key in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+            del self._entries[key]
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge(self.clock())
+
+    @property
+    def saved_requests(self):
+        return self.hits + self.coalesced
+
+    def stats(self):
+        total = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'saved_requests': self.saved_requests,
+            'hit_rate': (self.saved_requests / total) if total else 0.0,
+            'entries': len(self._entries),
+            'evicted': self.evicted,
+        }
+
+
+def ttl_to_candle_close(timeframe_ms, now_ms, max_ttl=None):
+    """
+    Seconds until the current candle of `timeframe_ms` closes, i.e. until a
+    cached OHLCV response can gain a new bar. Optionally capped by `max_ttl`
+    (the forming candle keeps changing within the bar).
+    """
+    ttl = (timeframe_ms - (now_ms % timeframe_ms)) / 1000.0
+    if max_ttl is not None:
+        ttl = min(ttl, max_ttl)
+    return ttl
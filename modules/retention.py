@@ -0,0 +1,201 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import timeframe_to_ms
+from modules.orders import Side
+
+# (bar size, kept for): raw points -> hourly OHLC -> daily OHLC (None: raw / forever)
+DEFAULT_TIERS = ((None, '2d'), ('1h', '90d'), ('1d', None))
+
+
+def lttb(x, y, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson). Returns the
+    indices of at most `max_points` points that keep the visual shape:
+    first and last point, and per bucket the point spanning the largest
+    triangle with the previous pick and the next bucket's average, so
+    spikes and drawdown troughs survive. O(n).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])[:max(max_points, 0)]
+
+    # max_points - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    picks = np.empty(max_points, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+class TieredSeries:
+    """
+    Tiered Retention (Long-Running Equity History)
+    Recent points at full resolution; once older than their tier's horizon
+    they are rolled up into the next tier's OHLC bars (e.g. raw for 2 days,
+    hourly bars for 90 days, daily bars after that). Whole buckets move at
+    once, so every bar covers its full period. Memory and file size are
+    bounded by the tier horizons, not by how long the bot has been running.
+    """
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [tuple(t) for t in tiers]
+        # ns per bar (None: raw) and ns kept (None: forever), per tier
+        self._res = [None if r is None else timeframe_to_ms(r) * 10**6 for r, _ in self.tiers]
+        self._keep = [None if k is None else timeframe_to_ms(k) * 10**6 for _, k in self.tiers]
+        self.levels = [deque() for _ in self.tiers]  # Raw: [time, value]; bars: [time, open, high, low, close]
+        self.last_time = None
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+    def append(self, time_ns, value):
+        """Adds a point (int ns). Points older than the latest one are ignored."""
+        time_ns = int(time_ns)
+        if self.last_time is not None and time_ns < self.last_time:
+            return
+        raw = self.levels[0]
+        if raw and raw[-1][0] == time_ns:
+            raw[-1][1] = float(value)
+        else:
+            raw.append([time_ns, float(value)])
+        self.last_time = time_ns
+        self._roll(time_ns)
+
+    def _roll(self, now):
+        for k in range(len(self.tiers) - 1):
+            if self._keep[k] is None:
+                break
+            res = self._res[k + 1]
+            cutoff = (now - self._keep[k]) // res * res  # Only whole buckets of the next tier leave
+            src, dst = self.levels[k], self.levels[k + 1]
+            while src and src[0][0] < cutoff:
+                item = src.popleft()
+                o, h, l, c = (item[1],) * 4 if len(item) == 2 else item[1:]
+                bucket = item[0] // res * res
+                if dst and dst[-1][0] == bucket:
+                    bar = dst[-1]
+                    bar[2], bar[3], bar[4] = max(bar[2], h), min(bar[3], l), c
+                else:
+                    dst.append([bucket, o, h, l, c])
+
+    def frame(self):
+        """All tiers, oldest first: DataFrame (datetime index) of open/high/low/close + bar size in seconds."""
+        rows = []
+        for level, res in reversed(list(zip(self.levels, self._res))):
+            for item in level:
+                o, h, l, c = (item[1],) * 4 if len(item) == 2 else item[1:]
+                rows.append((item[0], o, h, l, c, 0 if res is None else res // 10**9))
+        df = pd.DataFrame(rows, columns=['time', 'open', 'high', 'low', 'close', 'bar_s'])
+        df.index = pd.to_datetime(df.pop('time'), unit='ns')
+        return df
+
+    def series(self, max_points=None):
+        """(times ns, values) oldest first, one point per raw point / bar close; LTTB-thinned to max_points."""
+        times = np.array([item[0] for level in reversed(self.levels) for item in level], dtype=np.int64)
+        values = np.array([item[-1] for level in reversed(self.levels) for item in level], dtype=float)
+        if max_points is not None:
+            keep = lttb(times, values, max_points)
+            times, values = times[keep], values[keep]
+        return times, values
+
+    def state(self):
+        return {'tiers': [list(t) for t in self.tiers], 'levels': [list(level) for level in self.levels]}
+
+    @classmethod
+    def from_state(cls, state):
+        """Restores a saved series with the tiers it was built with."""
+        series = cls(state['tiers'])
+        series.levels = [deque(list(item) for item in level) for level in state['levels']]
+        series.last_time = max((level[-1][0] for level in series.levels if level), default=None)
+        return series
+
+
+class TradeStats:
+    """
+    Running Trade Aggregates (Bounded Reporting)
+    Counts, notional, fees and FIFO realized PnL, updated per fill. Same
+    round trips and PnL (net of pro-rata fees) as analytics.match_fifo over
+    the whole ledger, but only the still-open buy lots are kept, so old
+    trade records can be dropped.
+    """
+    COUNTERS = ('trades', 'buys', 'sells', 'round_trips', 'wins', 'volume', 'fees', 'realized_pnl',
+                'first_time', 'last_time')
+
+    def __init__(self):
+        self.trades = self.buys = self.sells = self.round_trips = self.wins = 0
+        self.volume = self.fees = self.realized_pnl = 0.0
+        self.first_time = self.last_time = None
+        self.open_lots = deque()  # [price, size left, fee per unit]
+
+    @classmethod
+    def from_fills(cls, fills):
+        stats = cls()
+        for fill in fills:
+            stats.add(fill)
+        return stats
+
+    @property
+    def open_size(self):
+        return sum(lot[1] for lot in self.open_lots)
+
+    def add(self, fill):
+        self.trades += 1
+        self.volume += fill.price * fill.size
+        self.fees += fill.fee
+        if self.first_time is None:
+            self.first_time = fill.time
+        self.last_time = fill.time
+        fee_per_unit = fill.fee / fill.size if fill.size else 0.0
+        if fill.side is Side.BUY:
+            self.buys += 1
+            self.open_lots.append([fill.price, fill.size, fee_per_unit])
+            return
+
+        self.sells += 1
+        size = fill.size
+        while size > 1e-12 and self.open_lots:
+            lot = self.open_lots[0]
+            qty = min(lot[1], size)
+            pnl = qty * (fill.price - lot[0]) - qty * (lot[2] + fee_per_unit)
+            self.realized_pnl += pnl
+            self.round_trips += 1
+            self.wins += int(pnl > 0)
+            lot[1] -= qty
+            size -= qty
+            if lot[1] <= 1e-12:
+                self.open_lots.popleft()
+
+    def summary(self):
+        """Report row (same keys as analytics.performance_summary where they overlap)."""
+        return {
+            'Trades': self.trades,
+            'Round Trips': self.round_trips,
+            'Win Rate %': self.wins / self.round_trips * 100 if self.round_trips else np.nan,
+            'Realized $': self.realized_pnl,
+            'Fees $': self.fees,
+            'Volume $': self.volume,
+        }
+
+    def state(self):
+        return {**{k: getattr(self, k) for k in self.COUNTERS}, 'open_lots': [list(lot) for lot in self.open_lots]}
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        for k in cls.COUNTERS:
+            setattr(stats, k, state[k])
+        stats.open_lots = deque(list(lot) for lot in state['open_lots'])
+        return stats
@@ -1,5 +1,111 @@
+from collections import deque
+
 import numpy as np
 
+from modules.orders import Side
+
+BASE_RISK_PER_TRADE = 0.02  # Risking 2% per trade
+
+def compute_drawdowns(equity, peak=0.0):
+    """
+    Vectorized running peak and drawdown of an equity array.
+    Returns (drawdown, peak) arrays; drawdown is NaN while the peak is <= 0.
+    """
+    equity = np.asarray(equity, dtype=float)
+    peaks = np.maximum.accumulate(np.concatenate(([peak], equity)))[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(peaks > 0, (peaks - equity) / peaks, np.nan)
+    return drawdown, peaks
+
+class KellyEstimator:
+    """
+    Online Kelly Estimator (Thorp)
+    Streaming win rate and payoff ratio over closed round trips. Buys open
+    FIFO lots per symbol; each sell closes lots and its net return on cost
+    is one observation. With `halflife` (in round trips) older trades decay
+    exponentially. O(1) per observation, nothing is rescanned.
+    """
+    def __init__(self, halflife=None, min_trades=30):
+        self.halflife = halflife
+        self.decay = 0.5 ** (1 / halflife) if halflife else 1.0
+        self.min_trades = min_trades
+        self.trades = 0
+        self.weight = 0.0      # (Decayed) number of round trips
+        self.win_weight = 0.0  # (Decayed) number of winners
+        self.win_sum = 0.0     # (Decayed) sum of winning returns
+        self.loss_sum = 0.0    # (Decayed) sum of losing returns, positive
+        self.lots = {}         # symbol -> deque of open [price, size, fee per unit]
+
+    def record_fill(self, symbol, side, price, size, fee):
+        """Returns the round-trip return if this fill closed one, else None."""
+        lots = self.lots.setdefault(symbol, deque())
+        if side is Side.BUY:
+            lots.append([price, size, fee / size if size else 0.0])
+            return None
+
+        cost = 0.0
+        remaining = size
+        while remaining > 1e-12 and lots:
+            lot = lots[0]
+            qty = min(lot[1], remaining)
+            cost += qty * (lot[0] + lot[2])
+            remaining -= qty
+            lot[1] -= qty
+            if lot[1] <= 1e-12:
+                lots.popleft()
+        matched = size - remaining
+        if matched <= 0 or cost <= 0:
+            return None  # Sold inventory opened before tracking started
+        ret = (matched * (price - fee / size) - cost) / cost
+        self.update(ret)
+        return ret
+
+    def update(self, ret):
+        d = self.decay
+        self.trades += 1
+        self.weight = self.weight * d + 1.0
+        self.win_weight *= d
+        self.win_sum *= d
+        self.loss_sum *= d
+        if ret > 0:
+            self.win_weight += 1.0
+            self.win_sum += ret
+        else:
+            self.loss_sum -= ret
+
+    @property
+    def win_rate(self):
+        return self.win_weight / self.weight if self.weight else np.nan
+
+    @property
+    def payoff_ratio(self):
+        """Average win / average loss."""
+        losses = self.weight - self.win_weight
+        if not self.win_weight or not losses or not self.loss_sum:
+            return np.nan
+        return (self.win_sum / self.win_weight) / (self.loss_sum / losses)
+
+    def optimal_fraction(self):
+        """Full Kelly f* = p - (1 - p) / b, or None while fewer than min_trades round trips."""
+        if self.trades < self.min_trades:
+            return None
+        p = self.win_rate
+        if self.loss_sum == 0:
+            return p  # No losing trades yet
+        if self.win_sum == 0:
+            return -1.0
+        return p - (1 - p) / self.payoff_ratio
+
+    def state(self):
+        return {'trades': self.trades, 'weight': self.weight, 'win_weight': self.win_weight,
+                'win_sum': self.win_sum, 'loss_sum': self.loss_sum,
+                'lots': {symbol: [list(lot) for lot in lots] for symbol, lots in self.lots.items()}}
+
+    def load_state(self, state):
+        for key in ('trades', 'weight', 'win_weight', 'win_sum', 'loss_sum'):
+            setattr(self, key, state[key])
+        self.lots = {symbol: deque(list(lot) for lot in lots) for symbol, lots in state['lots'].items()}
+
 class RiskManager:
     """
     The Fortress (Safety Core)
@@ -14,12 +120,16 @@ class RiskManager:
         # --- Safety Limits ---
         self.max_drawdown_limit = config.get('max_drawdown_limit', 0.15)  # 15% Hard Stop
         self.stop_loss_atr_multiplier = config.get('stop_loss_atr_multiplier', 3.0)  # Turtle Rule
+        self.enforce_atr_stops = config.get('enforce_atr_stops', True)  # Stop out grid inventory lots
         self.kelly_fraction = config.get('kelly_fraction', 0.5)  # Thorp's "Half Kelly"
+        self.kelly_floor = config.get('kelly_floor', 0.25)  # Min. share of the base budget without edge
+        self.kelly = KellyEstimator(config.get('kelly_halflife', None), config.get('kelly_min_trades', 30))
         
         # --- State Tracking ---
         self.peak_balance = 0.0
         self.current_drawdown = 0.0
         self.circuit_breaker_active = False  # If True, cut leverage by 50%
+        self.portfolio_scale = 1.0  # Cross-asset vol targeting (set from modules.portfolio_risk)
         
         print(f"[RiskManager] Initialized with Anti-Fragile Protocols.")
         print(f"   - Max Drawdown Limit: {self.max_drawdown_limit*100}%")
@@ -52,12 +162,65 @@ class RiskManager:
         
         return self.current_drawdown
 
+    def update_account_status_batch(self, equity, commit=True):
+        """
+        Batch version of update_account_status over an equity array.
+        Peak: cumulative max. Circuit breaker: hysteresis (on above 80% of the
+        limit, off below 50%) resolved by forward-filling the last decisive bar.
+        Returns (drawdown, peak, breaker) arrays, bar-for-bar identical to
+        calling update_account_status in a loop. With commit=True the manager
+        state ends where that loop would leave it.
+        """
+        drawdown, peaks = compute_drawdowns(equity, self.peak_balance)
+        n = len(drawdown)
+        if n == 0:
+            return drawdown, peaks, np.zeros(0, dtype=bool)
+
+        # Bars before the first positive peak keep the previous drawdown
+        undefined = np.isnan(drawdown)
+        drawdown[undefined] = self.current_drawdown
+
+        # Hysteresis scan: 1 = switch on, 0 = switch off, -1 = keep state
+        decision = np.full(n, -1, dtype=np.int8)
+        decision[drawdown < self.max_drawdown_limit * 0.5] = 0
+        decision[drawdown > self.max_drawdown_limit * 0.8] = 1
+        decision[undefined] = -1
+        last = np.where(decision >= 0, np.arange(n), -1)
+        last = np.maximum.accumulate(last)
+        breaker = np.where(last >= 0, decision[np.maximum(last, 0)] == 1, self.circuit_breaker_active)
+
+        if commit:
+            if breaker[-1] != self.circuit_breaker_active:
+                state = "Activating" if breaker[-1] else "Deactivating"
+                print(f"[RISK ALERT] Drawdown {drawdown[-1]*100:.2f}% at end of batch. {state} CIRCUIT BREAKER.")
+            self.peak_balance = float(peaks[-1])
+            self.current_drawdown = float(drawdown[-1])
+            self.circuit_breaker_active = bool(breaker[-1])
+
+        return drawdown, peaks, breaker
+
+    def record_fill(self, symbol, fill):
+        """Feeds an executed Fill to the Kelly estimator (O(1) amortized)."""
+        return self.kelly.record_fill(symbol, fill.side, fill.price, fill.size, fill.fee)
+
+    def kelly_scale(self):
+        """
+        Share of the base risk budget allowed by fractional Kelly:
+        min(base, kelly_fraction * f*) / base, floored at kelly_floor so the
+        grid keeps trading (and measuring) when the edge looks gone.
+        1.0 until the estimator has min_trades round trips.
+        """
+        f = self.kelly.optimal_fraction()
+        if f is None:
+            return 1.0
+        return float(np.clip(self.kelly_fraction * f / BASE_RISK_PER_TRADE, self.kelly_floor, 1.0))
+
     def calculate_position_size(self, account_balance: float, current_volatility_atr: float, price: float) -> float:
         """
         Calculates safe position size using Dalio's Volatility Sizing & Thorp's Kelly.
         """
-        # 1. Base Size (e.g. 5% of equity per grid level) - Placeholder, usually dynamic
-        base_risk_per_trade = 0.02 # Risking 2% per trade
+        # 1. Base Size: 2% risk per trade, capped by fractional Kelly of the realized edge
+        base_risk_per_trade = BASE_RISK_PER_TRADE * self.kelly_scale()
         
         # 2. Turtle/Dalio Adjustment: Size is INVERSE to Volatility
         # If ATR is high (volatile), we must trade smaller to keep dollar-risk constant.
@@ -77,8 +240,27 @@ class RiskManager:
         if self.circuit_breaker_active:
             print(f"[DEFENSE] Circuit Breaker Active: Halving position size.")
             safe_units *= 0.5
-            
-        return safe_units
+
+        # 4. Portfolio Volatility Target (correlated assets share one risk budget)
+        return safe_units * self.portfolio_scale
+
+    def calculate_position_size_batch(self, account_balance, current_volatility_atr, price, breaker=None):
+        """
+        Vectorized calculate_position_size over ATR / price (and balance) arrays.
+        `breaker` is an optional per-bar circuit-breaker array (e.g. from
+        update_account_status_batch); defaults to the current state.
+        """
+        base_risk_per_trade = BASE_RISK_PER_TRADE * self.kelly_scale()
+        atr = np.asarray(current_volatility_atr, dtype=float)
+        balance = np.asarray(account_balance, dtype=float)
+        risk_per_share = atr * self.stop_loss_atr_multiplier
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            safe_units = np.where(risk_per_share == 0, 0.0, (balance * base_risk_per_trade) / risk_per_share)
+
+        if breaker is None:
+            breaker = self.circuit_breaker_active
+        return np.where(breaker, safe_units * 0.5, safe_units) * self.portfolio_scale
 
     def check_trade_allowed(self, signal_type: str, price: float) -> bool:
         """
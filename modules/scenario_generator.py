@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+# Bars are generated in fixed-size blocks, each with its own seed stream, so a
+# given seed yields the same series no matter how callers chunk the output.
+BLOCK_SIZE = 2 ** 17
+
+MODELS = ('gbm', 'jump', 'regime', 'vol_cluster')
+
+DEFAULT_PARAMS = {
+    # Per-bar log drift / volatility (hourly ~ 0.67% like the old dummy walk)
+    'mu': 0.0,
+    'sigma': 0.0067,
+    # Jump diffusion (Merton): jumps per bar, mean / std of log jump size
+    'jump_rate': 0.002,
+    'jump_mean': 0.0,
+    'jump_std': 0.04,
+    # Regime switching: mean regime lengths (bars), trend drift, range band width
+    'trend_length': 500,
+    'range_length': 500,
+    'trend_drift': 0.0005,
+    'range_width': 0.02,
+    # Volatility clustering: AR(1) log-vol persistence and vol-of-vol
+    'vol_persistence': 0.98,
+    'vol_of_vol': 0.1,
+    # Intrabar wick size relative to bar volatility, base volume
+    'wick': 0.5,
+    'volume': 1000.0,
+}
+
+
+class ScenarioGenerator:
+    """
+    Synthetic Market Lab
+    Seeded, vectorized OHLCV scenarios for load tests, benchmarks and grid
+    stress cases. Models:
+    - 'gbm': Geometric Brownian Motion
+    - 'jump': GBM + Poisson jumps (Merton jump diffusion)
+    - 'regime': switches between trending and range-bound regimes
+    - 'vol_cluster': stochastic (AR(1) log) volatility, i.e. calm/turbulent spells
+    All randomness comes from `seed`: same seed + params -> same candles.
+    """
+    def __init__(self, seed=42, start_price=100.0, start='2024-01-01', freq='1h', **params):
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown scenario params: {sorted(unknown)}")
+        self.seed = seed
+        self.start_price = float(start_price)
+        self.start = pd.Timestamp(start)
+        self.freq = pd.Timedelta(freq)
+        self.params = {**DEFAULT_PARAMS, **params}
+
+    def generate(self, n, model='gbm'):
+        """Full DataFrame of `n` candles (empty OHLCV frame for n <= 0)."""
+        chunks = list(self.iter_chunks(n, model=model))
+        if not chunks:
+            empty = np.empty(0)
+            return self._to_frame({'timestamp': np.empty(0, dtype=np.int64), 'open': empty, 'high': empty,
+                                   'low': empty, 'close': empty, 'volume': empty})
+        return pd.concat(chunks)
+
+    def iter_chunks(self, n, model='gbm', chunk_size=BLOCK_SIZE):
+        """Streams `n` candles as DataFrames of at most `chunk_size` rows."""
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'. Choose from {MODELS}")
+
+        state = self._initial_state()
+        pending = []
+        pending_rows = 0
+        produced = 0
+        block_index = 0
+        while produced < n:
+            rows = min(BLOCK_SIZE, n - produced)
+            block = self._block(block_index, rows, produced, model, state)
+            pending.append(block)
+            pending_rows += rows
+            produced += rows
+            block_index += 1
+
+            while pending_rows >= chunk_size or (produced >= n and pending_rows):
+                merged = pending[0] if len(pending) == 1 else {k: np.concatenate([b[k] for b in pending]) for k in pending[0]}
+                take = min(chunk_size, pending_rows)
+                yield self._to_frame({k: v[:take] for k, v in merged.items()})
+                rest = {k: v[take:] for k, v in merged.items()}
+                pending_rows -= take
+                pending = [rest] if pending_rows else []
+
+    def _initial_state(self):
+        return {
+            'log_price': np.log(self.start_price),
+            'regime': 1,          # 1 = trend, 0 = range
+            'regime_left': 0,     # bars left in current regime
+            'trend_sign': 1.0,
+            'range_noise': 0.0,   # last range deviation (MA(1) term)
+            'log_vol': 0.0,
+        }
+
+    def _rng(self, block_index):
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(block_index,))))
+
+    def _block(self, block_index, rows, offset, model, state):
+        p = self.params
+        rng = self._rng(block_index)
+        z = rng.standard_normal(rows)
+        sigma = np.full(rows, p['sigma'])
+
+        if model == 'vol_cluster':
+            sigma = p['sigma'] * np.exp(self._log_vol_path(rng, rows, state))
+
+        returns = p['mu'] + sigma * z
+
+        if model == 'jump':
+            jumps = rng.poisson(p['jump_rate'], rows)
+            has_jump = jumps > 0
+            returns[has_jump] += (jumps[has_jump] * p['jump_mean']
+                                  + np.sqrt(jumps[has_jump]) * p['jump_std'] * rng.standard_normal(has_jump.sum()))
+        elif model == 'regime':
+            returns += self._regime_returns(rng, rows, state)
+
+        log_close = state['log_price'] + np.cumsum(returns)
+        log_open = np.concatenate(([state['log_price']], log_close[:-1]))
+        state['log_price'] = log_close[-1]
+
+        wick = p['wick'] * sigma
+        log_high = np.maximum(log_open, log_close) + np.abs(rng.standard_normal(rows)) * wick
+        log_low = np.minimum(log_open, log_close) - np.abs(rng.standard_normal(rows)) * wick
+        volume = p['volume'] * np.exp(0.5 * rng.standard_normal(rows)) * (1.0 + np.abs(returns) / p['sigma'])
+
+        timestamps = self.start.value + (offset + np.arange(rows, dtype=np.int64)) * self.freq.value
+        return {
+            'timestamp': timestamps,
+            'open': np.exp(log_open),
+            'high': np.exp(log_high),
+            'low': np.exp(log_low),
+            'close': np.exp(log_close),
+            'volume': volume,
+        }
+
+    def _log_vol_path(self, rng, rows, state):
+        """AR(1) log-vol h_t = phi*h_{t-1} + eta*w_t, via an exponential filter (C speed)."""
+        phi, eta = self.params['vol_persistence'], self.params['vol_of_vol']
+        shocks = eta * rng.standard_normal(rows) / (1.0 - phi)
+        # Seed the filter with the carried state: y_{-1} = h_prev
+        path = pd.Series(np.concatenate(([state['log_vol']], shocks))).ewm(alpha=1.0 - phi, adjust=False).mean().to_numpy()[1:]
+        state['log_vol'] = path[-1]
+        return path
+
+    def _regime_returns(self, rng, rows, state):
+        """
+        Extra returns for the regime model. Regime lengths are geometric.
+        - trend: constant drift, sign flips between trend spells
+        - range: returns are differences of a bounded noise (price stays in a band)
+        """
+        p = self.params
+        labels = np.empty(rows, dtype=np.int8)
+        signs = np.empty(rows)
+        filled = 0
+        while filled < rows:
+            if state['regime_left'] == 0:
+                state['regime'] = 1 - state['regime']
+                mean_len = p['trend_length'] if state['regime'] else p['range_length']
+                state['regime_left'] = int(rng.geometric(1.0 / mean_len))
+                if state['regime']:
+                    state['trend_sign'] = 1.0 if rng.random() < 0.5 else -1.0
+            take = min(state['regime_left'], rows - filled)
+            labels[filled:filled + take] = state['regime']
+            signs[filled:filled + take] = state['trend_sign']
+            state['regime_left'] -= take
+            filled += take
+
+        extra = np.where(labels == 1, signs * p['trend_drift'], 0.0)
+
+        # Range: r_t = w*(e_t - e_{t-1}) telescopes to a bounded deviation
+        noise = p['range_width'] * rng.standard_normal(rows)
+        prev = np.concatenate(([state['range_noise']], noise[:-1]))
+        in_range = labels == 0
+        prev_in_range = np.concatenate(([True], in_range[:-1]))
+        # Entering a range spell starts a fresh band (no jump from stale noise)
+        prev = np.where(prev_in_range, prev, 0.0)
+        extra = np.where(in_range, noise - prev, extra)
+        # Trend bars carry no band deviation into the next range spell
+        state['range_noise'] = noise[-1] if in_range[-1] else 0.0
+        return extra
+
+    def _to_frame(self, cols):
+        return pd.DataFrame({k: cols[k] for k in ['open', 'high', 'low', 'close', 'volume']},
+                            index=pd.DatetimeIndex(cols['timestamp'].astype('datetime64[ns]'), name='datetime'))
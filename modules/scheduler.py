@@ -0,0 +1,117 @@
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import timeframe_to_ms
+
+
+class CycleScheduler:
+    """
+    Cycle Scheduler (API Health Check)
+    Guards the polling loop against stale data and slow fetches:
+    - cycle_budget: seconds per cycle; assets not reached in time are deferred
+      and go first next cycle
+    - fetch_deadline: a fetch slower than this is not traded on, and the
+      symbol is backed off exponentially (skips 1, 2, 4, ... cycles)
+    - max_candle_age: latest candle older than N timeframes -> stale, not traded on
+    Slow symbols are fetched last, so the budget cuts them first. Any limit
+    set to None is disabled. Fetch latencies are kept per symbol (rolling
+    window) for the latency report.
+    """
+    def __init__(self, cycle_budget=45.0, fetch_deadline=10.0, max_candle_age=2, timeframe='1h', max_backoff=16,
+                 latency_window=500, clock=time.time, timer=time.monotonic):
+        self.cycle_budget = cycle_budget
+        self.fetch_deadline = fetch_deadline
+        self.max_candle_age = max_candle_age
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.max_backoff = max_backoff
+        self.latency_window = latency_window
+        self.clock = clock  # Candle age (wall clock, or the simulated clock in replay)
+        self.timer = timer  # Latency measurement
+        self.cycle_start = None
+
+        self.latencies = {}
+        self.counters = {}
+        self.backoff = {}     # symbol -> cycles to skip after the next failure
+        self.cooldown = {}    # symbol -> cycles left to skip
+        self.deferred = set()
+
+    def _count(self, symbol, key):
+        counters = self.counters.setdefault(symbol, {'stale': 0, 'slow': 0, 'skipped': 0, 'deferred': 0})
+        counters[key] += 1
+
+    def plan(self, assets):
+        """Starts a cycle. Returns the assets to poll, in priority order."""
+        self.cycle_start = self.timer()
+        ready = []
+        for asset in assets:
+            symbol = asset['symbol']
+            if self.cooldown.get(symbol, 0) > 0:
+                self.cooldown[symbol] -= 1
+                self._count(symbol, 'skipped')
+                continue
+            ready.append(asset)
+        # Deferred last cycle first, then fastest first (stable: config order breaks ties)
+        ready.sort(key=lambda a: (a['symbol'] not in self.deferred, self._median_latency(a['symbol'])))
+        self.deferred = set()
+        return ready
+
+    def within_budget(self):
+        return self.cycle_budget is None or self.timer() - self.cycle_start < self.cycle_budget
+
+    def defer(self, assets):
+        """Assets cut off by the cycle budget."""
+        for asset in assets:
+            self.deferred.add(asset['symbol'])
+            self._count(asset['symbol'], 'deferred')
+
+    def record_fetch(self, symbol, started, df):
+        """
+        Records one fetch (started = timer() before the call). Returns the
+        reason not to trade on `df` ('slow fetch ...' / 'stale data ...'),
+        or None if it is healthy.
+        """
+        latency = self.timer() - started
+        self.latencies.setdefault(symbol, deque(maxlen=self.latency_window)).append(latency)
+
+        if self.fetch_deadline is not None and latency > self.fetch_deadline:
+            self._count(symbol, 'slow')
+            skip = self.backoff.get(symbol, 1)
+            self.cooldown[symbol] = skip
+            self.backoff[symbol] = min(skip * 2, self.max_backoff)
+            return f"slow fetch ({latency:.1f}s > {self.fetch_deadline}s), backing off {skip} cycles"
+        self.backoff.pop(symbol, None)
+
+        if self.max_candle_age is not None and not df.empty:
+            age_ms = self.clock() * 1000 - df.index[-1].value // 10**6
+            if age_ms > self.max_candle_age * self.tf_ms:
+                self._count(symbol, 'stale')
+                return f"stale data (last candle {age_ms / 60000:.0f} min old)"
+        return None
+
+    def _median_latency(self, symbol):
+        samples = self.latencies.get(symbol)
+        return float(np.median(samples)) if samples else 0.0
+
+    def latency_report(self):
+        """Per-symbol fetch latency percentiles (ms) and guard counters."""
+        rows = []
+        for symbol in sorted(set(self.latencies) | set(self.counters)):
+            samples = np.asarray(self.latencies.get(symbol, ()), dtype=float) * 1000
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99]) if len(samples) else (np.nan,) * 3
+            counters = self.counters.get(symbol, {})
+            rows.append({
+                'Symbol': symbol,
+                'Fetches': len(samples),
+                'p50 ms': p50,
+                'p90 ms': p90,
+                'p99 ms': p99,
+                'Max ms': samples.max() if len(samples) else np.nan,
+                'Stale': counters.get('stale', 0),
+                'Slow': counters.get('slow', 0),
+                'Skipped': counters.get('skipped', 0),
+                'Deferred': counters.get('deferred', 0),
+            })
+        return pd.DataFrame(rows)
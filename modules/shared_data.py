@@ -0,0 +1,167 @@
+import os
+import re
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+MODES = ('shm', 'mmap')
+
+# Views already attached in this process, keyed by segment / file name.
+# Re-attaching (e.g. once per task in a Pool worker) costs a dict lookup.
+_ATTACHED = {}
+
+
+def _open_segment(name):
+    """Attach to an existing segment without handing it to the resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track`: the segment is also registered with this
+        # process's resource tracker. Workers started by the publisher share its
+        # tracker, so nothing changes for them; an unrelated process's tracker
+        # would unlink the segment (with a leak warning) when that process exits.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _close_segment(segment):
+    try:
+        segment.close()
+    except BufferError:
+        pass  # Frames built on it are still alive; the mapping goes with them
+
+
+class SharedOHLCVRegistry:
+    """
+    Shared Market Data (Parallel Workers)
+    Loads each symbol's candles once into shared memory ('shm') or into
+    memory-mapped .npy files ('mmap'). Workers receive a small handle (plain
+    dict, cheap to pickle) and attach to zero-copy read-only NumPy views.
+    Layout per symbol: int64 ns timestamps + a (5, n) open/high/low/close/volume
+    block in `price_dtype` (float64, or float32 to halve the footprint).
+    The process that publishes owns the data: close() releases it.
+    """
+    def __init__(self, mode='shm', directory='data/shared', price_dtype='float64'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Choose from {MODES}")
+        self.mode = mode
+        self.directory = directory
+        self.price_dtype = np.dtype(price_dtype)
+        self.handles = {}
+        self._segments = {}
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, symbol):
+        return symbol in self.handles
+
+    def load(self, loader, asset_config, days=30):
+        """Loads an asset through the DataLoader and publishes it. Returns the handle."""
+        df = loader.load_data(asset_config, days=days)
+        if df.empty:
+            return None
+        return self.publish(asset_config['symbol'], df)
+
+    def publish(self, symbol, df):
+        """Copies the OHLCV columns of `df` (datetime index) into shared storage."""
+        if symbol in self.handles:
+            raise ValueError(f"Symbol already published: {symbol}")
+        rows = len(df)
+        timestamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        prices = df[list(COLUMNS)].to_numpy(dtype=self.price_dtype).T
+
+        if self.mode == 'shm':
+            ts_bytes = rows * 8
+            segment = shared_memory.SharedMemory(create=True, size=max(1, ts_bytes + prices.nbytes))
+            np.ndarray(rows, dtype=np.int64, buffer=segment.buf)[:] = timestamps
+            np.ndarray(prices.shape, dtype=self.price_dtype, buffer=segment.buf, offset=ts_bytes)[:] = prices
+            self._segments[symbol] = segment
+            location = segment.name
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            slug = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+            location = os.path.abspath(os.path.join(self.directory, slug))
+            np.save(location + '.ts.npy', timestamps)
+            np.save(location + '.ohlcv.npy', np.ascontiguousarray(prices))
+            self._files += [location + '.ts.npy', location + '.ohlcv.npy']
+
+        self.handles[symbol] = {
+            'symbol': symbol,
+            'mode': self.mode,
+            'name': location,
+            'rows': rows,
+            'price_dtype': self.price_dtype.str,
+        }
+        return self.handles[symbol]
+
+    def nbytes(self):
+        """Total bytes held for all published symbols."""
+        return sum(h['rows'] * (8 + len(COLUMNS) * np.dtype(h['price_dtype']).itemsize) for h in self.handles.values())
+
+    def close(self):
+        """Releases all segments / deletes all files published by this registry."""
+        for handle in self.handles.values():
+            view = _ATTACHED.pop(handle['name'], None)
+            if view is not None:
+                view.close()
+        for segment in self._segments.values():
+            _close_segment(segment)
+            segment.unlink()
+        for path in self._files:
+            if os.path.exists(path):
+                os.remove(path)
+        self._segments = {}
+        self._files = []
+        self.handles = {}
+
+
+class SharedOHLCV:
+    """Read-only view of one published symbol (see attach())."""
+    def __init__(self, handle):
+        self.symbol = handle['symbol']
+        self.rows = handle['rows']
+        price_dtype = np.dtype(handle['price_dtype'])
+        self._segment = None
+
+        if handle['mode'] == 'shm':
+            self._segment = _open_segment(handle['name'])
+            buf = self._segment.buf
+            self.timestamps = np.ndarray(self.rows, dtype=np.int64, buffer=buf)
+            self.prices = np.ndarray((len(COLUMNS), self.rows), dtype=price_dtype, buffer=buf, offset=self.rows * 8)
+        else:
+            self.timestamps = np.load(handle['name'] + '.ts.npy', mmap_mode='r')
+            self.prices = np.load(handle['name'] + '.ohlcv.npy', mmap_mode='r')
+
+        self.timestamps.flags.writeable = False
+        self.prices.flags.writeable = False
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, column):
+        return self.prices[COLUMNS.index(column)]
+
+    def frame(self):
+        """Standard OHLCV DataFrame whose columns are views on the shared data."""
+        index = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), name='datetime')
+        return pd.DataFrame({c: self.prices[i] for i, c in enumerate(COLUMNS)}, index=index, copy=False)
+
+    def close(self):
+        self.timestamps = self.prices = None
+        if self._segment is not None:
+            _close_segment(self._segment)
+            self._segment = None
+
+
+def attach(handle):
+    """Zero-copy view of a published symbol. Cached per process."""
+    view = _ATTACHED.get(handle['name'])
+    if view is None:
+        view = _ATTACHED[handle['name']] = SharedOHLCV(handle)
+    return view
@@ -0,0 +1,54 @@
+import os
+import pandas as pd
+
+from modules.data_loader import DataSource
+
+class CsvSource(DataSource):
+    """
+    CSV Backend
+    Falls back to synthetic data if the file hasn't been uploaded yet.
+    """
+    def _read(self, filepath, days=None, rows=None):
+        """CSV Loader (Supports days or fixed row count)"""
+        if not filepath or not os.path.exists(filepath):
+            # Generate dummy if missing
+            return self.loader._source('synthetic').generate(days if days else 30)
+            
+        try:
+            df = pd.read_csv(filepath)
+            df.columns = [c.lower() for c in df.columns]
+            if 'date' in df.columns: df['datetime'] = pd.to_datetime(df['date'])
+            elif 'timestamp' in df.columns: df['datetime'] = pd.to_datetime(df['timestamp'])
+            df.set_index('datetime', inplace=True)
+            
+            if rows:
+                return df.iloc[-rows:]
+            elif days:
+                return df.iloc[-(days*24):]
+            return df
+        except:
+            return pd.DataFrame()
+
+    def iter_chunks(self, asset_config, days=None, chunk_size=100_000):
+        """Reads the file incrementally (whole file; `days` is ignored)."""
+        filepath = asset_config.get('csv_path')
+        if not filepath or not os.path.exists(filepath):
+            yield from super().iter_chunks(asset_config, days=days or 30, chunk_size=chunk_size)
+            return
+        for df in pd.read_csv(filepath, chunksize=chunk_size):
+            df.columns = [c.lower() for c in df.columns]
+            if 'date' in df.columns: df['datetime'] = pd.to_datetime(df['date'])
+            elif 'timestamp' in df.columns: df['datetime'] = pd.to_datetime(df['timestamp'])
+            yield df.set_index('datetime')
+
+    def load(self, asset_config, days=30):
+        return self._read(asset_config.get('csv_path'), days=days)
+
+    def latest(self, asset_config, limit=200, timeframe='1h'):
+        # return tail of CSV
+        return self._read(asset_config.get('csv_path'), rows=limit)
+
+    def since(self, asset_config, since, timeframe='1h', limit=1000):
+        df = self._read(asset_config.get('csv_path'))
+        if df.empty: return df
+        return df[df.index >= pd.to_datetime(since, unit='ms')]
@@ -0,0 +1,107 @@
+import time
+
+import ccxt
+import pandas as pd
+
+from modules.candle_window import CandleWindow
+from modules.data_loader import DataSource, ohlcv_to_frame, timeframe_to_ms
+from modules.request_cache import ttl_to_candle_close
+
+class ExchangeSource(DataSource):
+    """
+    Exchange Backend (CCXT)
+    The only backend that needs ccxt; its import cost is paid on first use.
+    Recent candles are served from a rolling window per symbol that is
+    refreshed with delta fetches (see CandleWindow).
+    Assets with an 'exchange_url' talk to a local stand-in exchange
+    (modules.fake_exchange) instead of CCXT.
+    """
+    def __init__(self, loader):
+        super().__init__(loader)
+        self.windows = {}  # (exchange_id, symbol, timeframe) -> CandleWindow
+
+    def get_exchange(self, exchange_id):
+        """Lazy load exchange instances (shared via loader.exchanges)."""
+        exchanges = self.loader.exchanges
+        if exchange_id not in exchanges and exchange_id.startswith(('http://', 'https://')):
+            from modules.fake_exchange import FakeExchangeClient
+            exchanges[exchange_id] = FakeExchangeClient(exchange_id)
+        if exchange_id not in exchanges:
+            try:
+                # print(f"[DataLoader] Connecting to {exchange_id}...")
+                exchange_class = getattr(ccxt, exchange_id)
+                exchanges[exchange_id] = exchange_class({
+                    'enableRateLimit': True,
+                })
+            except AttributeError:
+                print(f"[DataLoader] Error: Exchange '{exchange_id}' not found in CCXT.")
+                return None
+        return exchanges.get(exchange_id)
+
+    def _exchange_id(self, asset_config):
+        return asset_config.get('exchange_url') or asset_config.get('exchange_id', self.loader.default_exchange_id)
+
+    def load(self, asset_config, days=30, timeframe='1h'):
+        """History Fetcher"""
+        symbol = asset_config['symbol']
+        exchange_id = self._exchange_id(asset_config)
+        exchange = self.get_exchange(exchange_id)
+        if not exchange: return pd.DataFrame()
+        
+        limit = 1000
+        since = int(exchange.milliseconds() - (days * 24 * 60 * 60 * 1000))
+        all_ohlcv = []
+        
+        print(f"   -> Fetching {days} days from {exchange_id}...")
+        while since < exchange.milliseconds():
+            try:
+                ohlcv = self.loader._fetch_ohlcv(exchange, exchange_id, symbol, timeframe, int(since), limit)
+                if not ohlcv: break
+                all_ohlcv.extend(ohlcv)
+                since = ohlcv[-1][0] + 1
+                if len(ohlcv) < limit: break
+            except Exception as e:
+                print(f"   [Error] Fetch failed: {e}")
+                break
+                
+        return ohlcv_to_frame(all_ohlcv)
+
+    def latest(self, asset_config, limit=200, timeframe='1h'):
+        symbol = asset_config['symbol']
+        exchange_id = self._exchange_id(asset_config)
+        exchange = self.get_exchange(exchange_id)
+        if not exchange: return pd.DataFrame()
+        key = (exchange_id, symbol, timeframe)
+        if key not in self.windows:
+            self.windows[key] = CandleWindow(timeframe, size=limit)
+        window = self.windows[key]
+
+        def refresh():
+            fetch = lambda since, page: exchange.fetch_ohlcv(symbol, timeframe, since, page)
+            return window.refresh(fetch, int(time.time() * 1000), limit)
+
+        try:
+            # The request cache coalesces concurrent refreshes and serves repeat polls until the TTL
+            ttl = ttl_to_candle_close(timeframe_to_ms(timeframe), int(time.time() * 1000), self.loader.cache_max_ttl)
+            df = self.loader.cache.get_or_fetch(('window',) + key + (limit,), refresh, ttl)
+            return df.copy(deep=False)  # Consumers add indicator columns to their copy
+        except Exception as e:
+            print(f"[Error] Fetch latest failed for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def since(self, asset_config, since, timeframe='1h', limit=1000):
+        symbol = asset_config['symbol']
+        exchange_id = self._exchange_id(asset_config)
+        exchange = self.get_exchange(exchange_id)
+        if not exchange: return pd.DataFrame()
+        all_ohlcv = []
+        try:
+            while True:
+                ohlcv = self.loader._fetch_ohlcv(exchange, exchange_id, symbol, timeframe, int(since), limit)
+                if not ohlcv: break
+                all_ohlcv.extend(ohlcv)
+                since = ohlcv[-1][0] + 1
+                if len(ohlcv) < limit: break
+        except Exception as e:
+            print(f"[Error] Backfill failed for {symbol}: {e}")
+        return ohlcv_to_frame(all_ohlcv)
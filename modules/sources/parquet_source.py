@@ -0,0 +1,51 @@
+import os
+import pandas as pd
+
+from modules.data_loader import DataSource
+
+class ParquetSource(DataSource):
+    """
+    Parquet Backend
+    Columnar OHLCV files (asset_config['parquet_path']). Requires pyarrow or
+    fastparquet, which pandas imports only when a file is read.
+    """
+    def _read(self, filepath):
+        if not filepath or not os.path.exists(filepath):
+            print(f"[DataLoader] Error: Parquet file '{filepath}' not found.")
+            return pd.DataFrame()
+        df = pd.read_parquet(filepath)
+        df.columns = [c.lower() for c in df.columns]
+        if not isinstance(df.index, pd.DatetimeIndex):
+            if 'timestamp' in df.columns: df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+            elif 'date' in df.columns: df['datetime'] = pd.to_datetime(df['date'])
+            df.set_index('datetime', inplace=True)
+        return df
+
+    def iter_chunks(self, asset_config, days=None, chunk_size=100_000):
+        """Reads record batches incrementally (whole file; `days` is ignored)."""
+        import pyarrow.parquet as pq
+
+        filepath = asset_config.get('parquet_path')
+        if not filepath or not os.path.exists(filepath):
+            print(f"[DataLoader] Error: Parquet file '{filepath}' not found.")
+            return
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunk_size):
+            df = batch.to_pandas()
+            df.columns = [c.lower() for c in df.columns]
+            if 'timestamp' in df.columns:
+                df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+                df.set_index('datetime', inplace=True)
+            yield df
+
+    def load(self, asset_config, days=30):
+        df = self._read(asset_config.get('parquet_path'))
+        if df.empty or not days: return df
+        return df[df.index >= df.index[-1] - pd.Timedelta(days=days)]
+
+    def latest(self, asset_config, limit=200, timeframe='1h'):
+        return self._read(asset_config.get('parquet_path')).iloc[-limit:]
+
+    def since(self, asset_config, since, timeframe='1h', limit=1000):
+        df = self._read(asset_config.get('parquet_path'))
+        if df.empty: return df
+        return df[df.index >= pd.to_datetime(since, unit='ms')]
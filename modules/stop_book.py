@@ -0,0 +1,154 @@
+import heapq
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+
+
+class StopBook:
+    """
+    ATR Stop Book (Turtle Stops for Grid Inventory)
+    One lot per filled buy, each with its initial 3x ATR stop. A lot's stop
+    is max(initial stop, highest trailing level `close - k * ATR` seen since
+    the lot was opened), so stops only ever move up.
+    Two indexes, both with lazy deletion (closed lots are skipped on pop):
+    - a max-heap on the initial stop: lots whose own stop is hit pop first
+    - the lots in entry order: the trailing part of the stop is a running
+      max since entry, so it never increases with entry time and the lots
+      it triggers form a prefix
+    Trailing levels sit in a monotonic stack (O(1) amortized per candle);
+    a lot's trailing max is one binary search. check() costs
+    O(log n + triggered) regardless of how many lots are open.
+    """
+    def __init__(self):
+        self.lots = {}  # id -> [entry_seq, price, size, initial stop]
+        self._next_id = 0
+        self._by_stop = []
+        self._by_entry = deque()
+        self._seq = 0  # Candles seen
+        self._trail_seq = []    # Monotonic stack: candle numbers (increasing) ...
+        self._trail_level = []  # ... and trailing levels (decreasing)
+        self._trail_start = 0
+
+    def __len__(self):
+        return len(self.lots)
+
+    @property
+    def size(self):
+        return sum(lot[2] for lot in self.lots.values())
+
+    def add(self, price, size, stop=None):
+        """Opens a lot (stop None / NaN: trailing stop only)."""
+        lot_id = self._next_id
+        self._next_id += 1
+        stop = stop if stop is not None and np.isfinite(stop) else -np.inf
+        self.lots[lot_id] = [self._seq, price, size, stop]
+        self._by_entry.append(lot_id)
+        if stop > -np.inf:
+            heapq.heappush(self._by_stop, (-stop, lot_id))
+        return lot_id
+
+    def reduce(self, size):
+        """Closes `size` of inventory FIFO (grid sells)."""
+        while size > 1e-12 and self._by_entry:
+            lot_id = self._by_entry[0]
+            lot = self.lots.get(lot_id)
+            if lot is None:
+                self._by_entry.popleft()
+                continue
+            qty = min(lot[2], size)
+            lot[2] -= qty
+            size -= qty
+            if lot[2] <= 1e-12:
+                del self.lots[lot_id]
+                self._by_entry.popleft()
+
+    def trail(self, level):
+        """Records this candle's trailing level (close - k * ATR) and closes the candle."""
+        if level is not None and np.isfinite(level) and self.lots:
+            while len(self._trail_level) > self._trail_start and self._trail_level[-1] <= level:
+                self._trail_seq.pop()
+                self._trail_level.pop()
+            self._trail_seq.append(self._seq)
+            self._trail_level.append(level)
+        self._seq += 1
+
+    def trail_span(self, levels):
+        """
+        trail() over several candles in which no lot opens or closes: for the
+        open lots only the span's highest level matters.
+        """
+        levels = np.asarray(levels, dtype=float)
+        if not len(levels):
+            return
+        finite = levels[np.isfinite(levels)]
+        self._seq += len(levels) - 1
+        self.trail(finite.max() if len(finite) else None)
+
+    def max_stop(self):
+        """Highest stop over all open lots (-inf when flat): the next low at or below it triggers."""
+        while self._by_stop and self._by_stop[0][1] not in self.lots:
+            heapq.heappop(self._by_stop)
+        while self._by_entry and self._by_entry[0] not in self.lots:
+            self._by_entry.popleft()
+        top = -self._by_stop[0][0] if self._by_stop else -np.inf
+        trailing = self._trailing_max(self.lots[self._by_entry[0]][0]) if self._by_entry else -np.inf
+        return max(top, trailing)
+
+    def _trailing_max(self, entry_seq):
+        i = bisect_left(self._trail_seq, entry_seq, self._trail_start)
+        return self._trail_level[i] if i < len(self._trail_level) else -np.inf
+
+    def stop_price(self, lot_id):
+        lot = self.lots[lot_id]
+        return max(lot[3], self._trailing_max(lot[0]))
+
+    def check(self, low):
+        """Removes and returns the lots stopped out by `low` as (size, stop price) pairs."""
+        triggered = []
+        while self._by_stop and -self._by_stop[0][0] >= low:
+            _, lot_id = heapq.heappop(self._by_stop)
+            if lot_id in self.lots:
+                triggered.append((self.lots[lot_id][2], self.stop_price(lot_id)))
+                del self.lots[lot_id]
+        while self._by_entry:
+            lot_id = self._by_entry[0]
+            if lot_id not in self.lots:
+                self._by_entry.popleft()
+                continue
+            level = self._trailing_max(self.lots[lot_id][0])
+            if low > level:
+                break
+            triggered.append((self.lots[lot_id][2], self.stop_price(lot_id)))
+            del self.lots[lot_id]
+            self._by_entry.popleft()
+        self._compact()
+        return triggered
+
+    def _compact(self):
+        """Drops trailing levels older than the oldest open lot."""
+        if not self.lots:
+            self._by_stop.clear()
+            self._by_entry.clear()
+            self._trail_seq, self._trail_level, self._trail_start = [], [], 0
+            return
+        oldest = self.lots[self._by_entry[0]][0] if self._by_entry[0] in self.lots else None
+        if oldest is not None:
+            self._trail_start = bisect_left(self._trail_seq, oldest, self._trail_start)
+        if self._trail_start > 1024 and self._trail_start > len(self._trail_seq) // 2:
+            del self._trail_seq[:self._trail_start]
+            del self._trail_level[:self._trail_start]
+            self._trail_start = 0
+
+    def snapshot(self):
+        """Open lots in entry order with their current stops (trailing folded in)."""
+        return [{'price': float(self.lots[i][1]), 'size': float(self.lots[i][2]),
+                 'stop': float(self.stop_price(i)) if np.isfinite(self.stop_price(i)) else None}
+                for i in self._by_entry if i in self.lots]
+
+    @classmethod
+    def from_snapshot(cls, lots):
+        book = cls()
+        for lot in lots:
+            book.add(lot['price'], lot['size'], lot['stop'])
+        return book
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import time
 import config
+from modules.orders import Signal
 
 class StrategyEngine:
     """
@@ -10,6 +11,10 @@ class StrategyEngine:
     1. Dynamic Grid Spacing (ATR-based 'Breathing' Mesh)
     2. Trend Following Filter (Simons' Don't fight the trend)
     3. Integration with 'The Fortress' (Risk Manager)
+    With regrid_on_events the grid is rebuilt only on events (first bar,
+    trend flip, ATR drift beyond regrid_atr_tolerance, price leaving the
+    grid range, or a fill); other bars return a 'hold' signal. The
+    Backtester can then skip quiet bars entirely (see regrid_events).
     """
 
     def __init__(self, symbol, risk_manager, config_override=None):
@@ -21,15 +26,22 @@ class StrategyEngine:
             'grid_levels': 20,
             'base_grid_step_pct': 0.01, # 1% base step
             'trend_ma_period': 200,      # Simple Moving Average for Trend
-            'min_atr_period': 14
+            'min_atr_period': 14,
+            'regrid_on_events': False,   # False: new grid every bar
+            'regrid_atr_tolerance': 0.25 # Relative ATR change that re-grids
         }
         if config_override:
             self.config.update(config_override)
 
         # State
-        self.grid_buy_orders = []  # List of prices
-        self.grid_sell_orders = [] # List of prices
+        self.grid_buy_orders = np.zeros(0)  # Buy level prices (descending)
+        self.grid_sell_orders = np.zeros(0) # Sell level prices (ascending)
         self.current_trend = 'neutral' # bullish, bearish, neutral
+        # Event re-gridding: state of the grid in force
+        self.grid_center = None
+        self.grid_atr = None
+        self.grid_trend = None
+        self.regrid_pending = False
 
     def add_indicators(self, price_history):
         """
@@ -76,24 +88,55 @@ class StrategyEngine:
         lower_limit = current_price * 0.90 # +/- 10% range for demo
         upper_limit = current_price * 1.10
         
-        # Create Levels
-        self.grid_buy_orders = []
-        self.grid_sell_orders = []
-        
-        # Buy Levels (Below current price)
-        price = current_price - dynamic_step
-        while price > lower_limit:
-            self.grid_buy_orders.append(price)
-            price -= dynamic_step
-            
-        # Sell Levels (Above current price)
-        price = current_price + dynamic_step
-        while price < upper_limit:
-            self.grid_sell_orders.append(price)
-            price += dynamic_step
+        # Create Levels: every step from the current price out to the range limits
+        steps = np.arange(1, int((upper_limit - lower_limit) / dynamic_step) + 2) * dynamic_step
+        buys = current_price - steps
+        sells = current_price + steps
+        self.grid_buy_orders = buys[buys > lower_limit]   # Buy Levels (Below current price)
+        self.grid_sell_orders = sells[sells < upper_limit] # Sell Levels (Above current price)
             
         return dynamic_step, len(self.grid_buy_orders) + len(self.grid_sell_orders)
 
+    def request_regrid(self):
+        """Called by the engine after fills: the next signal re-grids around the new position."""
+        self.regrid_pending = True
+
+    def _needs_regrid(self, current_price, atr, trend):
+        if self.regrid_pending or self.grid_center is None:
+            return True
+        if trend != self.grid_trend or not abs(atr / self.grid_atr - 1) <= self.config['regrid_atr_tolerance']:
+            return True
+        return not (self.grid_center * 0.90 < current_price < self.grid_center * 1.10)
+
+    def regrid_due(self, current_price, atr, sma):
+        """Scalar event check for one bar (what generate_signal decides in event mode)."""
+        if np.isnan(atr) or np.isnan(sma):
+            return True
+        return self._needs_regrid(current_price, atr, self.determine_trend(current_price, sma))
+
+    def regrid_events(self, close, atr, sma):
+        """
+        Vectorized _needs_regrid over upcoming bars (fills aside), for the
+        grid currently in force. Same comparisons as the scalar path, so
+        the result is bar-for-bar identical. NaN indicators count as events.
+        """
+        if self.regrid_pending or self.grid_center is None:
+            return np.ones(len(close), dtype=bool)
+        trend = np.where(close > sma, 1, np.where(close < sma, -1, 0))
+        grid_trend = {'bullish': 1, 'bearish': -1, 'neutral': 0}[self.grid_trend]
+        with np.errstate(invalid='ignore'):
+            drift = ~(np.abs(atr / self.grid_atr - 1) <= self.config['regrid_atr_tolerance'])
+            outside = ~((self.grid_center * 0.90 < close) & (close < self.grid_center * 1.10))
+        return (trend != grid_trend) | drift | outside | np.isnan(atr) | np.isnan(sma)
+
+    def grid_state(self):
+        return {'center': self.grid_center, 'atr': self.grid_atr, 'trend': self.grid_trend,
+                'pending': self.regrid_pending}
+
+    def load_grid_state(self, state):
+        self.grid_center, self.grid_atr = state['center'], state['atr']
+        self.grid_trend, self.regrid_pending = state['trend'], state['pending']
+
     def determine_trend(self, current_price, sma_value):
         """
         Jim Simons Style: Logic filters.
@@ -114,7 +157,13 @@ class StrategyEngine:
         
         # 2. Check Trend
         self.current_trend = self.determine_trend(current_price, sma)
-        
+
+        if self.config['regrid_on_events']:
+            if not self.regrid_due(current_price, atr, sma):
+                return Signal('hold', self.grid_buy_orders[:0], self.grid_sell_orders[:0], 0.0, self.current_trend)
+            self.grid_center, self.grid_atr, self.grid_trend = current_price, atr, self.current_trend
+            self.regrid_pending = False
+
         # 3. Dynamic Grid Logic
         # (In a real bot, we would only recalculate grid on significant events, 
         # but for this engine we calculate potential levels)
@@ -138,13 +187,13 @@ class StrategyEngine:
             price=current_price
         )
         
-        return {
-            'action': 'update_grid',
-            'buy_levels': self.grid_buy_orders if allow_buys else [],
-            'sell_levels': self.grid_sell_orders,
-            'suggested_size_per_grid': safe_size,
-            'trend': self.current_trend
-        }
+        return Signal(
+            action='update_grid',
+            buy_levels=self.grid_buy_orders if allow_buys else self.grid_buy_orders[:0],
+            sell_levels=self.grid_sell_orders,
+            suggested_size_per_grid=safe_size,
+            trend=self.current_trend
+        )
 
     def run_paper_trading(self):
         print("Paper Trading not fully implemented in Strategy Class yet.")
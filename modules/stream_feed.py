@@ -0,0 +1,389 @@
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from modules.candle_window import CANDLE_COLUMNS
+from modules.data_loader import timeframe_to_ms
+
+
+class CandleBuilder:
+    """
+    In-Memory Candle Aggregator
+    Folds trade / kline pushes for one symbol into OHLCV candles and keeps
+    a rolling window of closed candles for the strategy.
+    """
+    def __init__(self, symbol, timeframe='1h', window=200):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.closed = deque(maxlen=window)  # [ts, open, high, low, close, volume]
+        self.forming = None
+        self.dirty = False  # Forming candle missed pushes (disconnect): backfill it once it closes
+
+    @property
+    def last_closed_ts(self):
+        return self.closed[-1][0] if self.closed else None
+
+    @property
+    def next_expected_ts(self):
+        """Open time of the candle that should follow the forming (or last closed) one."""
+        if self.forming:
+            return self.forming[0] + self.tf_ms
+        if self.closed:
+            return self.closed[-1][0] + self.tf_ms
+        return None
+
+    def bucket(self, ts):
+        return ts - (ts % self.tf_ms)
+
+    def seed(self, df):
+        """Merges backfilled candles (standard OHLCV frame) into the window."""
+        if df is None or df.empty:
+            return
+        if 'timestamp' in df.columns:
+            stamps = df['timestamp'].astype('int64').tolist()
+        else:
+            stamps = df.index.as_unit('ms').asi8.tolist()
+        rows = zip(stamps, df['open'], df['high'], df['low'], df['close'], df['volume'])
+        known = {c[0]: c for c in self.closed}
+        for ts, o, h, l, c, v in rows:
+            # Only candles that are fully closed relative to the live one
+            if self.forming and ts >= self.forming[0]:
+                continue
+            known[int(ts)] = [int(ts), float(o), float(h), float(l), float(c), float(v)]
+        merged = sorted(known.values(), key=lambda c: c[0])
+        self.closed.clear()
+        self.closed.extend(merged)
+
+    def on_trade(self, ts, price, size=0.0):
+        """
+        Applies a trade. Returns the candles closed by this update (usually
+        none, one when the trade opens a new bucket).
+        """
+        start = self.bucket(ts)
+        closed = []
+        if self.forming and start > self.forming[0]:
+            closed.append(self._close_forming())
+        if self.forming is None:
+            if self.closed and start <= self.closed[-1][0]:
+                return closed  # Late trade for a candle that already closed
+            self.forming = [start, price, price, price, price, 0.0]
+        candle = self.forming
+        candle[2] = max(candle[2], price)
+        candle[3] = min(candle[3], price)
+        candle[4] = price
+        candle[5] += size
+        return closed
+
+    def on_kline(self, start, o, h, l, c, v, is_closed=False):
+        """Applies an exchange kline snapshot (replaces the forming candle)."""
+        closed = []
+        if self.forming and start > self.forming[0]:
+            closed.append(self._close_forming())
+        if self.closed and start <= self.closed[-1][0]:
+            return closed
+        self.forming = [start, o, h, l, c, v]
+        self.dirty = False  # A kline snapshot is complete by itself
+        if is_closed:
+            closed.append(self._close_forming())
+        return closed
+
+    def _close_forming(self):
+        candle = self.forming
+        self.forming = None
+        self.closed.append(candle)
+        return candle
+
+    def frame(self):
+        """Closed candles as the standard OHLCV DataFrame."""
+        df = pd.DataFrame(list(self.closed), columns=CANDLE_COLUMNS)
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('datetime', inplace=True)
+        return df
+
+
+class StreamEvent:
+    __slots__ = ('kind', 'symbol', 'price', 'ts', 'frame')
+
+    def __init__(self, kind, symbol, price=None, ts=None, frame=None):
+        self.kind = kind      # 'tick' or 'candle'
+        self.symbol = symbol
+        self.price = price
+        self.ts = ts
+        self.frame = frame
+
+
+class StreamingFeed:
+    """
+    Push-Based Market Feed
+    Consumes newline-delimited JSON trade/kline pushes from a WebSocket-style
+    endpoint, builds candles in memory, reconnects with backoff and backfills
+    any candles missed while disconnected.
+
+    Message schema (one JSON object per line):
+      {"type": "trade", "symbol": "BTC/USDT", "ts": ms, "price": p, "size": q}
+      {"type": "kline", "symbol": "BTC/USDT", "t": ms, "o": .., "h": .., "l": .., "c": .., "v": .., "closed": bool}
+    """
+    def __init__(self, host, port, symbols, timeframe='1h', window=200, backfill=None,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0, idle_timeout=90.0,
+                 max_reconnects=None):
+        self.host = host
+        self.port = port
+        self.timeframe = timeframe
+        self.builders = {s: CandleBuilder(s, timeframe, window) for s in symbols}
+        self.backfill = backfill  # callable(symbol, since_ms or None) -> DataFrame
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.idle_timeout = idle_timeout
+        self.max_reconnects = max_reconnects
+
+        self.running = True
+        self.reconnects = 0
+        self.gaps_backfilled = 0
+        self._sock = None
+
+    def prime(self):
+        """Warm-up: load history so indicators are ready on the first close."""
+        if not self.backfill:
+            return
+        now_ms = int(time.time() * 1000)
+        for symbol, builder in self.builders.items():
+            builder.seed(self.backfill(symbol, None))
+            # REST history includes the still-forming candle; the stream rebuilds it
+            if builder.closed and builder.closed[-1][0] + builder.tf_ms > now_ms:
+                builder.closed.pop()
+
+    def close(self):
+        self.running = False
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.idle_timeout)
+        sock.settimeout(self.idle_timeout)
+        self._sock = sock
+        return sock
+
+    def events(self):
+        """
+        Generator of StreamEvents:
+        - 'tick' on every price update (drive fill checks)
+        - 'candle' when a candle closes (drive strategy evaluation)
+        """
+        delay = self.reconnect_delay
+        while self.running:
+            try:
+                sock = self._connect()
+            except OSError as e:
+                if not self._should_retry():
+                    return
+                print(f"[StreamingFeed] Connect failed ({e}). Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            delay = self.reconnect_delay
+            try:
+                with sock, sock.makefile('r', encoding='utf-8') as stream:
+                    for line in stream:
+                        if not self.running:
+                            return
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            msg = json.loads(line)
+                        except ValueError:
+                            continue
+                        yield from self._handle(msg)
+            except (OSError, socket.timeout) as e:
+                print(f"[StreamingFeed] Connection lost ({e}).")
+            finally:
+                self._sock = None
+                # Pushes sent while we were away are lost, also inside the forming candle
+                for builder in self.builders.values():
+                    builder.dirty = builder.forming is not None
+
+            if not self.running or not self._should_retry():
+                return
+            print(f"[StreamingFeed] Disconnected. Reconnecting in {delay:.1f}s...")
+            time.sleep(delay)
+
+    def _should_retry(self):
+        if not self.running:
+            return False
+        self.reconnects += 1
+        return self.max_reconnects is None or self.reconnects <= self.max_reconnects
+
+    def _handle(self, msg):
+        symbol = msg.get('symbol')
+        builder = self.builders.get(symbol)
+        if builder is None:
+            return
+
+        kind = msg.get('type')
+        if kind == 'trade':
+            ts, price = int(msg['ts']), float(msg['price'])
+        elif kind == 'kline':
+            ts, price = int(msg['t']), float(msg['c'])
+        else:
+            return
+
+        # Gap check: new bucket beyond the candle we expected next, or a
+        # forming candle that was interrupted by a disconnect has closed
+        start = builder.bucket(ts)
+        expected = builder.next_expected_ts
+        interrupted = builder.dirty and builder.forming is not None and start > builder.forming[0]
+        if expected is not None and (start > expected or interrupted):
+            if self._backfill_gap(builder, start):
+                yield StreamEvent('candle', symbol, price=builder.closed[-1][4], ts=builder.closed[-1][0], frame=builder.frame())
+
+        if kind == 'trade':
+            closed = builder.on_trade(ts, price, float(msg.get('size', 0.0)))
+        else:
+            closed = builder.on_kline(ts, float(msg['o']), float(msg['h']), float(msg['l']),
+                                      price, float(msg.get('v', 0.0)), bool(msg.get('closed')))
+
+        if closed:
+            yield StreamEvent('candle', symbol, price=closed[-1][4], ts=closed[-1][0], frame=builder.frame())
+        yield StreamEvent('tick', symbol, price=price, ts=ts)
+
+    def _backfill_gap(self, builder, until):
+        """Fills candles in [next expected, until). Returns True if the window changed."""
+        since = builder.next_expected_ts
+        builder.dirty = False
+        if builder.forming:
+            # The forming candle closed while we were away: keep the partial
+            # version for now and let the backfill overwrite it.
+            since = builder.forming[0]
+            builder._close_forming()
+        if not self.backfill:
+            return True
+        df = self.backfill(builder.symbol, since)
+        if df is not None and not df.empty:
+            stamps = df['timestamp'] if 'timestamp' in df.columns else df.index.as_unit('ms').asi8
+            builder.seed(df[(stamps >= since) & (stamps < until)])
+            self.gaps_backfilled += 1
+            print(f"[StreamingFeed] Backfilled gap for {builder.symbol} since {pd.to_datetime(since, unit='ms')}.")
+        return True
+
+
+def messages_from_candles(df, symbol, ticks_per_candle=4):
+    """
+    Converts recorded OHLCV candles into a trade stream: each candle is
+    replayed as open -> low -> high -> close (bearish: open -> high -> low -> close).
+    """
+    tf_ms = None
+    if 'timestamp' in df.columns:
+        stamps = df['timestamp'].astype('int64').tolist()
+    else:
+        stamps = df.index.as_unit('ms').asi8.tolist()
+    if len(stamps) > 1:
+        tf_ms = stamps[1] - stamps[0]
+    tf_ms = tf_ms or 60 * 60 * 1000
+    step = tf_ms // max(ticks_per_candle, 1)
+
+    messages = []
+    volumes = df['volume'] if 'volume' in df.columns else [0.0] * len(df)
+    for ts, o, h, l, c, v in zip(stamps, df['open'], df['high'], df['low'], df['close'], volumes):
+        path = [o, l, h, c] if c >= o else [o, h, l, c]
+        size = float(v) / len(path)
+        for i, price in enumerate(path):
+            messages.append({'type': 'trade', 'symbol': symbol, 'ts': int(ts) + min(i * step, tf_ms - 1),
+                             'price': float(price), 'size': size})
+    return messages
+
+
+def load_recording(path):
+    """Reads a recorded JSONL stream (one push message per line)."""
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayServer:
+    """
+    Local Stand-In Feed (Testing)
+    Serves recorded push messages over TCP as newline-delimited JSON, the same
+    wire format StreamingFeed consumes. One live cursor is shared by all
+    clients, so messages pushed while nobody is connected are lost (like a
+    real exchange stream).
+
+    - speed: messages per second (None = as fast as possible)
+    - drop_after: force-close each connection after N messages (reconnect tests)
+    - skip_on_drop: messages lost during each forced disconnect (gap tests)
+    """
+    def __init__(self, messages, host='127.0.0.1', port=0, speed=None, drop_after=None, skip_on_drop=0):
+        self.messages = list(messages)
+        self.speed = speed
+        self.drop_after = drop_after
+        self.skip_on_drop = skip_on_drop
+        self.cursor = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(0.2)
+        self.host, self.port = self._server.getsockname()[:2]
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.cursor >= len(self.messages)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._server.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.connections += 1
+            # One client at a time keeps the replay deterministic
+            self._stream_to(conn)
+
+    def _stream_to(self, conn):
+        sent = 0
+        interval = 1.0 / self.speed if self.speed else 0.0
+        with conn:
+            while not self._stop.is_set() and not self.finished:
+                if self.drop_after and sent >= self.drop_after:
+                    with self._lock:
+                        self.cursor = min(self.cursor + self.skip_on_drop, len(self.messages))
+                    return
+                with self._lock:
+                    msg = self.messages[self.cursor]
+                    self.cursor += 1
+                try:
+                    conn.sendall((json.dumps(msg) + '\n').encode('utf-8'))
+                except OSError:
+                    return
+                sent += 1
+                if interval:
+                    time.sleep(interval)
+            # Recording exhausted: hang up (clients see EOF)
@@ -0,0 +1,223 @@
+import os
+import queue
+import signal
+import time
+import multiprocessing
+from collections import deque
+
+import pandas as pd
+
+import config
+from modules.paper_trader import PaperTrader, logger
+
+
+def shard_assets(assets, shards):
+    """Round-robin split of the asset list. Stable for a fixed shard count."""
+    shards = max(1, min(shards, len(assets)))
+    return [assets[i::shards] for i in range(shards)]
+
+
+class ShardTrader(PaperTrader):
+    """PaperTrader for one shard: reports heartbeats, equity and fills to the supervisor."""
+    def __init__(self, shard_id, events, **kwargs):
+        self.shard_id = shard_id
+        self.events = events
+        super().__init__(name=f"shard{shard_id}", **kwargs)
+
+    def _run_cycle(self):
+        started = time.monotonic()
+        super()._run_cycle()
+        equity = {s: self.portfolio[s].get('equity', self.portfolio[s]['balance']) for s in self.strategies}
+        self.events.put(('heartbeat', self.shard_id, {'cycle_s': time.monotonic() - started, 'equity': equity}))
+
+    def _check_fills(self, symbol, high, low, current_price):
+        before = len(self.portfolio[symbol]['trades'])
+        super()._check_fills(symbol, high, low, current_price)
+        for trade in self.portfolio[symbol]['trades'][before:]:
+            self.events.put(('fill', self.shard_id, {'symbol': symbol, **trade.to_dict()}))
+
+
+def _shard_main(shard_id, assets, state_file, events, max_days, poll_interval, loader_factory):
+    """
+    Worker process entry point. Unlike PaperTrader.run(), errors are not
+    swallowed: the process exits non-zero and the supervisor restarts it.
+    """
+    loader = loader_factory() if loader_factory else None
+    trader = ShardTrader(shard_id, events, state_file=state_file, assets=assets, loader=loader,
+                         max_days=max_days, poll_interval=poll_interval)
+    events.put(('started', shard_id, {'pid': os.getpid()}))
+    try:
+        while trader.running:
+            if max_days and (trader.clock() - trader.start_time) / (24 * 3600) >= max_days:
+                break
+            trader._run_cycle()
+            trader._sleep(poll_interval)
+    finally:
+        trader._save_state(final=True)
+
+
+class PaperSupervisor:
+    """
+    Sharded Paper Trading (Multi-Process)
+    Splits the portfolio into shards, each traded by its own worker process
+    (own PaperTrader, RiskManager and state journal data/paper_shard_<i>.json),
+    so one slow or stuck fetch only delays its own shard.
+    The supervisor:
+    - aggregates heartbeats, equity and fills from all workers
+    - restarts workers that crash (non-zero exit) or stop heart-beating
+    - forwards SIGINT/SIGTERM to the workers and waits for them to save state
+    Keep the shard count fixed between runs: journals are per shard.
+    """
+    def __init__(self, shards=4, max_days=None, state_dir='data', assets=None, poll_interval=60,
+                 stall_timeout=300, restart_delay=5, loader_factory=None, start_method='spawn'):
+        self.assets = assets if assets is not None else config.PORTFOLIO_CONFIG
+        self.shards = shard_assets(self.assets, shards)
+        self.max_days = max_days
+        self.state_dir = state_dir
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self.restart_delay = restart_delay
+        self.loader_factory = loader_factory  # Picklable callable -> loader, called inside each worker
+
+        self.ctx = multiprocessing.get_context(start_method)
+        self.events = self.ctx.Queue()
+        self.running = True
+        self.workers = {}
+        self.last_seen = {}
+        self.restarts = {i: 0 for i in range(len(self.shards))}
+        self.stopped = set()  # Shards that finished on their own (max_days)
+        self.equity = {}
+        self.cycles = {i: 0 for i in range(len(self.shards))}
+        self.cycle_time = {}
+        self.fill_count = 0
+        self.fills = deque(maxlen=1000)  # Most recent fills, all shards
+        self.last_log_time = 0
+
+        signal.signal(signal.SIGINT, self.terminate)
+        signal.signal(signal.SIGTERM, self.terminate)
+
+    def terminate(self, signum, frame):
+        logger.info("Signal received. Stopping shard workers...")
+        self.running = False
+
+    def state_file(self, shard_id):
+        return os.path.join(self.state_dir, f"paper_shard_{shard_id}.json")
+
+    def start(self):
+        logger.info(f"=== Starting {len(self.shards)} Paper Trading Shards ({len(self.assets)} assets) ===")
+        for shard_id in range(len(self.shards)):
+            self._spawn(shard_id)
+
+    def _spawn(self, shard_id):
+        worker = self.ctx.Process(
+            target=_shard_main,
+            args=(shard_id, self.shards[shard_id], self.state_file(shard_id), self.events,
+                  self.max_days, self.poll_interval, self.loader_factory),
+            name=f"paper-shard-{shard_id}",
+            daemon=True
+        )
+        worker.start()
+        self.workers[shard_id] = worker
+        self.last_seen[shard_id] = time.monotonic()
+
+    def run(self):
+        self.start()
+        try:
+            while self.running and len(self.stopped) < len(self.shards):
+                self.supervise(timeout=1.0)
+                if time.monotonic() - self.last_log_time > 10:
+                    self._log_status()
+        except KeyboardInterrupt:
+            logger.info("Supervisor Stopped (KeyboardInterrupt).")
+        finally:
+            self.shutdown()
+
+    def supervise(self, timeout=1.0):
+        """Drains worker events for up to `timeout` seconds, then checks worker health."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                kind, shard_id, payload = self.events.get(timeout=max(0.0, remaining))
+            except queue.Empty:
+                break
+            self._handle(kind, shard_id, payload)
+            if remaining <= 0:
+                break
+        if self.running:
+            self._check_workers()
+
+    def _handle(self, kind, shard_id, payload):
+        self.last_seen[shard_id] = time.monotonic()
+        if kind == 'heartbeat':
+            self.cycles[shard_id] += 1
+            self.cycle_time[shard_id] = payload['cycle_s']
+            self.equity.update(payload['equity'])
+        elif kind == 'fill':
+            self.fill_count += 1
+            self.fills.append({'shard': shard_id, **payload})
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for shard_id, worker in list(self.workers.items()):
+            if shard_id in self.stopped:
+                continue
+            if not worker.is_alive():
+                if worker.exitcode == 0:
+                    self.stopped.add(shard_id)
+                    continue
+                reason = f"exited with code {worker.exitcode}"
+            elif now - self.last_seen[shard_id] > self.stall_timeout:
+                reason = f"no heartbeat for {now - self.last_seen[shard_id]:.0f}s"
+                worker.kill()
+                worker.join(5)
+            else:
+                continue
+
+            # Restart, waiting restart_delay since the last sign of life to avoid crash loops
+            if now - self.last_seen[shard_id] < self.restart_delay:
+                continue
+            self.restarts[shard_id] += 1
+            logger.warning(f"[shard{shard_id}] Worker {reason}. Restarting (#{self.restarts[shard_id]})...")
+            self._spawn(shard_id)
+
+    def shutdown(self, timeout=30):
+        """Forwards SIGTERM to all workers; kills those that do not exit in time."""
+        self.running = False
+        for worker in self.workers.values():
+            if worker.is_alive():
+                worker.terminate()
+        deadline = time.monotonic() + timeout
+        for shard_id, worker in self.workers.items():
+            while worker.is_alive() and time.monotonic() < deadline:
+                self.supervise(timeout=0.1)  # Keep draining so workers never block on a full queue
+                worker.join(0.1)
+            if worker.is_alive():
+                logger.warning(f"[shard{shard_id}] Worker did not stop in time. Killing.")
+                worker.kill()
+                worker.join()
+        self.supervise(timeout=0)
+        self._log_status()
+        logger.info("Paper Supervisor Shutdown Complete.")
+
+    def _log_status(self):
+        self.last_log_time = time.monotonic()
+        alive = sum(w.is_alive() for w in self.workers.values())
+        logger.info(f"--- Supervisor: {alive}/{len(self.shards)} shards alive | "
+                    f"Equity: ${sum(self.equity.values()):.2f} | Fills: {self.fill_count} | "
+                    f"Restarts: {sum(self.restarts.values())} ---")
+
+    def report(self):
+        """Per-shard status summary."""
+        rows = []
+        for shard_id, assets in enumerate(self.shards):
+            symbols = [a['symbol'] for a in assets]
+            rows.append({
+                'Shard': shard_id,
+                'Assets': len(symbols),
+                'Equity $': sum(self.equity.get(s, 0.0) for s in symbols),
+                'Cycles': self.cycles[shard_id],
+                'Last Cycle s': self.cycle_time.get(shard_id, float('nan')),
+                'Restarts': self.restarts[shard_id]
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,69 @@
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from modules.data_loader import DataLoader
+from modules.fake_exchange import FakeExchangeServer
+from modules.paper_trader import PaperTrader
+
+def main():
+    parser = argparse.ArgumentParser(description="Paper trading loop against a local fake exchange")
+    parser.add_argument('--symbols', type=int, default=1000, help='Number of simulated symbols')
+    parser.add_argument('--cycles', type=int, default=3, help='Polling cycles to run')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with HTTP 500')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second (429 above)')
+    parser.add_argument('--cycle-budget', type=float, default=None, help='Scheduler cycle budget (s, default: none)')
+    parser.add_argument('--cache-ttl', type=float, default=0.0, help='DataLoader request cache TTL (s)')
+    args = parser.parse_args()
+
+    symbols = [f"SIM{i:04d}/USDT" for i in range(args.symbols)]
+    server = FakeExchangeServer(symbols, latency=args.latency, jitter=args.jitter,
+                                error_rate=args.error_rate, rate_limit=args.rate_limit)
+    assets = [{'symbol': s, 'type': 'crypto', 'source': 'exchange', 'exchange_url': server.url} for s in symbols]
+    logging.getLogger('PaperTrader').setLevel(logging.ERROR)
+
+    with server, tempfile.TemporaryDirectory() as tmp:
+        print(f"[LoadTest] Fake exchange on {server.url}: {args.symbols} symbols, latency {args.latency}s, "
+              f"errors {args.error_rate:.0%}, rate limit {args.rate_limit or 'none'}")
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            trader = PaperTrader(state_file=os.path.join(tmp, 'paper.json'), assets=assets,
+                                 loader=DataLoader(cache_max_ttl=args.cache_ttl),
+                                 scheduler_params={**config.SCHEDULER_PARAMS, 'cycle_budget': args.cycle_budget})
+
+        cycle_times = []
+        for cycle in range(args.cycles):
+            requests_before = server.requests
+            started = time.perf_counter()
+            with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                trader._run_cycle()
+            elapsed = time.perf_counter() - started
+            cycle_times.append(elapsed)
+            print(f"[LoadTest] Cycle {cycle + 1}: {elapsed:.2f}s | {args.symbols / elapsed:.0f} symbols/s | "
+                  f"{(server.requests - requests_before) / elapsed:.0f} req/s")
+
+        latency = trader.scheduler.latency_report()
+        stats = server.stats()
+        loader_stats = trader.loader.cache_stats()
+        print("\n=== Load Test Report ===")
+        print(f"Cycle time:     mean {np.mean(cycle_times):.2f}s  max {np.max(cycle_times):.2f}s")
+        print(f"Throughput:     {args.symbols * args.cycles / np.sum(cycle_times):.0f} symbol updates/s")
+        print(f"Requests:       {stats['requests']}  (errors {stats['errors']}, throttled {stats['throttled']})")
+        print(f"Candles served: {stats['rows_served']}  (window rows {loader_stats['window_rows']})")
+        if not latency.empty:
+            print(f"Fetch latency:  p50 {latency['p50 ms'].median():.1f}ms  p99 {latency['p99 ms'].max():.1f}ms "
+                  f"(slow {latency['Slow'].sum()}, stale {latency['Stale'].sum()})")
+        print("========================")
+
+if __name__ == "__main__":
+    main()
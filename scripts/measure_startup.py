@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Each probe runs in a fresh interpreter: entry-point imports + first data access
+PROBES = {
+    'backtest (csv)': (
+        "import main\n"
+        "from modules.data_loader import DataLoader\n"
+        "DataLoader().load_data({'symbol': 'AAPL', 'source': 'csv', 'csv_path': 'data/AAPL.csv'}, days=1)\n"
+    ),
+    'backtest (exchange)': (
+        "import main\n"
+        "from modules.data_loader import DataLoader\n"
+        "DataLoader()._source('exchange')\n"
+    ),
+    'paper (import)': "import modules.paper_trader\n",
+    'check_pnl': "sys.path.insert(0, 'scripts')\nimport check_pnl\n",
+}
+
+TEMPLATE = (
+    "import sys, time, io, contextlib\n"
+    "t0 = time.perf_counter()\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    exec(compile({code!r}, '<probe>', 'exec'))\n"
+    "print((time.perf_counter() - t0) * 1000, 'ccxt' in sys.modules)\n"
+)
+
+def measure(code, runs):
+    samples, ccxt_loaded = [], False
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', TEMPLATE.format(code=code)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split()
+        samples.append(float(out[-2]))
+        ccxt_loaded = out[-1] == 'True'
+    return statistics.median(samples), ccxt_loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time per run mode")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 50)
+    print(f"{'MODE':<22} | {'COLD START (ms)':<15} | {'CCXT':<5}")
+    print("-" * 50)
+    for mode, code in PROBES.items():
+        ms, ccxt_loaded = measure(code, args.runs)
+        print(f"{mode:<22} | {ms:<15.0f} | {'yes' if ccxt_loaded else 'no':<5}")
+    print("=" * 50 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.stream_feed import ReplayServer, load_recording, messages_from_candles
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in push feed (replays recorded data)")
+    parser.add_argument('--csv', type=str, help='OHLCV CSV to replay as trades')
+    parser.add_argument('--symbol', type=str, default='BTC/USDT', help='Symbol for --csv data')
+    parser.add_argument('--recording', type=str, help='Recorded JSONL stream to replay')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--speed', type=float, default=50.0, help='Messages per second (0 = unthrottled)')
+    args = parser.parse_args()
+
+    if args.recording:
+        messages = load_recording(args.recording)
+    elif args.csv:
+        df = pd.read_csv(args.csv)
+        df.columns = [c.lower() for c in df.columns]
+        if 'timestamp' not in df.columns:
+            df['timestamp'] = pd.to_datetime(df['date']).astype('int64') // 10**6
+        messages = messages_from_candles(df, args.symbol)
+    else:
+        parser.error("Provide --csv or --recording")
+
+    server = ReplayServer(messages, port=args.port, speed=args.speed or None)
+    print(f"[Replay] Serving {len(messages)} messages on {server.host}:{server.port}")
+    with server:
+        try:
+            while not server.finished:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(f"[Replay] Done ({server.connections} connections).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from modules.job_queue import DEFAULT_RUNNER, JobQueue, plan_sweep, run_local_workers
+
+def parse_grid(specs):
+    """['base_grid_step_pct=0.005,0.01', 'grid_levels=10,20'] -> {name: [values]}"""
+    grid = {}
+    for spec in specs or []:
+        name, values = spec.split('=', 1)
+        grid[name] = [json.loads(v) for v in values.split(',')]
+    return grid
+
+def parse_windows(spec, days):
+    """'4' -> 4 consecutive row windows over the data; empty -> whole history"""
+    if not spec:
+        return [None]
+    bars = int(days * 24)
+    step = bars // spec
+    return [(i * step, (i + 1) * step if i < spec - 1 else bars) for i in range(spec)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable parameter sweeps over a shared-directory job queue")
+    parser.add_argument('command', choices=['submit', 'work', 'status'])
+    parser.add_argument('--queue', type=str, default='data/sweep', help='Queue directory (shared between hosts)')
+    parser.add_argument('--grid', nargs='*', help='name=v1,v2,... over STRATEGY_PARAMS')
+    parser.add_argument('--windows', type=int, default=0, help='Split history into N windows per task')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--runner', type=str, default=DEFAULT_RUNNER)
+    parser.add_argument('--lease', type=float, default=300, help='Seconds before a silent worker\'s task is requeued')
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue, lease_timeout=args.lease)
+    if args.command == 'submit':
+        grid = parse_grid(args.grid)
+        if not grid:
+            parser.error("Provide at least one --grid parameter")
+        tasks = plan_sweep(config.PORTFOLIO_CONFIG, grid, parse_windows(args.windows, args.days), days=args.days)
+        queued = queue.submit(tasks)
+        print(f"[Sweep] {len(tasks)} tasks planned, {queued} queued ({len(tasks) - queued} already known).")
+    elif args.command == 'work':
+        print(f"[Sweep] Starting {args.workers} workers on {args.queue}...")
+        run_local_workers(args.queue, workers=args.workers, runner=args.runner, lease_timeout=args.lease)
+
+    print(f"[Sweep] Status: {queue.status()}")
+    if args.command == 'status':
+        results = queue.results()
+        if not results.empty:
+            with pd.option_context('display.width', 200, 'display.max_columns', 30):
+                print(results.drop(columns=['worker']).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
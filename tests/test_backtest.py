@@ -8,6 +8,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules.backtester import Backtester
 from modules.strategy_engine import StrategyEngine
 from modules.risk_manager import RiskManager
+from modules.scenario_generator import ScenarioGenerator
 
 class MockConfig:
     def get(self, key, default):
@@ -63,5 +64,96 @@ def test_backtester_simulation():
     else:
          print("[FAIL] Account Blown!")
 
+def test_streaming_matches_in_memory():
+    print("=== Testing Chunked Streaming Backtest ===\n")
+    generator = ScenarioGenerator(seed=4, sigma=0.004)
+    n = 5000
+
+    in_memory = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    in_memory.run(generator.generate(n, model='regime'))
+
+    # Chunks smaller than the SMA-200 window: indicator state must carry over
+    streamed = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    streamed.run_streaming(generator.iter_chunks(n, model='regime', chunk_size=150))
+
+    assert len(streamed.equity_curve) == n
+    assert np.array_equal(in_memory.equity_curve.equity(), streamed.equity_curve.equity())
+    assert in_memory.trade_history == streamed.trade_history
+    assert len(streamed.trade_history) > 0
+    print(f"[PASS] Streaming == in-memory ({len(streamed.trade_history)} trades).")
+
+def test_checkpoint_resume_matches_full_run(tmp_path):
+    print("=== Testing Backtest Checkpoint / Resume ===\n")
+    data = ScenarioGenerator(seed=9, sigma=0.004).generate(3000, model='regime')
+    split = 2200
+
+    full = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    full.run(data)
+
+    first = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    first.run(data.iloc[:split])
+    path = str(tmp_path / 'btc.json')
+    first.checkpoint(path)
+
+    # Fresh process state; the whole refreshed history is passed, only new bars run
+    resumed = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    resumed.load_checkpoint(path)
+    resumed.extend(data)
+
+    assert len(resumed.equity_curve) == len(data) - split
+    assert np.array_equal(resumed.equity_curve.equity(), full.equity_curve.equity()[split:])
+    offset = resumed.ledger_offsets['trades']
+    assert offset == len(first.trade_history) > 0
+    assert resumed.trade_history == full.trade_history[offset:]
+    assert resumed.balance == full.balance and resumed.inventory == full.inventory
+    assert resumed.strategy.risk_manager.peak_balance == full.strategy.risk_manager.peak_balance
+    assert resumed.checkpoint()['ledger_offsets'] == {'trades': len(full.trade_history), 'equity': len(data)}
+
+    # Exchange data (ms index): the indicator tail restores with its real dates
+    ms_first = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    ms_data = data.iloc[:split].copy()
+    ms_data.index = ms_data.index.as_unit('ms')
+    ms_first.run(ms_data)
+    ms_resumed = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig())), initial_balance=10000.0)
+    ms_resumed.load_checkpoint(ms_first.checkpoint())
+    assert ms_resumed._indicator_tail.index.equals(ms_first._indicator_tail.index)
+    print(f"[PASS] Resumed run simulated {len(data) - split} new bars, identical to a full rerun.")
+
+def test_event_skipping_matches_per_bar():
+    print("=== Testing Event-Skipping Backtest ===\n")
+    import contextlib, io
+    data = ScenarioGenerator(seed=3, sigma=0.004).generate(20000, model='gbm')
+    params = {'regrid_on_events': True, 'regrid_atr_tolerance': 0.5, 'base_grid_step_pct': 0.02}
+
+    # Exchange data comes with a datetime64[ms] index: fills and equity stay in ns
+    ms_data = data.copy()
+    ms_data.index = ms_data.index.as_unit('ms')
+
+    runs = {}
+    for name, frame, skipping in (('loop', data, False), ('skip', data, True), ('skip_ms', ms_data, True)):
+        bt = Backtester(StrategyEngine("BTC/USDT", RiskManager(MockConfig()), config_override=params))
+        bt.event_skipping = skipping
+        with contextlib.redirect_stdout(io.StringIO()):
+            bt.run(frame.copy())
+        runs[name] = bt
+
+    loop = runs['loop']
+    assert len(loop.trade_history) > 100
+    for skip in (runs['skip'], runs['skip_ms']):
+        assert np.array_equal(skip.equity_curve.equity(), loop.equity_curve.equity())
+        assert np.array_equal(skip.equity_curve.timestamps(), loop.equity_curve.timestamps())
+        assert skip.trade_history == loop.trade_history
+        assert skip.balance == loop.balance and skip.inventory == loop.inventory
+        assert skip.active_orders == loop.active_orders
+        assert skip.stop_book.snapshot() == loop.stop_book.snapshot()
+        for attr in ('peak_balance', 'current_drawdown', 'circuit_breaker_active'):
+            assert getattr(skip.strategy.risk_manager, attr) == getattr(loop.strategy.risk_manager, attr)
+        assert skip.strategy.grid_state() == loop.strategy.grid_state()
+    print(f"[PASS] Identical to the per-bar loop ({len(loop.trade_history)} trades), ns and ms indexes.")
+
 if __name__ == "__main__":
+    import tempfile, pathlib
     test_backtester_simulation()
+    test_streaming_matches_in_memory()
+    test_checkpoint_resume_matches_full_run(pathlib.Path(tempfile.mkdtemp()))
+    test_event_skipping_matches_per_bar()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.candle_window import CandleWindow
+from modules.data_loader import DataLoader
+
+HOUR = 3_600_000
+# Candle 500 is forming right now (the loader checks window age against the wall clock)
+NOW = int(time.time() * 1000)
+START = NOW - (NOW % HOUR) - 500 * HOUR
+
+class FakeExchange:
+    """
+    Hourly candles up to `now`; the last one is still forming (its close moves).
+    With honor_since=False, `since` requests only get the latest 3 candles.
+    """
+    def __init__(self, honor_since=True):
+        self.now = START + 500 * HOUR + 60_000
+        self.honor_since = honor_since
+        self.rows_sent = 0
+        self.calls = 0
+
+    def candle(self, ts):
+        price = 100 + np.sin(ts / HOUR / 7)
+        if ts + HOUR > self.now:  # forming
+            price += (self.now - ts) / HOUR
+        return [ts, price, price + 1, price - 1, price, 10.0]
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls += 1
+        last = self.now - (self.now % HOUR)
+        if since is None:
+            first = last - ((limit or 500) - 1) * HOUR
+        elif not self.honor_since:
+            first = last - 2 * HOUR
+        else:
+            first = since + (-since % HOUR)
+        count = int((last - first) // HOUR) + 1
+        rows = [self.candle(first + i * HOUR) for i in range(min(count, limit or 500))]
+        self.rows_sent += len(rows)
+        return rows
+
+def expected(exchange, n):
+    last = exchange.now - (exchange.now % HOUR)
+    return [exchange.candle(last - i * HOUR) for i in range(n)][::-1]
+
+def test_delta_fetch_replaces_forming_and_backfills():
+    print("=== Testing Delta Candle Window ===\n")
+    exchange = FakeExchange()
+    window = CandleWindow('1h', size=200, page_limit=50)
+    fetch = lambda since, limit: exchange.fetch_ohlcv('BTC/USDT', '1h', since, limit)
+
+    window.refresh(fetch, exchange.now, 200)
+    assert exchange.rows_sent == 200
+
+    # 58 polls inside the same hour: one row each (the forming candle);
+    # the poll at the top of the hour gets the closed candle + the new one
+    for minute in range(2, 61):
+        exchange.now = START + 500 * HOUR + minute * 60_000
+        df = window.refresh(fetch, exchange.now, 200)
+    assert exchange.rows_sent == 200 + 58 + 2
+    assert np.allclose(df[['open', 'high', 'low', 'close', 'volume']].to_numpy(), np.array(expected(exchange, 200))[:, 1:])
+    assert list(df['timestamp']) == [r[0] for r in expected(exchange, 200)]
+
+    # Paused for 3 days: missed candles backfilled in pages of 50, window stays 200
+    exchange.now += 72 * HOUR
+    df = window.refresh(fetch, exchange.now, 200)
+    assert len(df) == 200 and window.reloads == 1
+    assert list(df['timestamp']) == [r[0] for r in expected(exchange, 200)]
+    assert df.index.is_monotonic_increasing and not df.index.has_duplicates
+    print(f"[PASS] {exchange.rows_sent} rows downloaded vs {200 * 61} for full-window polling.")
+
+def test_gap_the_exchange_cannot_close_reloads():
+    exchange = FakeExchange(honor_since=False)
+    window = CandleWindow('1h', size=100)
+    fetch = lambda since, limit: exchange.fetch_ohlcv('ETH/USDT', '1h', since, limit)
+    window.refresh(fetch, exchange.now, 100)
+    exchange.now += 5 * HOUR
+    df = window.refresh(fetch, exchange.now, 100)
+    assert window.reloads == 2
+    assert list(df['timestamp']) == [r[0] for r in expected(exchange, 100)]
+    print("[PASS] Unclosable gap -> full reload.")
+
+def test_loader_serves_window_copies():
+    loader = DataLoader(default_exchange_id='fake', cache_max_ttl=0)
+    exchange = FakeExchange()
+    loader.exchanges['fake'] = exchange
+    asset = {'symbol': 'BTC/USDT', 'source': 'exchange'}
+
+    first = loader.fetch_latest_candles(asset, limit=200)
+    first['atr'] = 1.0
+    second = loader.fetch_latest_candles(asset, limit=200)
+    assert 'atr' not in second.columns
+    assert len(second) == 200 and exchange.rows_sent == 201
+    assert loader.cache_stats()['window_rows'] == 201
+    print("[PASS] DataLoader polls by delta; consumers get independent copies.")
+
+if __name__ == "__main__":
+    test_delta_fetch_replaces_forming_and_backfills()
+    test_gap_the_exchange_cannot_close_reloads()
+    test_loader_serves_window_copies()
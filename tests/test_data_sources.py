@@ -0,0 +1,42 @@
+import sys
+import os
+import subprocess
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from modules.data_loader import DataLoader, DataSource, register_source, SOURCE_BACKENDS
+
+class FixedSource(DataSource):
+    def load(self, asset_config, days=30):
+        return pd.DataFrame({'close': [1.0, 2.0]})
+
+def test_csv_mode_does_not_import_ccxt():
+    print("=== Testing Lazy Backend Imports ===\n")
+    code = (
+        "import sys\n"
+        "import main\n"
+        "from modules.data_loader import DataLoader\n"
+        "df = DataLoader().load_data({'symbol': 'AAPL', 'source': 'csv', 'csv_path': None}, days=2)\n"
+        "assert len(df) == 48\n"
+        "print('ccxt' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == 'False'
+    print("[PASS] CSV backtest path never imports ccxt.")
+
+def test_custom_backend_registry():
+    register_source('fixed', f'{__name__}:FixedSource')
+    try:
+        loader = DataLoader()
+        df = loader.load_data({'symbol': 'X', 'source': 'fixed'})
+        assert list(df['close']) == [1.0, 2.0]
+        assert loader.load_data({'symbol': 'X', 'source': 'nope'}).empty
+    finally:
+        SOURCE_BACKENDS.pop('fixed')
+    print("[PASS] Registered backend resolved by asset source.")
+
+if __name__ == "__main__":
+    test_csv_mode_does_not_import_ccxt()
+    test_custom_backend_registry()
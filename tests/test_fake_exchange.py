@@ -0,0 +1,102 @@
+import sys
+import os
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from modules.data_loader import DataLoader
+from modules.fake_exchange import FakeExchangeClient, FakeExchangeServer, RateLimitExceeded
+from modules.paper_trader import PaperTrader
+
+HOUR = 3_600_000
+
+def test_pagination_and_loader_url():
+    print("=== Testing Local Fake Exchange ===\n")
+    with FakeExchangeServer(['SIM0/USDT', 'SIM1/USDT']) as server:
+        client = FakeExchangeClient(server.url)
+        latest = client.fetch_ohlcv('SIM0/USDT', '1h', limit=10)
+        assert len(latest) == 10 and latest[-1][0] <= client.milliseconds() < latest[-1][0] + HOUR
+        # Pages stitch together without gaps and are deterministic
+        since = latest[-1][0] - 1500 * HOUR
+        first = client.fetch_ohlcv('SIM0/USDT', '1h', since, 5000)
+        second = client.fetch_ohlcv('SIM0/USDT', '1h', first[-1][0] + 1, 5000)
+        assert len(first) == 1000 and len(second) == 501 and second[0][0] == first[-1][0] + HOUR
+        assert client.fetch_ohlcv('SIM0/USDT', '1h', since, 5) == first[:5]
+        assert first[:5] != client.fetch_ohlcv('SIM1/USDT', '1h', since, 5)
+        assert all(r[3] <= min(r[1], r[4]) and r[2] >= max(r[1], r[4]) for r in first)
+
+        loader = DataLoader(cache_max_ttl=0)
+        asset = {'symbol': 'SIM1/USDT', 'source': 'exchange', 'exchange_url': server.url}
+        with contextlib.redirect_stdout(io.StringIO()):
+            history = loader.load_data(asset, days=60)
+        assert len(history) == 1440 and history.index.is_monotonic_increasing
+        assert len(loader.fetch_latest_candles(asset, limit=200)) == 200
+    print(f"[PASS] Paginated history and latest window through exchange_url ({server.requests} requests).")
+
+def test_serves_cached_frames():
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(0, 1, 1500))
+    frames = {}
+    for unit in ('ns', 'us', 'ms'):
+        index = pd.date_range('2024-01-01', periods=len(close), freq='h', unit=unit)
+        frames[f"{unit.upper()}/USDT"] = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                                                       'close': close, 'volume': 10.0}, index=index)
+    start_ms = int(pd.Timestamp('2024-01-01').value // 10**6)
+
+    with FakeExchangeServer(frames=frames) as server:
+        client = FakeExchangeClient(server.url)
+        for symbol, df in frames.items():
+            rows = client.fetch_ohlcv(symbol, '1h', start_ms + 10 * HOUR, 3)
+            assert [r[0] for r in rows] == [start_ms + k * HOUR for k in (10, 11, 12)]
+            assert [r[4] for r in rows] == list(df['close'].iloc[10:13])
+            # Latest window and pagination over the recorded history
+            assert client.fetch_ohlcv(symbol, '1h', limit=1)[0][0] == start_ms + (len(df) - 1) * HOUR
+            pages = client.fetch_ohlcv(symbol, '1h', start_ms) + client.fetch_ohlcv(symbol, '1h', start_ms + 1000 * HOUR)
+            assert [r[4] for r in pages] == list(df['close'])
+    print("[PASS] Cached frames (ns / us / ms index) served with millisecond timestamps.")
+
+def test_injected_errors_and_rate_limit():
+    with FakeExchangeServer(['SIM0/USDT'], error_rate=1.0) as server:
+        loader = DataLoader(cache_max_ttl=0)
+        asset = {'symbol': 'SIM0/USDT', 'source': 'exchange', 'exchange_url': server.url}
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert loader.fetch_latest_candles(asset).empty
+        assert server.errors == 1
+
+    with FakeExchangeServer(['SIM0/USDT'], rate_limit=5) as server:
+        client = FakeExchangeClient(server.url)
+        throttled = 0
+        for _ in range(20):
+            try:
+                client.fetch_ohlcv('SIM0/USDT', '1h', limit=2)
+            except RateLimitExceeded:
+                throttled += 1
+        assert throttled == server.throttled and 10 <= throttled <= 15
+    print(f"[PASS] Injected HTTP 500s handled; {throttled}/20 requests over the 5 req/s limit got 429.")
+
+def test_paper_loop_against_many_symbols(tmp_path):
+    symbols = [f"SIM{i:03d}/USDT" for i in range(120)]
+    with FakeExchangeServer(symbols, latency=0.001) as server:
+        assets = [{'symbol': s, 'source': 'exchange', 'exchange_url': server.url} for s in symbols]
+        with contextlib.redirect_stdout(io.StringIO()):
+            trader = PaperTrader(state_file=str(tmp_path / 'paper.json'), assets=assets,
+                                 loader=DataLoader(cache_max_ttl=0),
+                                 scheduler_params={**config.SCHEDULER_PARAMS, 'cycle_budget': None})
+            trader._run_cycle()
+            trader._run_cycle()
+        assert server.requests == 2 * len(symbols)  # Second cycle: one delta fetch per symbol
+        assert all('equity' in trader.portfolio[s] for s in symbols)
+        assert len(trader.portfolio_risk) > 0
+    print(f"[PASS] 2 paper cycles over {len(symbols)} symbols, {server.rows_served} candles served.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_pagination_and_loader_url()
+    test_serves_cached_frames()
+    test_injected_errors_and_rate_limit()
+    test_paper_loop_against_many_symbols(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import contextlib
+import io
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from modules import job_queue
+from modules.job_queue import JobQueue, SweepWorker, plan_sweep, run_backtest_task, run_local_workers
+from modules.shared_data import SharedOHLCVRegistry, attach
+
+ASSETS = [{'symbol': 'SYN-A', 'source': 'synthetic', 'seed': 1},
+          {'symbol': 'SYN-B', 'source': 'synthetic', 'seed': 2}]
+GRID = {'base_grid_step_pct': [0.005, 0.01], 'grid_levels': [3, 5]}
+WINDOWS = [(0, 120), (120, 240)]
+
+def failing_runner(task):
+    raise RuntimeError("boom")
+
+def printing_runner(task):
+    print(f"running {task['id']}")
+    return {'ok': 1.0}
+
+def test_plan_is_deterministic():
+    print("=== Testing Sweep Job Queue ===\n")
+    tasks = plan_sweep(ASSETS, GRID, WINDOWS, days=10)
+    assert len(tasks) == 2 * 4 * 2
+    assert len({t['id'] for t in tasks}) == len(tasks)
+    assert [t['id'] for t in tasks] == [t['id'] for t in plan_sweep(ASSETS, GRID, WINDOWS, days=10)]
+    print(f"[PASS] {len(tasks)} tasks with stable ids.")
+
+def test_workers_drain_and_study_resumes(tmp_path):
+    root = str(tmp_path / 'sweep')
+    queue = JobQueue(root, lease_timeout=2)
+    tasks = plan_sweep(ASSETS, GRID, WINDOWS, days=10)
+    assert queue.submit(tasks) == 16
+
+    # A worker that died mid-task: its claim sits in running/ with a stale lease
+    orphan = queue.claim()
+    os.utime(os.path.join(root, 'running', f"{orphan['id']}.json"), (time.time() - 60,) * 2)
+
+    # Interrupted study: three workers stop after two tasks each
+    assert run_local_workers(root, workers=3, lease_timeout=2, max_tasks=2) == [0, 0, 0]
+    status = queue.status()
+    assert status['done'] == 6 and status['running'] == 0
+
+    # Resume: resubmitting the full plan only queues what is not done yet
+    assert queue.submit(plan_sweep(ASSETS, GRID, WINDOWS, days=10)) == 0
+    assert run_local_workers(root, workers=3, lease_timeout=2) == [0, 0, 0]
+    assert queue.status() == {'pending': 0, 'running': 0, 'done': 16, 'failed': 0}
+
+    results = queue.results()
+    assert len(results) == 16 and results['id'].is_unique
+    assert results['worker'].nunique() > 1
+    assert orphan['id'] in set(results['id'])
+
+    # Same numbers as running the task in-process
+    row = results.set_index('id').loc[tasks[5]['id']]
+    assert abs(row['Final Equity'] - run_backtest_task(tasks[5])['Final Equity']) < 1e-9
+    print(f"[PASS] 16 tasks across {results['worker'].nunique()} workers, orphan requeued, resume skipped done work.")
+
+def test_failing_task_is_retried_then_parked(tmp_path):
+    queue = JobQueue(str(tmp_path / 'sweep'), max_attempts=2)
+    queue.submit(plan_sweep(ASSETS[:1], {'grid_levels': [3]}, days=10))
+    worker = SweepWorker(queue, worker_id='local', runner='tests.test_job_queue:failing_runner')
+    assert worker.run() == 0
+    assert queue.status() == {'pending': 0, 'running': 0, 'done': 0, 'failed': 1}
+    print("[PASS] Failing task retried, then parked in failed/.")
+
+def test_leases_and_worker_crashes(tmp_path):
+    root = str(tmp_path / 'sweep')
+    queue = JobQueue(root, lease_timeout=30, max_attempts=2)
+    queue.submit(plan_sweep(ASSETS[:1], {'grid_levels': [3]}, days=10))
+    [tid] = [f[:-5] for f in os.listdir(os.path.join(root, 'pending'))]
+    running = os.path.join(root, 'running', f"{tid}.json")
+
+    # A task that waited in pending longer than the lease is not stale right after its claim
+    os.utime(os.path.join(root, 'pending', f"{tid}.json"), (time.time() - 600,) * 2)
+    assert queue.claim()['id'] == tid
+    assert queue.requeue_stale() == 0 and os.path.exists(running)
+
+    # A task that keeps killing its worker counts attempts and is parked
+    for attempt in (1, 2):
+        os.utime(running, (time.time() - 600,) * 2)
+        assert queue.requeue_stale() == 1
+        if attempt == 1:
+            assert queue.claim()['attempts'] == 1
+    assert queue.status() == {'pending': 0, 'running': 0, 'done': 0, 'failed': 1}
+
+    # quiet=False lets the runner's output through
+    queue = JobQueue(str(tmp_path / 'loud'))
+    queue.submit(plan_sweep(ASSETS[:1], {'grid_levels': [3]}, days=10))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        SweepWorker(queue, runner='tests.test_job_queue:printing_runner', quiet=False).run()
+    assert 'running ' in out.getvalue()
+    print("[PASS] Fresh lease on claim, crash attempts counted, verbose workers print.")
+
+def test_workers_share_published_data(tmp_path):
+    queue = JobQueue(str(tmp_path / 'sweep'))
+    tasks = plan_sweep(ASSETS, GRID, WINDOWS, days=10)
+    queue.submit(tasks)
+    expected = run_backtest_task(tasks[5])
+    with SharedOHLCVRegistry() as registry:
+        handles = job_queue._publish_pending(queue, registry)
+        assert sorted(handles) == [('SYN-A', 10), ('SYN-B', 10)]
+        job_queue._SHARED_DATA.update(handles)
+        try:
+            # The task reads the published candles in place and gets the same result
+            data = job_queue.task_data(tasks[5])
+            assert np.shares_memory(data['close'].to_numpy(), attach(handles[('SYN-A', 10)])['close'])
+            assert abs(run_backtest_task(tasks[5])['Final Equity'] - expected['Final Equity']) < 1e-9
+        finally:
+            job_queue._SHARED_DATA.clear()
+    print(f"[PASS] {len(handles)} symbols published once for {len(tasks)} tasks.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_plan_is_deterministic()
+    test_workers_drain_and_study_resumes(pathlib.Path(tempfile.mkdtemp()))
+    test_failing_task_is_retried_then_parked(pathlib.Path(tempfile.mkdtemp()))
+    test_leases_and_worker_crashes(pathlib.Path(tempfile.mkdtemp()))
+    test_workers_share_published_data(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,91 @@
+import sys
+import os
+import json
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.paper_replay import SimulatedClock, ReplayLoader
+from modules.multiplexer import PaperMultiplexer
+
+def make_history(days=12, seed=3):
+    rng = np.random.default_rng(seed)
+    periods = days * 24
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='h')
+    close = 100 + np.cumsum(rng.normal(0.03, 0.6, periods))
+    return pd.DataFrame({'open': close, 'high': close + 1.0, 'low': close - 1.0,
+                         'close': close, 'volume': 1000.0}, index=dates)
+
+class CountingLoader(ReplayLoader):
+    calls = 0
+    def fetch_latest_candles(self, asset_config, limit=200, timeframe='1h'):
+        CountingLoader.calls += 1
+        return super().fetch_latest_candles(asset_config, limit, timeframe)
+
+def test_variants_share_feed_with_isolated_books(tmp_path):
+    print("=== Testing Strategy Multiplexer ===\n")
+    data = {'BTC/USDT': make_history(), 'ETH/USDT': make_history(seed=5)}
+    clock = SimulatedClock()
+    loader = CountingLoader(data, clock)
+    assets = [{'symbol': s} for s in data]
+    variants = [
+        {'name': 'tight', 'strategy_params': {'base_grid_step_pct': 0.005}},
+        {'name': 'wide', 'strategy_params': {'base_grid_step_pct': 0.03}},
+        {'name': 'defensive', 'risk_params': {'max_drawdown_limit': 0.05}},
+    ]
+    mux = PaperMultiplexer(variants, state_dir=str(tmp_path), assets=assets, loader=loader, clock=clock)
+
+    closes = loader.close_ms['BTC/USDT'][200:] / 1000.0
+    for ts in closes:
+        clock.advance_to(ts)
+        mux._run_cycle()
+
+    # One fetch per symbol per cycle, regardless of the number of variants
+    assert CountingLoader.calls == len(closes) * len(data)
+
+    books = {}
+    for name in ['tight', 'wide', 'defensive']:
+        with open(tmp_path / f'paper_portfolio_{name}.json') as f:
+            books[name] = json.load(f)
+    assert set(books['tight']) == set(data)
+    # Isolation: different grids -> different fills per sub-portfolio
+    assert books['tight']['BTC/USDT']['trades'] != books['wide']['BTC/USDT']['trades']
+    assert mux.traders['tight'].risk_manager is not mux.traders['defensive'].risk_manager
+
+    report = mux.report()
+    print(report.to_string(index=False))
+    assert list(report['Variant']) == ['tight', 'wide', 'defensive']
+    print("[PASS] Variants traded isolated books from one shared fetch per symbol.")
+
+def test_shared_fetch_is_guarded(tmp_path):
+    print("=== Testing Multiplexer Fetch Guards ===\n")
+    data = {'BTC/USDT': make_history(), 'ETH/USDT': make_history(seed=5)}
+    clock = SimulatedClock()
+    loader = ReplayLoader(data, clock)
+    # A symbol without data must not hold back the portfolio-risk warm-up
+    assets = [{'symbol': s} for s in data] + [{'symbol': 'DEAD/USDT'}]
+    variants = [{'name': 'a'}, {'name': 'b', 'strategy_params': {'base_grid_step_pct': 0.03}}]
+    mux = PaperMultiplexer(variants, state_dir=str(tmp_path), assets=assets, loader=loader, clock=clock,
+                           poll_interval=5)
+    assert mux.poll_interval == 5
+
+    clock.advance_to(loader.close_ms['BTC/USDT'][200] / 1000.0)
+    mux._run_cycle()
+    for trader in mux.traders.values():
+        assert trader.portfolio_risk.bar_time is not None and not trader._risk_history
+        assert trader.portfolio['BTC/USDT']['active_orders']
+
+    # Stale candles (feed stopped 10h ago): fills still run, but no variant re-grids on them
+    signals = []
+    for trader in mux.traders.values():
+        trader._evaluate_signal = lambda symbol, df, latest_slice=None: signals.append(symbol)
+    clock.advance_to(loader.close_ms['BTC/USDT'][-1] / 1000.0 + 10 * 3600)
+    mux._run_cycle()
+    assert mux.scheduler.counters['BTC/USDT']['stale'] == 1 and signals == []
+    print("[PASS] Stale shared fetch skipped for all variants; warm-up not blocked by a dead symbol.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_variants_share_feed_with_isolated_books(pathlib.Path(tempfile.mkdtemp()))
+    test_shared_fetch_is_guarded(pathlib.Path(tempfile.mkdtemp()))
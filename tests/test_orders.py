@@ -0,0 +1,109 @@
+import sys
+import os
+import json
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.orders import Fill, FillLog, Order, Side, Signal
+from modules.analytics import trades_to_columns
+
+def test_slotted_types():
+    print("=== Testing Compact Order / Fill / Signal Types ===\n")
+    order = Order(Side.BUY, 100.5, 0.25)
+    assert not hasattr(order, '__dict__')
+    assert Order.from_dict(order.to_dict()) == order
+    assert order.to_dict() == {'side': 'buy', 'price': 100.5, 'size': 0.25}
+    assert Side.parse('sell') is Side.SELL and Side.parse(1) is Side.BUY
+
+    signal = Signal('update_grid', np.array([99.0, 98.0]), np.array([101.0]), 0.1, 'bullish')
+    # Read access by key still works for callers written against the old dict
+    assert signal['trend'] == 'bullish' and signal.get('action') == 'update_grid'
+    assert signal.get('missing', 0) == 0 and len(signal['buy_levels']) == 2
+    print("[PASS] Slotted types, dict-style read access on Signal.")
+
+def test_fill_log_columns():
+    log = FillLog()
+    fills = [Fill(i * 3_600_000_000_000, Side.BUY if i % 3 else Side.SELL, 100.0 + i, 0.5, 0.05) for i in range(10)]
+    for fill in fills:
+        log.append(fill)
+
+    assert len(log) == 10 and log[3] == fills[3] and log[-2:] == fills[-2:]
+    assert log == fills
+    cols = log.columns()
+    assert cols['time'].dtype == np.int64 and np.shares_memory(cols['price'], np.frombuffer(log.prices))
+    assert list(cols['is_buy']) == [f.side is Side.BUY for f in fills]
+    # Same analytics input from a FillLog, a list of Fill and JSON dicts
+    as_dicts = trades_to_columns([{**f.to_dict(), 'time': np.datetime64(f.time, 'ns')} for f in fills])
+    for key in cols:
+        assert np.array_equal(cols[key], as_dicts[key])
+        assert np.array_equal(cols[key], trades_to_columns(fills)[key])
+    print("[PASS] Array-backed fill ledger feeds analytics without copies.")
+
+def test_paper_state_file_format(tmp_path):
+    from modules.paper_trader import PaperTrader
+
+    state_file = tmp_path / 'paper.json'
+    legacy = {'BTC/USDT': {
+        'balance': 90.0, 'inventory': 0.1, 'equity': 100.0, 'last_price': 100.0,
+        'active_orders': [{'side': 'sell', 'price': 105.0, 'size': 0.1}],
+        'trades': [{'side': 'buy', 'price': 99.0, 'size': 0.1, 'fee': 0.0099, 'time': '2024-01-01 10:00:00'}]
+    }}
+    state_file.write_text(json.dumps(legacy))
+
+    trader = PaperTrader(state_file=str(state_file), assets=[{'symbol': 'BTC/USDT'}])
+    state = trader.portfolio['BTC/USDT']
+    assert state['active_orders'] == [Order(Side.SELL, 105.0, 0.1)]
+    assert isinstance(state['trades'][0], Fill) and isinstance(state['trades'][0].time, int)
+
+    # Objects in memory, the old JSON format on disk
+    trader._save_state()
+    assert json.loads(state_file.read_text()) == legacy
+    print("[PASS] JSON only at the persistence boundary; file format unchanged.")
+
+def test_paper_state_bad_records(tmp_path):
+    from modules.paper_trader import PaperTrader
+
+    state_file = tmp_path / 'paper.json'
+    saved = {'BTC/USDT': {
+        'balance': 50.0, 'inventory': 0.4, 'active_orders': [{'side': 'buy', 'price': 95.0}],
+        'trades': [{'side': 'buy', 'price': 99.0, 'size': 0.4, 'fee': 0.04, 'time': '2024-01-01 10:00:00'},
+                   {'side': 'buy', 'price': 98.0, 'size': 0.1, 'fee': 0.01, 'time': 'not a time'}]
+    }}
+    state_file.write_text(json.dumps(saved))
+
+    # One bad fill / order is skipped; the account itself survives
+    trader = PaperTrader(state_file=str(state_file), assets=[{'symbol': 'BTC/USDT'}])
+    state = trader.portfolio['BTC/USDT']
+    assert state['balance'] == 50.0 and state['inventory'] == 0.4
+    assert len(state['trades']) == 1 and state['active_orders'] == []
+    assert json.loads(state_file.read_text())['BTC/USDT']['balance'] == 50.0
+
+    # An unreadable file is moved aside, never overwritten
+    state_file.write_text('{"BTC/USDT": {"balance": 50.0,')
+    PaperTrader(state_file=str(state_file), assets=[{'symbol': 'BTC/USDT'}])
+    backups = list(tmp_path.glob('paper.json.corrupt-*'))
+    assert len(backups) == 1 and backups[0].read_text() == '{"BTC/USDT": {"balance": 50.0,'
+    print("[PASS] Malformed records are skipped; corrupt state files are backed up.")
+
+def test_paper_state_in_working_dir(tmp_path):
+    from modules.paper_trader import PaperTrader
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        trader = PaperTrader(state_file='paper.json', assets=[{'symbol': 'BTC/USDT'}])
+        trader._save_state(final=True)
+    finally:
+        os.chdir(cwd)
+    assert {'paper.json', 'paper_risk.json'} <= set(os.listdir(tmp_path))
+    print("[PASS] A bare state file name is saved in the working directory.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_slotted_types()
+    test_fill_log_columns()
+    test_paper_state_file_format(pathlib.Path(tempfile.mkdtemp()))
+    test_paper_state_bad_records(pathlib.Path(tempfile.mkdtemp()))
+    test_paper_state_in_working_dir(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.portfolio_risk import PortfolioRisk
+from modules.risk_manager import RiskManager
+
+def correlated_closes(n_bars, n_assets, corr, vol=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, vol, (n_bars, 1))
+    own = rng.normal(0, vol, (n_bars, n_assets))
+    returns = np.sqrt(corr) * common + np.sqrt(1 - corr) * own
+    index = pd.date_range('2024-01-01', periods=n_bars, freq='h')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index,
+                        columns=[f"S{i}" for i in range(n_assets)])
+
+def test_incremental_matches_rolling_covariance():
+    print("=== Testing Incremental Cross-Asset Covariance ===\n")
+    closes = correlated_closes(600, 4, corr=0.7)
+    risk = PortfolioRisk(closes.columns, window=100)
+    # Symbols report one at a time; the bar commits when the next one starts
+    for t, row in closes.iterrows():
+        for symbol, price in row.sample(frac=1, random_state=len(risk)).items():
+            risk.observe(symbol, t, price)
+    risk.observe('S0', closes.index[-1] + pd.Timedelta(hours=1), closes['S0'].iloc[-1])
+
+    returns = np.log(closes / closes.shift(1)).iloc[1:]
+    expected = returns.iloc[-100:].cov().to_numpy()
+    assert len(risk) == 100
+    assert np.allclose(risk.covariance(), expected, rtol=1e-9, atol=1e-15)
+    assert np.allclose(risk.correlation().to_numpy(), returns.iloc[-100:].corr().to_numpy())
+    print("[PASS] Streaming per-symbol updates == pandas rolling covariance.")
+
+def test_warm_up_then_observe():
+    closes = correlated_closes(300, 3, corr=0.5, seed=1)
+    warm = PortfolioRisk(closes.columns, window=50)
+    warm.warm_up(closes.iloc[:200])
+    for t, row in closes.iloc[199:].iterrows():
+        for symbol, price in row.items():
+            warm.observe(symbol, t, price)
+    streamed = PortfolioRisk(closes.columns, window=50)
+    for t, row in closes.iterrows():
+        for symbol, price in row.items():
+            streamed.observe(symbol, t, price)
+    assert np.allclose(warm.covariance(), streamed.covariance())
+    print("[PASS] History warm-up continues seamlessly into live updates.")
+
+def test_correlation_shrinks_position_size():
+    together = PortfolioRisk([f"S{i}" for i in range(3)], window=500, vol_target=0.5)
+    apart = PortfolioRisk([f"S{i}" for i in range(3)], window=500, vol_target=0.5)
+    together.warm_up(correlated_closes(501, 3, corr=0.9, seed=2))
+    apart.warm_up(correlated_closes(501, 3, corr=0.0, seed=2))
+    assert together.portfolio_volatility() > 1.4 * apart.portfolio_volatility()
+    assert together.scale() < apart.scale() <= 1.0
+
+    rm = RiskManager({})
+    base = rm.calculate_position_size(1000.0, 2.0, 100.0)
+    rm.portfolio_scale = together.scale()
+    assert np.isclose(rm.calculate_position_size(1000.0, 2.0, 100.0), base * together.scale())
+    assert np.isclose(rm.calculate_position_size_batch(1000.0, np.array([2.0]), 100.0)[0], base * together.scale())
+    report = together.report()
+    assert np.isclose(report['Risk %'].sum(), 100.0) and (report['Avg Corr'] > 0.8).all()
+    print(f"[PASS] Scale {together.scale():.2f} (corr 0.9) vs {apart.scale():.2f} (uncorrelated).")
+
+def test_hundreds_of_symbols_stay_cheap():
+    n = 300
+    risk = PortfolioRisk([f"S{i}" for i in range(n)], window=168)
+    rng = np.random.default_rng(3)
+    bars = rng.normal(0, 0.01, (400, n))
+    # Work per bar: a rank-1 update, a full rebuild only once per window, one volatility per push
+    calls = {'_rebuild': 0, 'portfolio_volatility': 0}
+    def counted(name):
+        method = getattr(risk, name)
+        def wrapper(*args):
+            calls[name] += 1
+            return method(*args)
+        setattr(risk, name, wrapper)
+    counted('_rebuild')
+    counted('portfolio_volatility')
+    started = time.perf_counter()
+    for row in bars:
+        risk.push(row)
+        risk.scale()
+        risk.scale()
+    per_bar = (time.perf_counter() - started) / len(bars)
+    assert np.allclose(risk.covariance(), np.cov(bars[-168:].T))
+    assert calls['_rebuild'] == len(bars) // 168 and calls['portfolio_volatility'] <= len(bars)
+    print(f"[PASS] {n} symbols: {per_bar*1000:.2f} ms per bar update + scale.")
+
+if __name__ == "__main__":
+    test_incremental_matches_rolling_covariance()
+    test_warm_up_then_observe()
+    test_correlation_shrinks_position_size()
+    test_hundreds_of_symbols_stay_cheap()
@@ -0,0 +1,122 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.request_cache import RequestCache, ttl_to_candle_close
+from modules.data_loader import DataLoader
+
+class SlowExchange:
+    """Counts calls; each fetch takes a moment so concurrent callers overlap."""
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return [[1_700_000_000_000 + i * 3_600_000, 100.0, 101.0, 99.0, 100.5, 10.0] for i in range(limit or 5)]
+
+def test_coalescing_and_ttl():
+    print("=== Testing Request Coalescing + TTL Cache ===\n")
+    now = [1000.0]
+    cache = RequestCache(clock=lambda: now[0])
+    exchange = SlowExchange()
+
+    # 8 consumers ask for the same candles at once -> one exchange call
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_fetch(('BTC/USDT', '1h'), lambda: exchange.fetch_ohlcv('BTC/USDT', '1h', limit=3), ttl=30)))
+        for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert exchange.calls == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert cache.misses == 1 and cache.saved_requests == 7
+
+    # Within TTL -> cache hit; after TTL -> refetch
+    cache.get_or_fetch(('BTC/USDT', '1h'), lambda: exchange.fetch_ohlcv('BTC/USDT', '1h', limit=3), ttl=30)
+    assert exchange.calls == 1 and cache.hits >= 1
+    now[0] += 31
+    cache.get_or_fetch(('BTC/USDT', '1h'), lambda: exchange.fetch_ohlcv('BTC/USDT', '1h', limit=3), ttl=30)
+    assert exchange.calls == 2
+    print(f"[PASS] Stats: {cache.stats()}")
+
+def test_ttl_aligned_to_timeframe():
+    hour = 3_600_000
+    assert ttl_to_candle_close(hour, 10 * hour + hour - 5_000) == 5.0
+    assert ttl_to_candle_close(hour, 10 * hour, max_ttl=30) == 30
+    print("[PASS] TTL expires at candle close.")
+
+def test_data_loader_shares_fetches():
+    print("=== Testing DataLoader Request Cache ===\n")
+    loader = DataLoader(default_exchange_id='kraken')
+    exchange = SlowExchange()
+    loader.exchanges['kraken'] = exchange
+    asset = {'symbol': 'BTC/USDT', 'source': 'exchange'}
+
+    frames = [loader.fetch_latest_candles(asset, limit=5) for _ in range(3)]
+    frames[0]['atr'] = 1.0  # Consumers may mutate their copy
+
+    assert exchange.calls == 1
+    assert 'atr' not in frames[1].columns
+    assert loader.cache_stats()['hits'] == 2
+    print("[PASS] Paper trader / reporting / strategies share one exchange call.")
+
+def test_cache_stays_bounded():
+    now = [0.0]
+    cache = RequestCache(clock=lambda: now[0], max_entries=3, purge_interval=10)
+    for i in range(10):
+        cache.get_or_fetch(('page', i), lambda: i, ttl=30)
+        cache.get_or_fetch(('page', 0), lambda: 'refetched', ttl=30)  # Hot key stays cached
+    assert len(cache._entries) == 3 and cache.evicted == 7
+    assert cache.get_or_fetch(('page', 0), lambda: 'refetched', ttl=30) == 0
+
+    # Expired entries go on the next insert once the purge interval has passed
+    now[0] += 31
+    cache.get_or_fetch('fresh', lambda: 1, ttl=30)
+    assert list(cache._entries) == ['fresh']
+
+    # History pages are coalesced but never stored
+    loader = DataLoader(default_exchange_id='kraken')
+    exchange = SlowExchange()
+    for since in range(5):
+        loader._fetch_ohlcv(exchange, 'kraken', 'BTC/USDT', '1h', since, 3)
+    assert exchange.calls == 5 and loader.cache_stats()['entries'] == 0
+    print("[PASS] LRU cap and expiry purge bound the cache; since-pages are not kept.")
+
+class FetchAborted(BaseException):
+    """Stand-in for KeyboardInterrupt / SystemExit inside a fetch."""
+
+def test_aborted_fetch_is_not_cached():
+    cache = RequestCache()
+
+    def fetch():
+        while cache.coalesced == 0:  # Abort once a second caller waits on this fetch
+            time.sleep(0.001)
+        raise FetchAborted()
+
+    outcomes = []
+    def call():
+        try:
+            outcomes.append(cache.get_or_fetch('key', fetch, ttl=30))
+        except FetchAborted:
+            outcomes.append('aborted')
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert outcomes == ['aborted', 'aborted']
+    assert cache.stats()['entries'] == 0
+    print("[PASS] An aborted fetch reaches its waiters and is not cached.")
+
+if __name__ == "__main__":
+    test_coalescing_and_ttl()
+    test_ttl_aligned_to_timeframe()
+    test_data_loader_shares_fetches()
+    test_cache_stays_bounded()
+    test_aborted_fetch_is_not_cached()
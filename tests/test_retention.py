@@ -0,0 +1,132 @@
+import sys
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.analytics import match_fifo, trades_to_columns
+from modules.orders import Fill, Side
+from modules.retention import TieredSeries, TradeStats, lttb
+
+HOUR_NS = 3600 * 10**9
+
+def random_fills(n, seed=0):
+    rng = np.random.default_rng(seed)
+    fills, inventory, price = [], 0.0, 100.0
+    for i in range(n):
+        price *= np.exp(rng.normal(0, 0.01))
+        size = float(rng.choice([0.1, 0.2, 0.3]))
+        side = Side.BUY if inventory < size or rng.random() < 0.5 else Side.SELL
+        inventory += size * side
+        fills.append(Fill(i * HOUR_NS, side, price, size, price * size * 0.001))
+    return fills
+
+def test_lttb_keeps_shape():
+    print("=== Testing LTTB Downsampling ===\n")
+    rng = np.random.default_rng(1)
+    x = np.arange(100_000)
+    y = np.cumsum(rng.normal(0, 1, len(x)))
+    y[43_210] -= 500  # Flash crash
+    keep = lttb(x, y, 500)
+
+    assert len(keep) == 500 and keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 43_210 in keep
+    assert np.array_equal(lttb(x[:10], y[:10], 500), np.arange(10))
+    print("[PASS] 100k -> 500 points, endpoints and the crash survive.")
+
+def test_tiered_series_rolls_up_to_ohlc():
+    print("=== Testing Tiered Equity Retention ===\n")
+    rng = np.random.default_rng(2)
+    step = 5 * 60 * 10**9
+    times = np.arange(200 * 24 * 12) * step  # 200 days of 5-minute points
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(times))))
+    series = TieredSeries([(None, '2d'), ('1h', '30d'), ('1d', None)])
+    for t, v in zip(times, values):
+        series.append(t, v)
+
+    raw, hourly, daily = (len(level) for level in series.levels)
+    print(f"{len(times)} points -> raw {raw} / hourly {hourly} / daily {daily}")
+    assert raw <= 2 * 24 * 12 + 12 and hourly <= 30 * 24 + 24 and daily <= 200
+    assert len(series) < len(times) / 25
+
+    # Every bar is the exact OHLC of the points it replaced
+    full = pd.Series(values, index=pd.to_datetime(times, unit='ns'))
+    frame = series.frame()
+    for bar_s, rule in ((86400, '1D'), (3600, '1h')):
+        bars = frame[frame['bar_s'] == bar_s]
+        expected = full.resample(rule).ohlc().loc[bars.index]
+        assert np.allclose(bars[['open', 'high', 'low', 'close']].to_numpy(), expected.to_numpy())
+    assert frame.index.is_monotonic_increasing and frame['close'].iloc[-1] == values[-1]
+
+    restored = TieredSeries.from_state(json.loads(json.dumps(series.state())))
+    assert restored.state() == series.state()
+    t, v = restored.series(max_points=300)
+    assert len(t) == 300 and v[-1] == values[-1]
+    print("[PASS] Bounded tiers; rolled-up bars match a full-history resample.")
+
+def test_trade_stats_match_full_ledger():
+    print("=== Testing Incremental Trade Aggregates ===\n")
+    fills = random_fills(3000)
+    stats = TradeStats()
+    for i, fill in enumerate(fills):
+        stats.add(fill)
+        if i == 1500:  # Survives a save / load in the middle
+            stats = TradeStats.from_state(json.loads(json.dumps(stats.state())))
+
+    columns = trades_to_columns(fills)
+    round_trips = match_fifo(columns)
+    assert stats.trades == len(fills) and stats.buys + stats.sells == len(fills)
+    assert stats.round_trips == len(round_trips)
+    assert stats.wins == int((round_trips['pnl'] > 0).sum())
+    assert np.isclose(stats.realized_pnl, round_trips['pnl'].sum())
+    assert np.isclose(stats.fees, columns['fee'].sum())
+    assert np.isclose(stats.open_size, columns['size'][columns['is_buy']].sum() - columns['size'][~columns['is_buy']].sum())
+    print(f"[PASS] {stats.round_trips} round trips, realized ${stats.realized_pnl:.2f} without the ledger.")
+
+def test_paper_trader_retention(tmp_path):
+    from modules.paper_trader import PaperTrader
+
+    print("=== Testing Paper State Retention ===\n")
+    now = [0.0]
+    clock = lambda: now[0]
+    state_file = str(tmp_path / 'paper.json')
+    params = {'trade_retention_days': 2, 'equity_tiers': [[None, '1d'], ['1h', '7d'], ['1d', None]]}
+    trader = PaperTrader(state_file=state_file, assets=[{'symbol': 'BTC/USDT'}], clock=clock,
+                         retention_params=params)
+    for fill in random_fills(24 * 20):
+        now[0] = fill.time / 1e9
+        trader._book_fill('BTC/USDT', fill)
+        trader.equity_history['BTC/USDT'].append(fill.time, 100 + fill.price)
+    trader._apply_retention()
+    trader._save_state(final=True)
+
+    state = trader.portfolio['BTC/USDT']
+    assert len(state['trades']) <= 2 * 24 + 1
+    assert all(t.time >= (now[0] - 2 * 86400) * 1e9 for t in state['trades'])
+    # The equity history has its own file, rewritten only every history_save_interval
+    history_file = tmp_path / 'paper_history.json'
+    with open(state_file) as f:
+        assert 'equity_history' not in json.load(f)['BTC/USDT']
+    written = history_file.stat().st_mtime_ns
+    trader.equity_history['BTC/USDT'].append(int(now[0] * 1e9) + 1, 1.0)
+    trader._save_state()
+    assert history_file.stat().st_mtime_ns == written
+    trader.equity_history['BTC/USDT'].levels[0].pop()
+
+    reloaded = PaperTrader(state_file=state_file, assets=[{'symbol': 'BTC/USDT'}], clock=clock,
+                           retention_params=params)
+    assert reloaded.trade_stats['BTC/USDT'].state() == trader.trade_stats['BTC/USDT'].state()
+    assert reloaded.trade_stats['BTC/USDT'].trades == 24 * 20
+    assert reloaded.equity_history['BTC/USDT'].state() == trader.equity_history['BTC/USDT'].state()
+    print(f"[PASS] {len(state['trades'])} of {24 * 20} trade records kept; aggregates and history reload.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_lttb_keeps_shape()
+    test_tiered_series_rolls_up_to_ohlc()
+    test_trade_stats_match_full_ledger()
+    test_paper_trader_retention(pathlib.Path(tempfile.mkdtemp()))
@@ -1,8 +1,11 @@
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.risk_manager import RiskManager
+from modules.risk_manager import KellyEstimator, RiskManager
+from modules.orders import Fill, FillLog, Side
+from modules.analytics import match_fifo
 
 class MockConfig:
     def get(self, key, default):
@@ -57,5 +60,122 @@ def test_anti_fragile_logic():
     else:
         print(f"[FAIL] Calc Stop = {stop_price}")
 
+def test_batch_matches_per_candle_loop():
+    print("=== Testing Vectorized Drawdown / Circuit Breaker ===\n")
+    rng = np.random.default_rng(42)
+    # Random walk with deep swings so the breaker toggles several times
+    equity = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, 2000)))
+
+    loop_rm = RiskManager(MockConfig())
+    loop_dd, loop_peak, loop_breaker = [], [], []
+    for eq in equity:
+        loop_dd.append(loop_rm.update_account_status(eq))
+        loop_peak.append(loop_rm.peak_balance)
+        loop_breaker.append(loop_rm.circuit_breaker_active)
+
+    batch_rm = RiskManager(MockConfig())
+    # Split in two batches: state must carry over between calls
+    dd1, peak1, br1 = batch_rm.update_account_status_batch(equity[:700])
+    dd2, peak2, br2 = batch_rm.update_account_status_batch(equity[700:])
+
+    assert np.array_equal(np.r_[dd1, dd2], loop_dd)
+    assert np.array_equal(np.r_[peak1, peak2], loop_peak)
+    assert np.array_equal(np.r_[br1, br2], loop_breaker)
+    assert batch_rm.circuit_breaker_active == loop_rm.circuit_breaker_active
+    print(f"[PASS] Batch == loop ({int(np.sum(np.diff(np.r_[br1, br2].astype(int)) != 0))} breaker toggles).")
+
+    # Batched sizing, with the Kelly cap and the portfolio volatility target in play
+    for rm in (loop_rm, batch_rm):
+        for i in range(100):
+            rm.kelly.update(0.01 if i % 100 < 51 else -0.01)
+        rm.portfolio_scale = 0.7
+    assert np.isclose(batch_rm.kelly_scale(), 0.5)
+    atr = rng.uniform(5, 50, 2000)
+    sizes = batch_rm.calculate_position_size_batch(10000.0, atr, 1000.0, breaker=np.r_[br1, br2])
+    expected = []
+    for a, br in zip(atr, np.r_[br1, br2]):
+        loop_rm.circuit_breaker_active = bool(br)
+        expected.append(loop_rm.calculate_position_size(10000.0, a, 1000.0))
+    assert np.allclose(sizes, expected, rtol=0, atol=1e-12)
+    print("[PASS] Batched position sizing matches scalar sizing bar for bar.")
+
+def test_online_kelly_estimator():
+    print("\n=== Testing Online Kelly Estimator ===\n")
+    rng = np.random.default_rng(7)
+    log = FillLog()
+    estimator = KellyEstimator(min_trades=30)
+    inventory = 0.0
+    for t in range(3000):
+        price = 100 + rng.normal(0, 2)
+        size = round(rng.uniform(0.1, 1.0), 3)
+        side = Side.BUY if inventory < size or rng.random() < 0.5 else Side.SELL
+        inventory += size * side
+        fill = Fill(t, side, price, size, price * size * 0.001)
+        log.append(fill)
+        estimator.record_fill('BTC/USDT', side, price, size, fill.fee)
+
+    # Same round trips as the vectorized FIFO matcher, without rescanning
+    per_sell = match_fifo(log.columns()).groupby('exit_time')['pnl'].sum()
+    assert estimator.trades == len(per_sell)
+    assert np.isclose(estimator.win_rate, (per_sell > 0).mean())
+    print(f"[PASS] {estimator.trades} round trips: win rate {estimator.win_rate:.3f}, "
+          f"payoff {estimator.payoff_ratio:.2f} (matches match_fifo).")
+
+    # Decay: a recent losing streak dominates a long winning history
+    decayed, flat = KellyEstimator(halflife=20), KellyEstimator()
+    for ret in [0.01] * 200 + [-0.01] * 30:
+        decayed.update(ret)
+        flat.update(ret)
+    assert decayed.win_rate < 0.5 < flat.win_rate
+
+def test_kelly_scales_position_size():
+    rm = RiskManager(MockConfig())
+    base = rm.calculate_position_size(10000.0, 10.0, 1000.0)
+    for _ in range(29):
+        rm.kelly.update(-0.02)
+    assert rm.kelly_scale() == 1.0  # Too few trades: unchanged sizing
+    rm.kelly.update(-0.02)
+    assert rm.kelly_scale() == rm.kelly_floor
+    assert np.isclose(rm.calculate_position_size(10000.0, 10.0, 1000.0), base * rm.kelly_floor)
+
+    # Weak edge: 55% winners at 1:1 -> f* = 0.1, half Kelly 5% > 2% base -> uncapped
+    rm.kelly = KellyEstimator(min_trades=30)
+    for i in range(100):
+        rm.kelly.update(0.01 if i % 20 < 11 else -0.01)
+    assert np.isclose(rm.kelly.optimal_fraction(), 0.1)
+    assert rm.kelly_scale() == 1.0
+    # Marginal edge: f* = 0.02 -> half Kelly 1% -> half the base budget
+    rm.kelly = KellyEstimator(min_trades=30)
+    for i in range(100):
+        rm.kelly.update(0.01 if i % 100 < 51 else -0.01)
+    assert np.isclose(rm.kelly_scale(), 0.5)
+    assert np.isclose(rm.calculate_position_size_batch(10000.0, [10.0], 1000.0)[0], base * 0.5)
+    print("[PASS] Fractional Kelly caps the 2% budget only when the measured edge is thin.")
+
+def test_kelly_survives_paper_restart(tmp_path):
+    from modules.paper_trader import PaperTrader
+
+    state_file = str(tmp_path / 'paper.json')
+    trader = PaperTrader(state_file=state_file, assets=[{'symbol': 'BTC/USDT'}])
+    rng = np.random.default_rng(4)
+    for i in range(80):
+        price = 100 * (1 + rng.normal(0, 0.01))
+        trader._book_fill('BTC/USDT', Fill(i, Side.BUY if i % 2 == 0 else Side.SELL, price, 0.1, price * 1e-4))
+    trader._book_fill('BTC/USDT', Fill(80, Side.BUY, 100.0, 0.1, 0.01))  # Open lot across the restart
+    trader._save_state()
+
+    restarted = PaperTrader(state_file=state_file, assets=[{'symbol': 'BTC/USDT'}])
+    assert restarted.risk_manager.kelly.trades == 40
+    assert restarted.risk_manager.kelly.state() == trader.risk_manager.kelly.state()
+    assert restarted.risk_manager.kelly_scale() == trader.risk_manager.kelly_scale()
+    # The sell after the restart closes the lot bought before it
+    assert restarted.risk_manager.kelly.record_fill('BTC/USDT', Side.SELL, 101.0, 0.1, 0.01) is not None
+    print("[PASS] Kelly estimate and open lots survive a paper trader restart.")
+
 if __name__ == "__main__":
     test_anti_fragile_logic()
+    test_batch_matches_per_candle_loop()
+    test_online_kelly_estimator()
+    test_kelly_scales_position_size()
+    import tempfile, pathlib
+    test_kelly_survives_paper_restart(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.scenario_generator import BLOCK_SIZE, ScenarioGenerator, MODELS
+
+def test_seeded_and_chunk_independent():
+    print("=== Testing Scenario Generator (Determinism) ===\n")
+    for model in MODELS:
+        full = ScenarioGenerator(seed=7).generate(300_000, model=model)
+        chunked = pd.concat(list(ScenarioGenerator(seed=7).iter_chunks(300_000, model=model, chunk_size=50_000)))
+        other = ScenarioGenerator(seed=8).generate(1000, model=model)
+
+        assert full.equals(chunked), model
+        assert not full.iloc[:1000].equals(other), model
+        assert (full['high'] >= full[['open', 'close']].max(axis=1)).all()
+        assert (full['low'] <= full[['open', 'close']].min(axis=1)).all()
+        assert np.allclose(full['open'].to_numpy()[1:], full['close'].to_numpy()[:-1])
+        print(f"[PASS] {model}: same seed -> same candles, any chunking.")
+
+    empty = ScenarioGenerator(seed=7).generate(0)
+    assert empty.empty and list(empty.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert isinstance(empty.index, pd.DatetimeIndex) and (empty.dtypes == float).all()
+
+def test_model_properties():
+    print("=== Testing Scenario Generator (Regimes / Clustering) ===\n")
+    calm = ScenarioGenerator(seed=1).generate(200_000, model='gbm')
+    clustered = ScenarioGenerator(seed=1, vol_of_vol=0.2).generate(200_000, model='vol_cluster')
+
+    def abs_return_autocorr(df):
+        r = np.abs(np.diff(np.log(df['close'].to_numpy())))
+        return np.corrcoef(r[:-1], r[1:])[0, 1]
+
+    # Volatility clustering: |r| autocorrelated, GBM: not
+    assert abs_return_autocorr(clustered) > 0.1 > abs(abs_return_autocorr(calm))
+
+    # Jumps: fat tails
+    jumps = ScenarioGenerator(seed=1, jump_rate=0.01).generate(200_000, model='jump')
+    r = np.diff(np.log(jumps['close'].to_numpy()))
+    assert ((r - r.mean()) ** 4).mean() / r.var() ** 2 > 5
+    print("[PASS] Volatility clustering and fat-tailed jumps present.")
+
+def test_million_rows_fast():
+    generator = ScenarioGenerator(seed=3)
+    # Work: whole vectorized blocks, no per-row Python
+    blocks = [0]
+    block = generator._block
+    def counting_block(*args):
+        blocks[0] += 1
+        return block(*args)
+    generator._block = counting_block
+    started = time.time()
+    chunks = [len(c) for c in generator.iter_chunks(2_000_000, model='regime', chunk_size=500_000)]
+    elapsed = time.time() - started
+    print(f"Generated {sum(chunks):,} regime candles in {elapsed:.2f}s ({blocks[0]} blocks)")
+    assert chunks == [500_000] * 4
+    assert blocks[0] == -(-2_000_000 // BLOCK_SIZE)
+
+if __name__ == "__main__":
+    test_seeded_and_chunk_independent()
+    test_model_properties()
+    test_million_rows_fast()
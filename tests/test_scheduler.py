@@ -0,0 +1,88 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.scheduler import CycleScheduler
+from modules.paper_trader import PaperTrader
+
+HOUR = 3600.0
+NOW = 1_700_000_000.0 - (1_700_000_000.0 % HOUR) + 600  # 10 minutes into a candle
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def candles(last_open_s, rows=250, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0.05, 0.5, rows))
+    index = pd.to_datetime(last_open_s - HOUR * np.arange(rows)[::-1], unit='s')
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0}, index=index)
+
+class TimedLoader:
+    """Fetch latency (advances the fake timer) and candle freshness per symbol."""
+    def __init__(self, timer, latency, last_open):
+        self.timer, self.latency, self.last_open = timer, latency, last_open
+        self.fetched = []
+    def fetch_latest_candles(self, asset_config, limit=200, timeframe='1h'):
+        symbol = asset_config['symbol']
+        self.fetched.append(symbol)
+        self.timer.now += self.latency[symbol]
+        return candles(self.last_open[symbol])
+    def cache_stats(self):
+        return {'hits': 0, 'misses': 0, 'saved_requests': 0}
+
+def test_stale_slow_and_budget(tmp_path):
+    print("=== Testing Deadline-Aware Cycle Scheduler ===\n")
+    fresh = NOW - 600
+    timer = FakeTimer()
+    loader = TimedLoader(timer,
+                         latency={'FAST': 0.2, 'STALE': 0.1, 'SLOW': 12.0, 'LATE': 1.0},
+                         last_open={'FAST': fresh, 'STALE': fresh - 5 * HOUR, 'SLOW': fresh, 'LATE': fresh})
+    assets = [{'symbol': s} for s in ['SLOW', 'FAST', 'STALE', 'LATE']]
+    trader = PaperTrader(state_file=str(tmp_path / 'paper.json'), assets=assets, loader=loader, clock=lambda: NOW,
+                         scheduler_params={'cycle_budget': 12.25, 'fetch_deadline': 10.0, 'max_candle_age': 2})
+    trader.scheduler.timer = timer
+
+    # Cycle 1: config order; SLOW eats most of the budget, LATE is deferred
+    trader._run_cycle()
+    assert loader.fetched == ['SLOW', 'FAST', 'STALE']
+    # Only fresh, timely data re-grids
+    assert 'equity' in trader.portfolio['FAST']
+    assert 'equity' not in trader.portfolio['STALE'] and 'equity' not in trader.portfolio['SLOW']
+
+    # Cycle 2: deferred first, then fastest first; SLOW backed off for one cycle
+    loader.fetched = []
+    trader._run_cycle()
+    assert loader.fetched == ['LATE', 'STALE', 'FAST']
+
+    # Cycle 3: SLOW retried last (slowest median), backoff doubles on repeat
+    loader.fetched = []
+    trader._run_cycle()
+    assert loader.fetched[-1] == 'SLOW'
+    assert trader.scheduler.cooldown['SLOW'] == 2
+
+    report = trader.scheduler.latency_report().set_index('Symbol')
+    print(report.to_string(float_format="%.0f"))
+    assert report.loc['SLOW', 'p50 ms'] == 12000 and report.loc['SLOW', 'Slow'] == 2
+    assert report.loc['SLOW', 'Skipped'] == 1 and report.loc['LATE', 'Deferred'] == 1
+    assert report.loc['STALE', 'Stale'] == 3 and report.loc['FAST', 'Stale'] == 0
+    print("[PASS] Stale/slow symbols skipped, budget deferral and backoff.")
+
+def test_disabled_limits():
+    scheduler = CycleScheduler(cycle_budget=None, fetch_deadline=None, max_candle_age=None, clock=lambda: NOW)
+    plan = scheduler.plan([{'symbol': 'A'}])
+    assert scheduler.within_budget()
+    assert scheduler.record_fetch('A', scheduler.timer() - 1000, candles(0)) is None
+    assert plan == [{'symbol': 'A'}]
+    print("[PASS] None disables each guard.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_stale_slow_and_budget(pathlib.Path(tempfile.mkdtemp()))
+    test_disabled_limits()
@@ -0,0 +1,59 @@
+import sys
+import os
+import multiprocessing
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.scenario_generator import ScenarioGenerator
+from modules.shared_data import SharedOHLCVRegistry, attach
+
+def _worker_stats(handle):
+    """Runs in a spawned worker: attach by name, read without copying."""
+    view = attach(handle)
+    df = view.frame()
+    shared = np.shares_memory(df['close'].to_numpy(), view['close'])
+    return handle['symbol'], len(df), float(df['close'].sum()), float(df['high'].max()), shared
+
+def _check_registry(mode, price_dtype):
+    data = {s: ScenarioGenerator(seed=i).generate(5_000) for i, s in enumerate(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])}
+    with tempfile.TemporaryDirectory() as tmp:
+        with SharedOHLCVRegistry(mode=mode, directory=tmp, price_dtype=price_dtype) as registry:
+            for symbol, df in data.items():
+                registry.publish(symbol, df)
+            assert registry.nbytes() == 3 * 5_000 * (8 + 5 * np.dtype(price_dtype).itemsize)
+
+            # Same process: views round-trip the frame and are read-only
+            view = attach(registry.handles['BTC/USDT'])
+            frame = view.frame()
+            assert (frame.index == data['BTC/USDT'].index).all()
+            assert np.allclose(frame['close'], data['BTC/USDT']['close'], rtol=1e-6)
+            assert not view['close'].flags.writeable
+
+            # Workers only receive the small handles
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(2) as pool:
+                results = pool.map(_worker_stats, list(registry.handles.values()) * 2)
+
+            for symbol, rows, close_sum, high_max, shared in results:
+                expected = data[symbol].astype(price_dtype)
+                assert rows == 5_000 and shared
+                assert np.isclose(close_sum, expected['close'].sum(), rtol=1e-6)
+                assert high_max == float(expected['high'].max())
+        if mode == 'mmap':
+            assert not os.listdir(tmp)
+    print(f"[PASS] {mode}/{price_dtype}: {len(results)} worker tasks attached zero-copy.")
+
+def test_shared_memory_registry():
+    print("=== Testing Shared-Memory OHLCV Registry ===\n")
+    _check_registry('shm', 'float64')
+
+def test_mmap_registry_float32():
+    print("=== Testing Memory-Mapped OHLCV Registry ===\n")
+    _check_registry('mmap', 'float32')
+
+if __name__ == "__main__":
+    test_shared_memory_registry()
+    test_mmap_registry_float32()
@@ -0,0 +1,139 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.stop_book import StopBook
+
+class NaiveStops:
+    """Reference: every lot's stop updated and scanned on every candle."""
+    def __init__(self):
+        self.lots = []  # [price, size, stop]
+
+    def add(self, price, size, stop):
+        self.lots.append([price, size, stop])
+
+    def reduce(self, size):
+        while size > 1e-12 and self.lots:
+            qty = min(self.lots[0][1], size)
+            self.lots[0][1] -= qty
+            size -= qty
+            if self.lots[0][1] <= 1e-12:
+                self.lots.pop(0)
+
+    def trail(self, level):
+        for lot in self.lots:
+            lot[2] = max(lot[2], level)
+
+    def check(self, low):
+        hit = [(lot[1], lot[2]) for lot in self.lots if lot[2] >= low]
+        self.lots = [lot for lot in self.lots if lot[2] < low]
+        return hit
+
+def test_matches_naive_scan():
+    print("=== Testing Heap-Indexed ATR Stop Book ===\n")
+    rng = np.random.default_rng(11)
+    book, naive = StopBook(), NaiveStops()
+    price = 100.0
+    stopped = 0
+    for _ in range(5000):
+        price *= np.exp(rng.normal(0, 0.01))
+        atr = price * rng.uniform(0.005, 0.02)
+        low = price - rng.uniform(0, 2) * atr
+        got, expected = book.check(low), naive.check(low)
+        assert sorted(got) == sorted(expected)
+        stopped += len(got)
+        for _ in range(rng.integers(0, 3)):
+            fill = price * (1 - rng.uniform(0, 0.02))
+            size = rng.uniform(0.1, 1)
+            book.add(fill, size, fill - 3 * atr)
+            naive.add(fill, size, fill - 3 * atr)
+        if rng.random() < 0.3:
+            size = rng.uniform(0.1, 1.5)
+            book.reduce(size)
+            naive.reduce(size)
+        book.trail(price - 3 * atr)
+        naive.trail(price - 3 * atr)
+    assert len(book) == len(naive.lots) and np.isclose(book.size, sum(l[1] for l in naive.lots))
+    assert [l['stop'] for l in book.snapshot()] == [l[2] for l in naive.lots]
+    print(f"[PASS] Same stop-outs as a full rescan ({stopped} lots stopped, trailing + FIFO grid sells).")
+
+def test_check_cost_independent_of_open_lots():
+    book = StopBook()
+    for i in range(200_000):
+        book.add(100.0 + i * 1e-4, 0.01, 50.0 + i * 1e-5)
+    book.trail(40.0)
+    # Work per check: a heap peek and one trailing-level lookup, nothing popped or scanned
+    lookups = [0]
+    trailing_max = book._trailing_max
+    def counting_trailing_max(entry_seq):
+        lookups[0] += 1
+        return trailing_max(entry_seq)
+    book._trailing_max = counting_trailing_max
+    heap, entries = len(book._by_stop), len(book._by_entry)
+    started = time.perf_counter()
+    for _ in range(10_000):
+        assert not book.check(53.0)  # No stop in range
+    per_check = (time.perf_counter() - started) / 10_000
+    assert lookups[0] == 10_000
+    assert len(book._by_stop) == heap and len(book._by_entry) == entries and len(book) == 200_000
+    hit = book.check(51.9)
+    assert len(hit) == 10_000 and min(stop for _, stop in hit) >= 51.9
+    print(f"[PASS] 200k open lots: {per_check*1e6:.1f} us per candle without triggers.")
+
+def test_backtester_stops_out_inventory():
+    from modules.backtester import Backtester
+    from modules.risk_manager import RiskManager
+    from modules.strategy_engine import StrategyEngine
+
+    # Range, then a crash: grid buys the dip all the way down without stops
+    n = 600
+    close = np.r_[100 + 2 * np.sin(np.arange(400) / 5), np.linspace(100, 40, 200)]
+    data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': 1.0}, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+    params = {'grid_levels': 10, 'base_grid_step_pct': 0.01, 'trend_ma_period': 50, 'min_atr_period': 14}
+
+    results = {}
+    for enforce in (False, True):
+        rm = RiskManager({'enforce_atr_stops': enforce})
+        bt = Backtester(StrategyEngine('CRASH', rm, config_override=params))
+        bt.run(data.copy())
+        results[enforce] = bt
+    assert results[True].equity_curve[-1]['equity'] > results[False].equity_curve[-1]['equity']
+    assert results[True].inventory < results[False].inventory
+    assert np.isclose(results[True].stop_book.size, results[True].inventory)
+    print(f"[PASS] Crash: ${results[True].equity_curve[-1]['equity']:.0f} with stops vs "
+          f"${results[False].equity_curve[-1]['equity']:.0f} without.")
+
+def test_gap_below_stop_fills_at_open(tmp_path):
+    from modules.backtester import Backtester
+    from modules.paper_trader import PaperTrader
+    from modules.risk_manager import RiskManager
+    from modules.strategy_engine import StrategyEngine
+
+    fills = {}
+    for open_ in (100.0, 85.0):
+        bt = Backtester(StrategyEngine('GAP', RiskManager({})))
+        bt.inventory = 1.0
+        bt.stop_book.add(100.0, 1.0, 95.0)
+        bt._check_stops(80.0, 0, open_)
+        fills[open_] = bt.trade_history[0].price
+    assert fills == {100.0: 95.0, 85.0: 85.0}
+
+    trader = PaperTrader(state_file=str(tmp_path / 'paper.json'), assets=[{'symbol': 'GAP'}])
+    trader.portfolio['GAP']['inventory'] = 1.0
+    trader.stop_books['GAP'].add(100.0, 1.0, 95.0)
+    trader._check_fills('GAP', 88.0, 80.0, 88.0)
+    assert trader.portfolio['GAP']['trades'][0].price == 88.0
+    print("[PASS] Gaps through the stop fill at the open / current price, not the stop.")
+
+if __name__ == "__main__":
+    test_matches_naive_scan()
+    test_check_cost_independent_of_open_lots()
+    test_backtester_stops_out_inventory()
+    import tempfile, pathlib
+    test_gap_below_stop_fills_at_open(pathlib.Path(tempfile.mkdtemp()))
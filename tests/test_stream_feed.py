@@ -0,0 +1,109 @@
+import sys
+import os
+import json
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.stream_feed import CandleBuilder, StreamingFeed, ReplayServer, messages_from_candles
+
+HOUR_MS = 60 * 60 * 1000
+
+def make_candles(n=300, drift=0.0, start_ms=1_700_000_000_000 - (1_700_000_000_000 % HOUR_MS)):
+    x = np.linspace(0, 6 * np.pi, n)
+    close = 105 + 5 * np.sin(x) + drift * np.arange(n)
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': start_ms + np.arange(n) * HOUR_MS,
+        'open': open_,
+        'high': np.maximum(open_, close) + 0.5,
+        'low': np.minimum(open_, close) - 0.5,
+        'close': close,
+        'volume': 1000.0,
+    })
+
+def test_candle_builder():
+    print("=== Testing Candle Builder ===\n")
+    builder = CandleBuilder('BTC/USDT', timeframe='1h')
+    t0 = 1_700_000_000_000 - (1_700_000_000_000 % HOUR_MS)
+
+    assert builder.on_trade(t0 + 1, 100.0, 1.0) == []
+    builder.on_trade(t0 + 2, 102.0, 1.0)
+    builder.on_trade(t0 + 3, 99.0, 1.0)
+    closed = builder.on_trade(t0 + HOUR_MS, 101.0, 1.0)
+
+    assert closed == [[t0, 100.0, 102.0, 99.0, 99.0, 3.0]]
+    assert builder.forming[0] == t0 + HOUR_MS
+    print("[PASS] Trades folded into OHLCV and candle closed on bucket roll.")
+
+def _stream_with_drops(drop_after, skip_on_drop):
+    candles = make_candles(60)
+    history, live = candles.iloc[:20], candles.iloc[20:]
+    messages = messages_from_candles(live, 'BTC/USDT', ticks_per_candle=4)
+
+    def backfill(symbol, since):
+        if since is None:
+            return history
+        return candles[candles['timestamp'] >= since]
+
+    with ReplayServer(messages, drop_after=drop_after, skip_on_drop=skip_on_drop) as server:
+        feed = StreamingFeed(server.host, server.port, ['BTC/USDT'], backfill=backfill,
+                             reconnect_delay=0.01, max_reconnects=10)
+        feed.prime()
+        closes = [e for e in feed.events() if e.kind == 'candle']
+
+    builder = feed.builders['BTC/USDT']
+    stamps = [c[0] for c in builder.closed]
+    print(f"Reconnects: {feed.reconnects} | Gaps backfilled: {feed.gaps_backfilled} | Candles: {len(stamps)}")
+
+    assert feed.gaps_backfilled > 0
+    assert np.all(np.diff(stamps) == HOUR_MS), "Window must be contiguous after backfill"
+    # Candles rebuilt from the stream match the recorded ones, also those the strategy saw
+    expected = candles.set_index('timestamp')
+    for ts, o, h, l, c, v in builder.closed:
+        assert abs(expected.loc[ts, 'close'] - c) < 1e-9
+        assert abs(expected.loc[ts, 'high'] - h) < 1e-9
+    assert len(closes) > 0
+    for event in closes:
+        assert abs(expected.loc[event.ts, 'close'] - event.price) < 1e-9
+
+def test_stream_reconnect_and_backfill():
+    print("=== Testing Streaming Feed (Reconnect + Gap Backfill) ===\n")
+    # Drop the connection every 40 messages and lose 8 messages (2 candles) each time
+    _stream_with_drops(drop_after=40, skip_on_drop=8)
+    # Drops inside a candle: the socket is back within the next bucket
+    _stream_with_drops(drop_after=42, skip_on_drop=2)
+    print("[PASS] Feed reconnected and backfilled missed and interrupted candles.")
+
+def test_paper_trader_stream(tmp_path):
+    print("=== Testing PaperTrader Streaming Mode ===\n")
+    import config
+    from modules.paper_trader import PaperTrader
+
+    symbol = config.PORTFOLIO_CONFIG[0]['symbol']
+    candles = make_candles(260, drift=0.1)
+    history, live = candles.iloc[:220], candles.iloc[220:]
+    messages = messages_from_candles(live, symbol)
+
+    state_file = str(tmp_path / 'paper_portfolio.json')
+    trader = PaperTrader(state_file=state_file)
+
+    with ReplayServer(messages) as server:
+        feed = StreamingFeed(server.host, server.port, [symbol],
+                             backfill=lambda s, since: history, max_reconnects=0)
+        trader.run_stream(feed)
+
+    with open(state_file) as f:
+        state = json.load(f)[symbol]
+    print(f"Trades: {len(state['trades'])} | Equity: {state['equity']:.2f}")
+
+    assert state['last_price'] == messages[-1]['price']
+    assert len(state['trades']) > 0
+    print("[PASS] Fills triggered from streamed ticks, state persisted.")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_candle_builder()
+    test_stream_reconnect_and_backfill()
+    test_paper_trader_stream(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,88 @@
+import sys
+import os
+import json
+import time
+import zlib
+from functools import partial
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.scenario_generator import ScenarioGenerator
+from modules.supervisor import PaperSupervisor, shard_assets
+
+class FlakyLoader:
+    """
+    Synthetic feed (runs inside the workers). The window moves one candle per
+    fetch. CRASH/* raises and STALL/* hangs on the first fetch ever made.
+    """
+    def __init__(self, marker_dir):
+        self.marker_dir = marker_dir
+        self.history = {}
+        self.calls = 0
+
+    def _first_time(self, symbol):
+        marker = os.path.join(self.marker_dir, symbol.replace('/', '_') + '.marker')
+        if os.path.exists(marker):
+            return False
+        open(marker, 'w').close()
+        return True
+
+    def fetch_latest_candles(self, asset_config, limit=200, timeframe='1h'):
+        symbol = asset_config['symbol']
+        if symbol.startswith('CRASH') and self._first_time(symbol):
+            raise RuntimeError("exchange exploded")
+        if symbol.startswith('STALL') and self._first_time(symbol):
+            time.sleep(3600)
+        if symbol not in self.history:
+            self.history[symbol] = ScenarioGenerator(seed=zlib.crc32(symbol.encode())).generate(600, model='vol_cluster')
+        self.calls += 1
+        start = self.calls % 400
+        window = self.history[symbol].iloc[start:start + limit].copy()
+        # Re-stamp so the latest candle is the one forming now (passes the stale-data guard)
+        window.index = window.index + (pd.Timestamp(time.time(), unit='s').floor('h') - window.index[-1])
+        return window
+
+def test_shard_assets_round_robin():
+    assets = [{'symbol': f'S{i}'} for i in range(7)]
+    shards = shard_assets(assets, 3)
+    assert [len(s) for s in shards] == [3, 2, 2]
+    assert sorted(a['symbol'] for s in shards for a in s) == sorted(a['symbol'] for a in assets)
+    assert len(shard_assets(assets[:2], 8)) == 2
+    print("[PASS] Round-robin sharding.")
+
+def test_supervisor_restarts_and_aggregates(tmp_path):
+    print("=== Testing Sharded Paper Supervisor ===\n")
+    assets = [{'symbol': s} for s in ['BTC/USDT', 'ETH/USDT', 'CRASH/USDT', 'SOL/USDT', 'STALL/USDT', 'XRP/USDT']]
+    supervisor = PaperSupervisor(shards=3, assets=assets, state_dir=str(tmp_path), poll_interval=0.1,
+                                 stall_timeout=4, restart_delay=0.2, loader_factory=partial(FlakyLoader, str(tmp_path)))
+    supervisor.start()
+    try:
+        deadline = time.monotonic() + 90
+        while time.monotonic() < deadline:
+            supervisor.supervise(timeout=0.5)
+            if min(supervisor.cycles.values()) >= 5 and sum(supervisor.restarts.values()) >= 2:
+                break
+    finally:
+        supervisor.shutdown(timeout=15)
+
+    print(supervisor.report().to_string(index=False))
+    crash_shard, stall_shard = 2 % 3, 4 % 3
+    assert supervisor.restarts[crash_shard] >= 1 and supervisor.restarts[stall_shard] >= 1
+    assert min(supervisor.cycles.values()) >= 5
+    assert not any(w.is_alive() for w in supervisor.workers.values())
+
+    # Equity aggregated for every symbol; each shard journals its own assets
+    assert set(supervisor.equity) == {a['symbol'] for a in assets}
+    for shard_id, shard in enumerate(supervisor.shards):
+        with open(supervisor.state_file(shard_id)) as f:
+            state = json.load(f)
+        assert set(state) == {a['symbol'] for a in shard}
+    assert supervisor.fill_count == len(supervisor.fills) > 0
+    print(f"[PASS] {supervisor.fill_count} fills, restarts: {supervisor.restarts}")
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_shard_assets_round_robin()
+    test_supervisor_restarts_and_aggregates(pathlib.Path(tempfile.mkdtemp()))